@@ -11,7 +11,9 @@ Implements the full flow: Parameters Sheet → Preschedule Sheet → Results She
 # The module-level import is commented out to prevent UnboundLocalError
 # import os  # REMOVED - causes UnboundLocalError when executed via exec()
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List, Tuple
 import pandas as pd
 
@@ -33,6 +35,20 @@ except ImportError:
 CACHE_TTL = 300  # 5 minutes in seconds
 _cache: Dict[str, Tuple[Dict[str, Any], float]] = {}  # Key -> (data, timestamp)
 
+# Service account credentials per credentials file path, shared by every
+# GoogleSheetsService instance so the key file is parsed once per process
+_credentials_cache: Dict[str, Any] = {}
+_credentials_lock = threading.Lock()
+
+# Authorized gspread clients per credentials file path. Sharing the client
+# shares its HTTP session, so requests reuse pooled TLS connections and the
+# cached access token instead of starting cold for every service instance
+_client_cache: Dict[str, Any] = {}
+
+# Concurrent sheet reads per fetch_schedule_data call; kept small so one
+# dashboard load doesn't burst through the per-user Sheets API quota
+SHEET_READ_WORKERS = 4
+
 
 class GoogleSheetsService:
     """
@@ -230,37 +246,56 @@ class GoogleSheetsService:
         if self._credentials:
             return self._credentials
         
+        cached = _credentials_cache.get(self.credentials_path)
+        if cached is not None:
+            self._credentials = cached
+            return cached
+        
         # CRITICAL: Import os locally to avoid UnboundLocalError when executed via exec()
         import os as _os_creds
         
-        if not _os_creds.path.exists(self.credentials_path):
-            raise FileNotFoundError(
-                f"Google credentials file not found: {self.credentials_path}. "
-                "Please ensure service-account-creds.json exists or set GOOGLE_APPLICATION_CREDENTIALS environment variable."
-            )
-        
-        try:
-            scope = [
-                'https://spreadsheets.google.com/feeds',
-                'https://www.googleapis.com/auth/drive',
-                'https://www.googleapis.com/auth/spreadsheets'
-            ]
-            self._credentials = Credentials.from_service_account_file(
-                self.credentials_path, 
-                scopes=scope
-            )
-            return self._credentials
-        except Exception as e:
-            logger.error(f"Error loading Google credentials: {e}")
-            raise
+        with _credentials_lock:
+            cached = _credentials_cache.get(self.credentials_path)
+            if cached is not None:
+                self._credentials = cached
+                return cached
+            
+            if not _os_creds.path.exists(self.credentials_path):
+                raise FileNotFoundError(
+                    f"Google credentials file not found: {self.credentials_path}. "
+                    "Please ensure service-account-creds.json exists or set GOOGLE_APPLICATION_CREDENTIALS environment variable."
+                )
+            
+            try:
+                scope = [
+                    'https://spreadsheets.google.com/feeds',
+                    'https://www.googleapis.com/auth/drive',
+                    'https://www.googleapis.com/auth/spreadsheets'
+                ]
+                self._credentials = Credentials.from_service_account_file(
+                    self.credentials_path, 
+                    scopes=scope
+                )
+                _credentials_cache[self.credentials_path] = self._credentials
+                return self._credentials
+            except Exception as e:
+                logger.error(f"Error loading Google credentials: {e}")
+                raise
     
     def _get_client(self):
         """Get authorized gspread client"""
         if self._client:
             return self._client
         
-        creds = self._get_credentials()
-        self._client = gspread.authorize(creds)
+        client = _client_cache.get(self.credentials_path)
+        if client is None:
+            creds = self._get_credentials()
+            with _credentials_lock:
+                client = _client_cache.get(self.credentials_path)
+                if client is None:
+                    client = gspread.authorize(creds)
+                    _client_cache[self.credentials_path] = client
+        self._client = client
         return self._client
     
     def _extract_spreadsheet_id(self, url: str) -> str:
@@ -908,18 +943,43 @@ def fetch_schedule_data(schedule_def_id: str, credentials_path: Optional[str] =
         #   排班週期 -> schedule_cycle
         #   使用說明 -> usage_instructions
         
-        # Read all required input sheets from main spreadsheet
-        params_data = service.read_sheet_by_name(main_spreadsheet_url, "軟性限制")  # Soft constraints (Parameters)
-        hard_constraints_data = service.read_sheet_by_name(main_spreadsheet_url, "硬性限制")  # Hard constraints
-        employee_data = service.read_sheet_by_name(main_spreadsheet_url, "人員資料庫")  # Employee database
-        preferences_data = service.read_sheet_by_name(main_spreadsheet_url, "員工預排班表")  # Employee pre-schedule
-        schedule_cycle_data = service.read_sheet_by_name(main_spreadsheet_url, "排班週期")  # Schedule cycle
-        monthly_demand_data = service.read_sheet_by_name(main_spreadsheet_url, "每月人力需求表")  # Monthly demand
-        shift_definitions_data = service.read_sheet_by_name(main_spreadsheet_url, "班別定義表")  # Shift definitions
-        usage_instructions_data = service.read_sheet_by_name(main_spreadsheet_url, "使用說明")  # Usage instructions (optional)
-        
-        # Read output sheet from results spreadsheet
-        final_output_data = service.read_sheet_by_name(results_spreadsheet_url, "排班結果表")  # Final Output (Schedule Results)
+        # Read all required input sheets from main spreadsheet, plus the
+        # output sheet from the results spreadsheet. The reads are independent
+        # network round-trips, so they run on a small thread pool instead of
+        # back to back; the client is authorized once up front and shared.
+        sheet_reads = {
+            "parameters": (main_spreadsheet_url, "軟性限制"),  # Soft constraints (Parameters)
+            "hard_constraints": (main_spreadsheet_url, "硬性限制"),  # Hard constraints
+            "employee": (main_spreadsheet_url, "人員資料庫"),  # Employee database
+            "preferences": (main_spreadsheet_url, "員工預排班表"),  # Employee pre-schedule
+            "schedule_cycle": (main_spreadsheet_url, "排班週期"),  # Schedule cycle
+            "monthly_demand": (main_spreadsheet_url, "每月人力需求表"),  # Monthly demand
+            "shift_definitions": (main_spreadsheet_url, "班別定義表"),  # Shift definitions
+            "usage_instructions": (main_spreadsheet_url, "使用說明"),  # Usage instructions (optional)
+            "final_output": (results_spreadsheet_url, "排班結果表"),  # Final Output (Schedule Results)
+        }
+        if GSPREAD_AVAILABLE:
+            try:
+                service._get_client()
+            except Exception as e:
+                # Each read reports its own failure below
+                logger.warning(f"Could not authorize Google Sheets client: {e}")
+        with ThreadPoolExecutor(max_workers=SHEET_READ_WORKERS) as pool:
+            futures = {
+                key: pool.submit(service.read_sheet_by_name, url, sheet_name)
+                for key, (url, sheet_name) in sheet_reads.items()
+            }
+            sheet_data = {key: future.result() for key, future in futures.items()}
+        
+        params_data = sheet_data["parameters"]
+        hard_constraints_data = sheet_data["hard_constraints"]
+        employee_data = sheet_data["employee"]
+        preferences_data = sheet_data["preferences"]
+        schedule_cycle_data = sheet_data["schedule_cycle"]
+        monthly_demand_data = sheet_data["monthly_demand"]
+        shift_definitions_data = sheet_data["shift_definitions"]
+        usage_instructions_data = sheet_data["usage_instructions"]
+        final_output_data = sheet_data["final_output"]
         
         # Build response with all sheets
         result = {
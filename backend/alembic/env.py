@@ -11,6 +11,8 @@ import sys
 
 # Add the app directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+# Make migration_helpers importable from the revision scripts
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import Flask app and get metadata from Flask-SQLAlchemy
 from backend.app import create_app
@@ -0,0 +1,304 @@
+"""
+Shared helpers for Alembic migration scripts.
+
+Lives next to env.py rather than in versions/, because Alembic treats every
+module in versions/ as a revision script. env.py puts this directory on
+sys.path, so migrations can ``from migration_helpers import ...`` inside
+upgrade()/downgrade().
+
+The ensure_* guards make a migration idempotent: each one checks the live
+schema and only issues DDL when the object is missing. Reflection results are
+cached per connection, and a single `alembic upgrade` run shares one
+connection across every revision it applies, so each table is reflected at
+most once per run unless something invalidates it.
+"""
+
+from contextlib import contextmanager
+
+from alembic import op
+from sqlalchemy import inspect, text
+
+
+class _SchemaCache:
+    """Reflected table/column/index/FK names for one connection."""
+
+    def __init__(self, bind):
+        self.bind = bind
+        self.inspector = inspect(bind)
+        self.tables = None
+        self.columns = {}
+        self.indexes = {}
+        self.foreign_keys = {}
+        if bind.dialect.name == 'sqlite':
+            self._load_sqlite_catalog()
+
+    def _load_sqlite_catalog(self):
+        """Prime tables, columns and index names from sqlite_master in two queries.
+
+        The inspector would issue PRAGMA table_info / index_list per table.
+        Column entries carry name, type (declared type string), nullable,
+        default and primary_key; tables invalidated later are re-reflected
+        through the inspector.
+        """
+        self.tables = set()
+        rows = self.bind.execute(text(
+            "SELECT type, name, tbl_name FROM sqlite_master "
+            "WHERE type IN ('table', 'index') AND name NOT LIKE 'sqlite_%'"
+        ))
+        for type_, name, tbl_name in rows:
+            if type_ == 'table':
+                self.tables.add(name)
+                self.columns.setdefault(name, {})
+                self.indexes.setdefault(name, set())
+            else:
+                self.indexes.setdefault(tbl_name, set()).add(name)
+
+        # Table-valued pragma_table_info needs SQLite 3.16+
+        if self.bind.dialect.server_version_info < (3, 16, 0):
+            self.columns = {}
+            return
+        rows = self.bind.execute(text(
+            'SELECT m.name, p.name, p.type, p."notnull", p.dflt_value, p.pk '
+            "FROM sqlite_master m JOIN pragma_table_info(m.name) p "
+            "WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'"
+        ))
+        for table_name, name, type_, notnull, default, pk in rows:
+            self.columns.setdefault(table_name, {})[name] = {
+                'name': name,
+                'type': type_,
+                'nullable': not notnull,
+                'default': default,
+                'primary_key': pk,
+            }
+
+
+# id(bind) -> _SchemaCache
+_caches = {}
+
+
+def _cache():
+    bind = op.get_bind()
+    cache = _caches.get(id(bind))
+    if cache is None or cache.bind is not bind:
+        cache = _SchemaCache(bind)
+        _caches[id(bind)] = cache
+    return cache
+
+
+def invalidate(table_name=None):
+    """Forget reflected state after DDL the helpers didn't issue themselves.
+
+    With no table name the whole cache for the current connection is dropped.
+    """
+    if table_name is None:
+        _caches.pop(id(op.get_bind()), None)
+        return
+    cache = _cache()
+    cache.inspector = inspect(cache.bind)
+    cache.columns.pop(table_name, None)
+    cache.indexes.pop(table_name, None)
+    cache.foreign_keys.pop(table_name, None)
+
+
+def table_exists(table_name):
+    cache = _cache()
+    if cache.tables is None:
+        cache.tables = set(cache.inspector.get_table_names())
+    return table_name in cache.tables
+
+
+def get_columns(table_name):
+    """Return ``{name: column_info}`` for table_name."""
+    cache = _cache()
+    columns = cache.columns.get(table_name)
+    if columns is None:
+        columns = {col['name']: col for col in cache.inspector.get_columns(table_name)}
+        cache.columns[table_name] = columns
+    return columns
+
+
+def get_index_names(table_name):
+    cache = _cache()
+    names = cache.indexes.get(table_name)
+    if names is None:
+        names = {idx['name'] for idx in cache.inspector.get_indexes(table_name)}
+        cache.indexes[table_name] = names
+    return names
+
+
+def _get_foreign_key_names(table_name):
+    cache = _cache()
+    names = cache.foreign_keys.get(table_name)
+    if names is None:
+        names = {fk['name'] for fk in cache.inspector.get_foreign_keys(table_name) if fk.get('name')}
+        cache.foreign_keys[table_name] = names
+    return names
+
+
+def ensure_table(table_name, *elements):
+    """Create table_name from columns/constraints if it doesn't exist. Returns True if created."""
+    if table_exists(table_name):
+        return False
+    op.create_table(table_name, *elements)
+    invalidate(table_name)
+    # A table we just created has no named indexes yet, so later
+    # ensure_index() calls on it never need to reflect it
+    cache = _cache()
+    cache.tables.add(table_name)
+    cache.indexes[table_name] = set()
+    return True
+
+
+def ensure_column(table_name, column):
+    """Add column to table_name if missing. Returns True if it was added."""
+    if column.name in get_columns(table_name):
+        print(f"Column {table_name}.{column.name} already exists, skipping add_column")
+        return False
+    op.add_column(table_name, column)
+    invalidate(table_name)
+    return True
+
+
+def ensure_index(index_name, table_name, columns, unique=False):
+    """Create index_name on table_name if missing. Returns True if it was created."""
+    names = get_index_names(table_name)
+    if index_name in names:
+        return False
+    op.create_index(index_name, table_name, columns, unique=unique)
+    names.add(index_name)
+    return True
+
+
+def drop_index_if_exists(index_name, table_name):
+    """Drop index_name from table_name if present. Returns True if it was dropped."""
+    names = get_index_names(table_name)
+    if index_name not in names:
+        return False
+    op.drop_index(index_name, table_name=table_name)
+    names.discard(index_name)
+    return True
+
+
+def ensure_fk(fk_name, source_table, referent_table, local_cols, remote_cols):
+    """Create a named foreign key if missing. Returns True if it was created.
+
+    SQLite can only add constraints through batch mode (a full table
+    rebuild), so there the constraint is skipped rather than failing the
+    migration; the models still declare it for new databases.
+    """
+    if not table_exists(referent_table):
+        print(f"Table {referent_table} not found, skipping foreign key {fk_name}")
+        return False
+    if fk_name in _get_foreign_key_names(source_table):
+        return False
+    if op.get_bind().dialect.name == 'sqlite':
+        print(f"SQLite cannot ALTER constraints, skipping foreign key {fk_name}")
+        return False
+    op.create_foreign_key(fk_name, source_table, referent_table, local_cols, remote_cols)
+    _get_foreign_key_names(source_table).add(fk_name)
+    return True
+
+
+def backfill_from_lookup(table_name, column, key_column, source_table, source_key,
+                         source_column, placeholder='', batch_size=30000):
+    """Copy source_table.source_column onto table_name.column, matched on key.
+
+    Sets ``table_name.column = source_table.source_column`` wherever
+    ``table_name.key_column = source_table.source_key``, using one JOIN-based
+    UPDATE where the dialect supports it. SQLite older than 3.33 has no
+    UPDATE ... FROM, so there it pages through rowid windows of batch_size
+    rows instead. A temporary covering index on (source_key, source_column)
+    keeps each lookup index-only and is dropped again afterwards.
+
+    Rows with no matching source row keep the placeholder value; their count
+    is printed and returned.
+    """
+    tmp_index = f'tmp_{source_table}_{source_column}'[:60]
+    ensure_index(tmp_index, source_table, [source_key, source_column])
+    try:
+        _run_lookup_backfill(table_name, column, key_column, source_table,
+                             source_key, source_column, batch_size)
+    finally:
+        drop_index_if_exists(tmp_index, source_table)
+
+    unmatched = op.get_bind().execute(
+        text(f"SELECT COUNT(*) FROM {table_name} WHERE {column} = :placeholder"),
+        {'placeholder': placeholder},
+    ).scalar()
+    if unmatched:
+        print(f"{unmatched} {table_name} row(s) had no matching {source_table} row; "
+              f"{table_name}.{column} left as {placeholder!r}")
+    return unmatched
+
+
+def _run_lookup_backfill(table_name, column, key_column, source_table,
+                         source_key, source_column, batch_size):
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    version = bind.dialect.server_version_info or ()
+
+    if dialect == 'mysql':
+        op.execute(f"""
+            UPDATE {table_name}
+            JOIN {source_table} src ON src.{source_key} = {table_name}.{key_column}
+            SET {table_name}.{column} = src.{source_column}
+        """)
+        return
+
+    if dialect != 'sqlite' or tuple(version) >= (3, 33, 0):
+        op.execute(f"""
+            UPDATE {table_name}
+            SET {column} = src.{source_column}
+            FROM {source_table} src
+            WHERE src.{source_key} = {table_name}.{key_column}
+        """)
+        return
+
+    # Old SQLite: page through rowid windows and commit each one so a large
+    # table doesn't build up one huge transaction. One prepared statement,
+    # executed once per window (executemany)
+    stmt = text(f"""
+        UPDATE {table_name}
+        SET {column} = COALESCE((
+            SELECT {source_column}
+            FROM {source_table}
+            WHERE {source_table}.{source_key} = {table_name}.{key_column}
+            LIMIT 1
+        ), {column})
+        WHERE rowid >= :lo AND rowid < :hi
+    """)
+    max_rowid = bind.execute(text(f"SELECT COALESCE(MAX(rowid), 0) FROM {table_name}")).scalar()
+    windows = [
+        {"lo": lo, "hi": lo + batch_size}
+        for lo in range(0, max_rowid + 1, batch_size)
+    ]
+    with op.get_context().autocommit_block():
+        op.get_bind().execute(stmt, windows)
+
+
+@contextmanager
+def sqlite_ddl_batch():
+    """Run the enclosed DDL as one explicit SQLite transaction.
+
+    Without this each CREATE INDEX is committed (and its WAL frames synced)
+    separately. Automatic WAL checkpoints are paused for the batch and the
+    previous setting restored afterwards. Other dialects run the block as-is.
+    """
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        yield
+        return
+
+    with op.get_context().autocommit_block():
+        autocheckpoint = bind.execute(text("PRAGMA wal_autocheckpoint")).scalar()
+        op.execute("PRAGMA wal_autocheckpoint=0")
+        try:
+            op.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except Exception:
+                op.execute("ROLLBACK")
+                raise
+            op.execute("COMMIT")
+        finally:
+            op.execute(f"PRAGMA wal_autocheckpoint={int(autocheckpoint)}")
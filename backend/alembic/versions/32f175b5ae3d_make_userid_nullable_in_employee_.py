@@ -15,18 +15,168 @@ down_revision = 'add_employee_id_users'
 branch_labels = None
 depends_on = None
 
+# Explicit column list for the table copy, so a column-order difference
+# between environments can never shift data into the wrong column
+EMPLOYEE_MAPPING_COLUMNS = (
+    "mappingID, userID, tenantID, sheets_identifier, sheets_name_id, "
+    "employee_sheet_name, schedule_def_id, created_at, updated_at, is_active"
+)
+
+# Rows per copy window on SQLite; each window is its own transaction
+COPY_BATCH_SIZE = 50000
+
+
+def _create_new_table_sql(userid_nullable):
+    userid_null = "" if userid_nullable else " NOT NULL"
+    return f"""
+        CREATE TABLE employee_mappings_new (
+            mappingID VARCHAR(36) NOT NULL,
+            userID VARCHAR(36){userid_null},
+            tenantID VARCHAR(36) NOT NULL,
+            sheets_identifier VARCHAR(255) NOT NULL,
+            sheets_name_id VARCHAR(255),
+            employee_sheet_name VARCHAR(255),
+            schedule_def_id VARCHAR(36),
+            created_at DATETIME NOT NULL,
+            updated_at DATETIME,
+            is_active BOOLEAN NOT NULL,
+            PRIMARY KEY (mappingID),
+            FOREIGN KEY (schedule_def_id) REFERENCES schedule_definitions(scheduleDefID),
+            FOREIGN KEY (tenantID) REFERENCES tenants(tenantID),
+            FOREIGN KEY (userID) REFERENCES users(userID)
+        )
+    """
+
+
+def _swap_and_index():
+    op.execute("DROP TABLE employee_mappings")
+    op.execute("ALTER TABLE employee_mappings_new RENAME TO employee_mappings")
+    # Recreate indexes
+    op.create_index('ix_employee_mappings_schedule_def_id', 'employee_mappings', ['schedule_def_id'], unique=False)
+    op.create_index('ix_employee_mappings_sheets_identifier', 'employee_mappings', ['sheets_identifier'], unique=False)
+    op.create_index('ix_employee_mappings_tenantID', 'employee_mappings', ['tenantID'], unique=False)
+    op.create_index('ix_employee_mappings_userID', 'employee_mappings', ['userID'], unique=True)
+    op.create_index('ix_em_user_active_cover', 'employee_mappings', ['userID', 'is_active', 'sheets_identifier'], unique=False)
+
+
+def _in_transaction(fn, *args):
+    """Run fn inside an explicit BEGIN IMMEDIATE ... COMMIT (SQLite, autocommit mode)."""
+    op.execute("BEGIN IMMEDIATE")
+    try:
+        result = fn(*args)
+    except Exception:
+        op.execute("ROLLBACK")
+        raise
+    op.execute("COMMIT")
+    return result
+
+
+def _copy_window(conn, after_id):
+    """Copy the next COPY_BATCH_SIZE rows after after_id; returns (rows copied, last mappingID).
+
+    Keyset windows in primary-key order mean every insert appends to the end
+    of the new table's mappingID index instead of landing on a random page.
+    """
+    result = conn.execute(sa.text(f"""
+        INSERT INTO employee_mappings_new ({EMPLOYEE_MAPPING_COLUMNS})
+        SELECT {EMPLOYEE_MAPPING_COLUMNS} FROM employee_mappings
+        WHERE mappingID > :after_id
+        ORDER BY mappingID
+        LIMIT :limit
+    """), {"after_id": after_id, "limit": COPY_BATCH_SIZE})
+    last_id = conn.execute(sa.text("SELECT MAX(mappingID) FROM employee_mappings_new")).scalar()
+    return result.rowcount, last_id
+
+
+def _verify_copy(conn):
+    """Postcheck before the original table is dropped."""
+    source_count = conn.execute(sa.text("SELECT COUNT(*) FROM employee_mappings")).scalar()
+    copied_count = conn.execute(sa.text("SELECT COUNT(*) FROM employee_mappings_new")).scalar()
+    if source_count != copied_count:
+        raise RuntimeError(
+            f"employee_mappings copy incomplete: {copied_count} of {source_count} rows copied"
+        )
+    result = conn.execute(sa.text("PRAGMA integrity_check")).scalar()
+    if result != 'ok':
+        raise RuntimeError(f"Integrity check failed after copying employee_mappings: {result}")
+
+
+def _recreate_employee_mappings(conn, userid_nullable):
+    """Rebuild employee_mappings with the requested userID nullability.
+
+    On SQLite this runs outside Alembic's own transaction (journal_mode can't
+    change inside one) under WAL + synchronous=NORMAL, with foreign key
+    checks off. Rows are copied in committed primary-key windows into a table with
+    no secondary indexes, so the page cache never has to hold the whole table
+    and no index is maintained per row; the old table is only dropped once
+    every window has landed and the copy passes its postcheck.
+    """
+    create_sql = _create_new_table_sql(userid_nullable)
+    copy_all_sql = f"""
+        INSERT INTO employee_mappings_new ({EMPLOYEE_MAPPING_COLUMNS})
+        SELECT {EMPLOYEE_MAPPING_COLUMNS} FROM employee_mappings
+    """
+
+    if conn.dialect.name != 'sqlite':
+        op.execute(create_sql)
+        # Copy data (including NULL userID values if any)
+        op.execute(copy_all_sql)
+        _swap_and_index()
+        return
+
+    with op.get_context().autocommit_block():
+        journal_mode = conn.execute(sa.text("PRAGMA journal_mode")).scalar()
+        synchronous = conn.execute(sa.text("PRAGMA synchronous")).scalar()
+        foreign_keys = conn.execute(sa.text("PRAGMA foreign_keys")).scalar()
+        temp_store = conn.execute(sa.text("PRAGMA temp_store")).scalar()
+        cache_size = conn.execute(sa.text("PRAGMA cache_size")).scalar()
+        op.execute("PRAGMA journal_mode=WAL")
+        op.execute("PRAGMA synchronous=NORMAL")
+        op.execute("PRAGMA cache_spill=ON")
+        # Both tables are swapped wholesale, so per-row FK checks during the copy are wasted work
+        op.execute("PRAGMA foreign_keys=OFF")
+        try:
+            # Leftover from an interrupted run; the original table is untouched
+            op.execute("DROP TABLE IF EXISTS employee_mappings_new")
+            op.execute(create_sql)
+
+            # Copy data (including NULL userID values if any)
+            total = conn.execute(sa.text("SELECT COUNT(*) FROM employee_mappings")).scalar()
+            last_id = ''
+            copied = 0
+            while True:
+                rows, last_id = _in_transaction(_copy_window, conn, last_id)
+                if not rows:
+                    break
+                copied += rows
+                print(f"Copied {copied} of {total} employee_mappings rows")
+
+            _verify_copy(conn)
+
+            # Indexes are built after the copy; keep the external sort for
+            # the UNIQUE userID index in memory, then refresh planner stats
+            op.execute("PRAGMA temp_store=MEMORY")
+            op.execute("PRAGMA cache_size=-200000")
+            _in_transaction(_swap_and_index)
+            op.execute("ANALYZE employee_mappings")
+        finally:
+            op.execute(f"PRAGMA cache_size={int(cache_size)}")
+            op.execute(f"PRAGMA temp_store={int(temp_store)}")
+            op.execute(f"PRAGMA synchronous={int(synchronous)}")
+            op.execute(f"PRAGMA journal_mode={journal_mode}")
+            op.execute(f"PRAGMA foreign_keys={int(foreign_keys)}")
+
 
 def upgrade() -> None:
     # SQLite doesn't support ALTER COLUMN directly, so we need to use a workaround
     # For SQLite, we'll use a table recreation approach
-    from sqlalchemy import inspect
     from alembic import context
+    from migration_helpers import get_columns, invalidate
     
     conn = context.get_bind()
-    inspector = inspect(conn)
     
     # Check if userID column exists and is currently NOT NULL
-    existing_columns = {col['name']: col for col in inspector.get_columns('employee_mappings')}
+    existing_columns = get_columns('employee_mappings')
     
     if 'userID' in existing_columns:
         userid_col = existing_columns['userID']
@@ -35,58 +185,21 @@ def upgrade() -> None:
             print("userID column is already nullable, skipping migration")
             return
         
-        # SQLite workaround: We need to recreate the table
-        # Step 1: Create new table with nullable userID
-        op.execute("""
-            CREATE TABLE employee_mappings_new (
-                mappingID VARCHAR(36) NOT NULL,
-                userID VARCHAR(36),
-                tenantID VARCHAR(36) NOT NULL,
-                sheets_identifier VARCHAR(255) NOT NULL,
-                sheets_name_id VARCHAR(255),
-                employee_sheet_name VARCHAR(255),
-                schedule_def_id VARCHAR(36),
-                created_at DATETIME NOT NULL,
-                updated_at DATETIME,
-                is_active BOOLEAN NOT NULL,
-                PRIMARY KEY (mappingID),
-                UNIQUE (mappingID),
-                FOREIGN KEY (schedule_def_id) REFERENCES schedule_definitions(scheduleDefID),
-                FOREIGN KEY (tenantID) REFERENCES tenants(tenantID),
-                FOREIGN KEY (userID) REFERENCES users(userID)
-            )
-        """)
-        
-        # Step 2: Copy data (including NULL userID values if any)
-        op.execute("""
-            INSERT INTO employee_mappings_new 
-            SELECT * FROM employee_mappings
-        """)
-        
-        # Step 3: Drop old table
-        op.execute("DROP TABLE employee_mappings")
-        
-        # Step 4: Rename new table
-        op.execute("ALTER TABLE employee_mappings_new RENAME TO employee_mappings")
-        
-        # Step 5: Recreate indexes
-        op.create_index('ix_employee_mappings_schedule_def_id', 'employee_mappings', ['schedule_def_id'], unique=False)
-        op.create_index('ix_employee_mappings_sheets_identifier', 'employee_mappings', ['sheets_identifier'], unique=False)
-        op.create_index('ix_employee_mappings_tenantID', 'employee_mappings', ['tenantID'], unique=False)
-        op.create_index('ix_employee_mappings_userID', 'employee_mappings', ['userID'], unique=True)
+        # SQLite workaround: We need to recreate the table with nullable userID
+        _recreate_employee_mappings(conn, userid_nullable=True)
+        invalidate('employee_mappings')
     else:
         print("userID column not found, skipping migration")
 
 
 def downgrade() -> None:
     # Reverse: Make userID NOT NULL again
-    from sqlalchemy import inspect
     from alembic import context
+    from migration_helpers import get_columns, invalidate
     
     conn = context.get_bind()
-    inspector = inspect(conn)
     
-    existing_columns = {col['name']: col for col in inspector.get_columns('employee_mappings')}
+    existing_columns = get_columns('employee_mappings')
     
     if 'userID' in existing_columns:
         userid_col = existing_columns['userID']
@@ -103,37 +216,6 @@ def downgrade() -> None:
         if null_count > 0:
             raise ValueError(f"Cannot downgrade: {null_count} rows have NULL userID. Please set userID for all rows first.")
         
-        # Create new table with NOT NULL userID
-        op.execute("""
-            CREATE TABLE employee_mappings_new (
-                mappingID VARCHAR(36) NOT NULL,
-                userID VARCHAR(36) NOT NULL,
-                tenantID VARCHAR(36) NOT NULL,
-                sheets_identifier VARCHAR(255) NOT NULL,
-                sheets_name_id VARCHAR(255),
-                employee_sheet_name VARCHAR(255),
-                schedule_def_id VARCHAR(36),
-                created_at DATETIME NOT NULL,
-                updated_at DATETIME,
-                is_active BOOLEAN NOT NULL,
-                PRIMARY KEY (mappingID),
-                UNIQUE (mappingID),
-                FOREIGN KEY (schedule_def_id) REFERENCES schedule_definitions(scheduleDefID),
-                FOREIGN KEY (tenantID) REFERENCES tenants(tenantID),
-                FOREIGN KEY (userID) REFERENCES users(userID)
-            )
-        """)
-        
-        op.execute("""
-            INSERT INTO employee_mappings_new 
-            SELECT * FROM employee_mappings
-        """)
-        
-        op.execute("DROP TABLE employee_mappings")
-        op.execute("ALTER TABLE employee_mappings_new RENAME TO employee_mappings")
-        
-        # Recreate indexes
-        op.create_index('ix_employee_mappings_schedule_def_id', 'employee_mappings', ['schedule_def_id'], unique=False)
-        op.create_index('ix_employee_mappings_sheets_identifier', 'employee_mappings', ['sheets_identifier'], unique=False)
-        op.create_index('ix_employee_mappings_tenantID', 'employee_mappings', ['tenantID'], unique=False)
-        op.create_index('ix_employee_mappings_userID', 'employee_mappings', ['userID'], unique=True)
+        # Recreate table with NOT NULL userID
+        _recreate_employee_mappings(conn, userid_nullable=False)
+        invalidate('employee_mappings')
@@ -15,55 +15,78 @@ down_revision = '0d13865987f1'  # Update this to the latest migration
 branch_labels = None
 depends_on = None
 
+# Users per backfill window; each window commits on its own
+BACKFILL_BATCH_SIZE = 10000
+
+# SQLite-compatible syntax
+BACKFILL_SQL = """
+    UPDATE users
+    SET employee_id = (
+        SELECT em.sheets_identifier
+        FROM employee_mappings em
+        WHERE em.userID = users.userID
+        AND em.is_active = 1
+        LIMIT 1
+    )
+    WHERE employee_id IS NULL
+    AND EXISTS (
+        SELECT 1
+        FROM employee_mappings em
+        WHERE em.userID = users.userID
+        AND em.is_active = 1
+    )
+"""
+
+
+def _backfill_employee_id(conn):
+    """Copy the active mapping's sheets_identifier into users.employee_id.
+
+    The (userID, is_active, sheets_identifier) covering index turns the
+    per-user subquery into an index-only lookup; it is kept afterwards since
+    EmployeeMapping.find_by_user() filters on the same columns. On SQLite the
+    update runs in rowid windows outside the migration transaction so write
+    locks and the WAL stay small on large tenants.
+    """
+    from migration_helpers import ensure_index
+
+    ensure_index('ix_em_user_active_cover', 'employee_mappings',
+                 ['userID', 'is_active', 'sheets_identifier'])
+
+    if conn.dialect.name != 'sqlite':
+        op.execute(BACKFILL_SQL)
+        return
+
+    # One prepared statement, executed once per window (executemany)
+    stmt = sa.text(BACKFILL_SQL + " AND rowid >= :lo AND rowid < :hi")
+    max_rowid = conn.execute(sa.text("SELECT COALESCE(MAX(rowid), 0) FROM users")).scalar()
+    windows = [
+        {"lo": lo, "hi": lo + BACKFILL_BATCH_SIZE}
+        for lo in range(0, max_rowid + 1, BACKFILL_BATCH_SIZE)
+    ]
+    with op.get_context().autocommit_block():
+        op.get_bind().execute(stmt, windows)
+
 
 def upgrade():
-    from sqlalchemy import inspect
     from alembic import context
-    
+    from migration_helpers import ensure_column, ensure_index
+
     conn = context.get_bind()
-    inspector = inspect(conn)
-    
-    # Check if column already exists
-    existing_columns = [col['name'] for col in inspector.get_columns('users')]
-    
-    if 'employee_id' not in existing_columns:
-        # Add employee_id column to users table
-        op.add_column('users', sa.Column('employee_id', sa.String(255), nullable=True))
-        
+
+    if ensure_column('users', sa.Column('employee_id', sa.String(255), nullable=True)):
         # Migrate existing data: Copy sheets_identifier from EmployeeMapping to User.employee_id
         # This ensures existing users get their employee_id set
-        # SQLite-compatible syntax
-        op.execute("""
-            UPDATE users 
-            SET employee_id = (
-                SELECT em.sheets_identifier 
-                FROM employee_mappings em 
-                WHERE em.userID = users.userID 
-                AND em.is_active = 1 
-                LIMIT 1
-            )
-            WHERE EXISTS (
-                SELECT 1 
-                FROM employee_mappings em 
-                WHERE em.userID = users.userID 
-                AND em.is_active = 1
-            )
-        """)
-    else:
-        print("Column employee_id already exists, skipping add_column")
-    
-    # Check if index already exists
-    existing_indexes = [idx['name'] for idx in inspector.get_indexes('users')]
-    
-    if 'ix_users_employee_id' not in existing_indexes:
-        # Create index for faster lookups
-        op.create_index('ix_users_employee_id', 'users', ['employee_id'], unique=True)
-    else:
-        print("Index ix_users_employee_id already exists, skipping create_index")
+        _backfill_employee_id(conn)
+
+    # Create index for faster lookups
+    ensure_index('ix_users_employee_id', 'users', ['employee_id'], unique=True)
 
 
 def downgrade():
-    # Drop index
+    from migration_helpers import drop_index_if_exists
+
+    # Drop indexes; the covering index only exists if upgrade() ran the backfill
+    drop_index_if_exists('ix_em_user_active_cover', 'employee_mappings')
     op.drop_index('ix_users_employee_id', table_name='users')
     
     # Drop column
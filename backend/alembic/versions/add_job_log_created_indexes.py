@@ -0,0 +1,35 @@
+"""Add created_at indexes to schedule_job_logs
+
+Revision ID: add_job_log_created_idx
+Revises: add_schedule_def_created_idx
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'add_job_log_created_idx'
+down_revision = 'add_schedule_def_created_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    from migration_helpers import ensure_index, table_exists, sqlite_ddl_batch
+
+    # Table is created by the app models; nothing to do if it's missing
+    if not table_exists('schedule_job_logs'):
+        return
+
+    # ORDER BY created_at DESC LIMIT n becomes a backward range scan, with or
+    # without the tenant filter
+    with sqlite_ddl_batch():
+        ensure_index('ix_sjl_tenant_created', 'schedule_job_logs', ['tenantID', 'created_at'])
+        ensure_index('ix_sjl_created', 'schedule_job_logs', ['created_at'])
+
+
+def downgrade() -> None:
+    from migration_helpers import drop_index_if_exists, table_exists
+
+    if table_exists('schedule_job_logs'):
+        drop_index_if_exists('ix_sjl_created', 'schedule_job_logs')
+        drop_index_if_exists('ix_sjl_tenant_created', 'schedule_job_logs')
@@ -0,0 +1,31 @@
+"""Add (tenantID, startTime, logID) index to schedule_job_logs
+
+Revision ID: add_job_log_tenant_start_idx
+Revises: add_shift_value_cached
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'add_job_log_tenant_start_idx'
+down_revision = 'add_shift_value_cached'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    from migration_helpers import ensure_index, table_exists
+
+    # Table is created by the app models; nothing to do if it's missing
+    if not table_exists('schedule_job_logs'):
+        return
+
+    # Newest-first job log listing per tenant, with logID as the keyset tie-breaker
+    ensure_index('ix_schedulejoblog_tenant_start', 'schedule_job_logs', ['tenantID', 'startTime', 'logID'])
+
+
+def downgrade() -> None:
+    from migration_helpers import drop_index_if_exists, table_exists
+
+    if table_exists('schedule_job_logs'):
+        drop_index_if_exists('ix_schedulejoblog_tenant_start', 'schedule_job_logs')
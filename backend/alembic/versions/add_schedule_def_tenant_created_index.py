@@ -0,0 +1,32 @@
+"""Add (tenantID, created_at, scheduleDefID) index to schedule_definitions
+
+Revision ID: add_schedule_def_created_idx
+Revises: add_job_log_tenant_start_idx
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'add_schedule_def_created_idx'
+down_revision = 'add_job_log_tenant_start_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    from migration_helpers import ensure_index, table_exists
+
+    # Table is created by the app models; nothing to do if it's missing
+    if not table_exists('schedule_definitions'):
+        return
+
+    # Newest-first definition listing per tenant, with scheduleDefID as the
+    # keyset tie-breaker; the DESC order is served by a backward index scan
+    ensure_index('ix_schedule_def_tenant_created', 'schedule_definitions', ['tenantID', 'created_at', 'scheduleDefID'])
+
+
+def downgrade() -> None:
+    from migration_helpers import drop_index_if_exists, table_exists
+
+    if table_exists('schedule_definitions'):
+        drop_index_if_exists('ix_schedule_def_tenant_created', 'schedule_definitions')
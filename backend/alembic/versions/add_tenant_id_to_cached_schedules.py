@@ -16,50 +16,51 @@ branch_labels = None
 depends_on = None
 
 
+def _drop_placeholder_default(conn) -> None:
+    """Drop the '' server default once tenant_id is populated.
+
+    This is a metadata-only ALTER on MySQL/PostgreSQL. SQLite can't drop a
+    default without rebuilding the table, so there it stays; the ORM always
+    supplies tenant_id on insert.
+    """
+    if conn.dialect.name == 'sqlite':
+        return
+    op.alter_column('cached_schedules', 'tenant_id', server_default=None,
+                    existing_type=sa.String(length=36), existing_nullable=False)
+
+
+def _backfill_tenant_id() -> None:
+    """Copy tenantID from schedule_definitions onto every cached_schedules row."""
+    from migration_helpers import backfill_from_lookup
+
+    backfill_from_lookup('cached_schedules', 'tenant_id', 'schedule_def_id',
+                         'schedule_definitions', 'scheduleDefID', 'tenantID')
+
+
 def upgrade() -> None:
-    # Check if cached_schedules table exists
-    from sqlalchemy import inspect
     from alembic import context
-    
+    from migration_helpers import ensure_column, ensure_fk, ensure_index, table_exists
+
     conn = context.get_bind()
-    inspector = inspect(conn)
-    existing_tables = inspector.get_table_names()
-    
-    if 'cached_schedules' in existing_tables:
-        existing_columns = [col['name'] for col in inspector.get_columns('cached_schedules')]
-        if 'tenant_id' not in existing_columns:
-            # Add tenant_id column (nullable first, then populate, then make NOT NULL)
-            op.add_column('cached_schedules', 
-                         sa.Column('tenant_id', sa.String(length=36), nullable=True))
-            
-            # Populate tenant_id from schedule_definitions
-            op.execute("""
-                UPDATE cached_schedules 
-                SET tenant_id = (
-                    SELECT tenantID 
-                    FROM schedule_definitions 
-                    WHERE schedule_definitions.scheduleDefID = cached_schedules.schedule_def_id
-                    LIMIT 1
-                )
-            """)
-            
-            # Create foreign key constraint
-            try:
-                op.create_foreign_key('fk_cached_schedules_tenant_id', 'cached_schedules', 'tenants', 
-                                     ['tenant_id'], ['tenantID'])
-            except Exception:
-                # Foreign key might already exist or tenants table might not exist yet
-                pass
-            
-            # Create index
-            try:
-                op.create_index('ix_cached_schedules_tenant_id', 'cached_schedules', ['tenant_id'])
-            except Exception:
-                # Index might already exist
-                pass
-            
-            # Make tenant_id NOT NULL after populating
-            op.alter_column('cached_schedules', 'tenant_id', nullable=False)
+
+    # This migration assumes cached_schedules exists; nothing to do otherwise
+    if not table_exists('cached_schedules'):
+        return
+
+    # Add tenant_id as NOT NULL with a placeholder default, then populate it.
+    # Going nullable -> populate -> NOT NULL would need a second ALTER (a full
+    # table rebuild on SQLite) just to flip nullability.
+    tenant_id = sa.Column('tenant_id', sa.String(length=36), nullable=False, server_default=sa.text("''"))
+    if not ensure_column('cached_schedules', tenant_id):
+        return
+
+    # Populate tenant_id from schedule_definitions
+    _backfill_tenant_id()
+
+    ensure_fk('fk_cached_schedules_tenant_id', 'cached_schedules', 'tenants', ['tenant_id'], ['tenantID'])
+    ensure_index('ix_cached_schedules_tenant_id', 'cached_schedules', ['tenant_id'])
+
+    _drop_placeholder_default(conn)
 
 
 def downgrade() -> None:
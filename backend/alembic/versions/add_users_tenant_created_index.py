@@ -0,0 +1,33 @@
+"""Add (tenantID, created_at, userID) index to users
+
+Revision ID: add_users_tenant_created_idx
+Revises: add_job_log_created_idx
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'add_users_tenant_created_idx'
+down_revision = 'add_job_log_created_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    from migration_helpers import ensure_index, table_exists, sqlite_ddl_batch
+
+    # Table is created by the app models; nothing to do if it's missing
+    if not table_exists('users'):
+        return
+
+    # The tenant user listing orders by (created_at, userID) DESC and pages
+    # with a keyset cursor on the same columns
+    with sqlite_ddl_batch():
+        ensure_index('ix_users_tenant_created', 'users', ['tenantID', 'created_at', 'userID'])
+
+
+def downgrade() -> None:
+    from migration_helpers import drop_index_if_exists, table_exists
+
+    if table_exists('users'):
+        drop_index_if_exists('ix_users_tenant_created', 'users')
@@ -7,6 +7,7 @@ import os
 import pymysql
 from .extensions import db, jwt, cors, init_celery
 from .utils.logger import configure_logging
+from .utils.json_provider import OrjsonProvider, ORJSON_AVAILABLE
 pymysql.install_as_MySQLdb()
 from .routes.common_routes import common_bp
 from .routes.auth import auth_bp
@@ -27,6 +28,19 @@ from .routes.alert_routes import alert_bp
 from .routes.diagnostic_routes import diagnostic_bp
 from .services.celery_tasks import bind_celery, register_periodic_tasks, register_schedule_execution_task
 
+# Hard-set CORS allowed origins to match frontend
+CORS_ALLOWED_ORIGINS = ("http://localhost:5173", "http://127.0.0.1:5173")
+
+# Static CORS headers stamped onto every response by after_request_cors; only
+# Access-Control-Allow-Origin depends on the request. Max-Age lets browsers
+# reuse a preflight for a day instead of re-sending OPTIONS every hour
+_CORS_HEADERS = {
+    "Access-Control-Allow-Credentials": "true",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization",
+    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+    "Access-Control-Max-Age": "86400",
+}
+
 
 def register_blueprints(app: Flask) -> None:
     import sys
@@ -86,12 +100,12 @@ def create_app(config_object: type[Config] | None = None):
     app = Flask(__name__)
     app.config.from_object(config_object or Config)
 
-    # Hard-set CORS allowed origins to match frontend
-    allowed_origins = [
-        "http://localhost:5173",
-        "http://127.0.0.1:5173"
-    ]
-    app.config["CORS_ALLOWED_ORIGINS"] = allowed_origins
+    # Serialize every jsonify() response with orjson when it's installed
+    if ORJSON_AVAILABLE:
+        app.json_provider_class = OrjsonProvider
+        app.json = OrjsonProvider(app)
+
+    app.config["CORS_ALLOWED_ORIGINS"] = list(CORS_ALLOWED_ORIGINS)
     
     # Phase 1 Diagnostic: Print resolved database URI
     import logging
@@ -255,7 +269,7 @@ def create_app(config_object: type[Config] | None = None):
         # The creator will be used instead of parsing the URI
         # IMPORTANT: For SQLite, we MUST use a creator function to ensure absolute paths work
         # Flask-SQLAlchemy 3.x reads SQLALCHEMY_ENGINE_OPTIONS from config automatically
-        from sqlalchemy.pool import NullPool
+        from sqlalchemy.pool import QueuePool
         
         # CRITICAL FIX: For SQLite with creator, we should use a dummy URI
         # The creator function will handle the actual connection
@@ -265,8 +279,13 @@ def create_app(config_object: type[Config] | None = None):
         
         app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
             'creator': create_connection,  # Use custom creator - this takes precedence over URI
-            'poolclass': NullPool,  # Use NullPool for SQLite (no connection pooling, avoids locking issues)
-            'pool_pre_ping': False,  # Not needed for NullPool
+            # Pooled so a request reuses an open connection instead of paying
+            # connect + directory checks + PRAGMAs every time; WAL and the 20s
+            # busy timeout handle concurrent writers across pooled connections
+            'poolclass': QueuePool,
+            'pool_size': 10,
+            'max_overflow': 10,
+            'pool_pre_ping': False,  # Local file, connections don't go stale
         }
         
         # CRITICAL: Store the normalized URI for reference, but creator will be used
@@ -275,7 +294,7 @@ def create_app(config_object: type[Config] | None = None):
         
         logger.info(f"[DB INIT] Creator function set: {create_connection is not None}")
         logger.info(f"[DB INIT] Creator will use absolute path: {_db_absolute_path}")
-        logger.info(f"[DB INIT] Using NullPool for SQLite (recommended for SQLite)")
+        logger.info(f"[DB INIT] Using QueuePool for SQLite")
         logger.info(f"[DB INIT] Database URI (for dialect detection): {db_uri_normalized}")
         logger.info(f"[DB INIT] NOTE: Creator function will override URI for actual connections")
         
@@ -481,15 +500,10 @@ def create_app(config_object: type[Config] | None = None):
     def _determine_cors_origin() -> str:
         """Determine CORS origin - returns exact match from allowed origins, never wildcard."""
         origin = request.headers.get("Origin")
-        # Hard-set allowed origins to match frontend
-        allowed_origins = [
-            "http://localhost:5173",
-            "http://127.0.0.1:5173"
-        ]
-        if origin and origin in allowed_origins:
+        if origin and origin in CORS_ALLOWED_ORIGINS:
             return origin
         # Return first allowed origin as fallback (never "*")
-        return allowed_origins[0] if allowed_origins else "http://localhost:5173"
+        return CORS_ALLOWED_ORIGINS[0]
 
     # CRITICAL: Add global preflight handler BEFORE blueprint registration
     # This intercepts OPTIONS requests before any route logic runs, preventing 500 errors
@@ -515,11 +529,7 @@ def create_app(config_object: type[Config] | None = None):
     import logging
     logger = logging.getLogger(__name__)
 
-    # Hard-set CORS allowed origins to match frontend
-    cors_allowed_origins = [
-        "http://localhost:5173",
-        "http://127.0.0.1:5173"
-    ]
+    cors_allowed_origins = list(CORS_ALLOWED_ORIGINS)
     app.config["CORS_ALLOWED_ORIGINS"] = cors_allowed_origins
 
     # CRITICAL: Configure CORS with specific origins (NOT wildcard) to support withCredentials
@@ -531,7 +541,8 @@ def create_app(config_object: type[Config] | None = None):
         origins=cors_allowed_origins,
         expose_headers=["Content-Type", "Authorization"],
         allow_headers=["Content-Type", "Authorization"],
-        methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"]
+        methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        max_age=86400
     )
     logger.info(f"[CORS] Backend enforcing origins: {', '.join(cors_allowed_origins)}")
     print(f"[CORS] Backend enforcing origins: {', '.join(cors_allowed_origins)}")
@@ -575,10 +586,7 @@ def create_app(config_object: type[Config] | None = None):
         response.headers["Access-Control-Allow-Origin"] = allow_origin  # Override, don't setdefault
         
         # Ensure other CORS headers are present
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
-        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
-        response.headers["Access-Control-Max-Age"] = "3600"
+        response.headers.update(_CORS_HEADERS)
         
         return response
     
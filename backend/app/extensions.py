@@ -1,4 +1,3 @@
-import platform
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
@@ -33,12 +32,6 @@ def init_celery(app):
     broker_url = app.config.get("CELERY_BROKER_URL") or app.config.get("broker_url", "redis://localhost:6379/0")
     result_backend = app.config.get("CELERY_RESULT_BACKEND") or app.config.get("result_backend", "redis://localhost:6379/1")
 
-    # 🔧 CRITICAL: Ensure environment variables are set to prevent AMQP defaults
-    import os
-    os.environ["CELERY_BROKER_URL"] = broker_url
-    os.environ["CELERY_RESULT_BACKEND"] = result_backend
-    os.environ["CELERY_BROKER_TRANSPORT"] = "redis"  # Explicitly set transport to redis
-
     celery = Celery(
         "projectup",
         broker=broker_url,
@@ -50,45 +43,46 @@ def init_celery(app):
         ]
     )
     
-    # Autodiscover tasks from all task modules
+    # Autodiscover tasks from all task modules. Only the worker imports them
+    # eagerly; API processes defer discovery so a web boot doesn't pull in the
+    # task modules (and their Google API clients) until they're needed.
+    import os
     celery.autodiscover_tasks([
         'app.services.celery_tasks',
         'app.tasks.google_sync',
         'app.tasks.tasks'
-    ], force=True)
+    ], force=bool(os.environ.get("CELERY_WORKER_RUNNING")))
     
     # Store Celery instance in Flask app extensions for easy access
     app.extensions['celery'] = celery
 
     # Use ONLY new-style Celery 5+ configuration keys
     # DO NOT pass entire Flask config as it contains old-style CELERY_* keys
-    # Explicitly set broker_url and result_backend to override any defaults
-    celery.conf.update(
-        broker_url=broker_url,
-        result_backend=result_backend,
+    # Everything goes in through a single update so the config is finalized once;
+    # broker/backend are passed explicitly, so no CELERY_* env vars are needed
+    conf = {
+        "broker_url": broker_url,
+        "result_backend": result_backend,
         # 🔧 CRITICAL: Explicitly set broker_transport to "redis" to prevent AMQP defaults
-        broker_transport="redis",
-        task_serializer="json",
-        accept_content=["json"],
-        result_serializer="json",
-        timezone="Asia/Kolkata",
-        enable_utc=True,
-        task_track_started=True,
-        worker_prefetch_multiplier=1,
-        worker_max_tasks_per_child=1000,
-        result_expires=3600,
-    )
-    
-    # 🔧 FORCE broker URL and transport again to ensure they're not overridden by any defaults
-    celery.conf.broker_url = broker_url
-    celery.conf.result_backend = result_backend
-    celery.conf.broker_transport = "redis"
-    celery.conf.enable_test_tasks = bool(app.config.get("ENABLE_TEST_CELERY_TASKS", False))
-
-    # 🪟 Windows Fix: Use solo pool to prevent PermissionError (WinError 5)
-    # Windows cannot use the prefork pool due to multiprocessing limitations
-    if platform.system() == "Windows":
-        celery.conf.worker_pool = "solo"
+        "broker_transport": "redis",
+        "task_serializer": "json",
+        "accept_content": ["json"],
+        "result_serializer": "json",
+        "timezone": "Asia/Kolkata",
+        "enable_utc": True,
+        "task_track_started": True,
+        "worker_prefetch_multiplier": 1,
+        "worker_max_tasks_per_child": 1000,
+        "result_expires": 3600,
+        "enable_test_tasks": bool(app.config.get("ENABLE_TEST_CELERY_TASKS", False)),
+    }
+
+    # Pool override (e.g. "solo" on Windows) is decided once in Config
+    worker_pool = app.config.get("CELERY_WORKER_POOL")
+    if worker_pool:
+        conf["worker_pool"] = worker_pool
+
+    celery.conf.update(conf)
 
     TaskBase = celery.Task
 
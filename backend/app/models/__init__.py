@@ -5,36 +5,15 @@ from .department import Department
 from .schedule_definition import ScheduleDefinition
 from .schedule_permission import SchedulePermission
 from .schedule_job_log import ScheduleJobLog
-
-# Try to import new models (may not exist yet)
-try:
-    from .employee_mapping import EmployeeMapping
-except ImportError:
-    EmployeeMapping = None
-
-try:
-    from .sheet_cache import CachedSheetData
-except ImportError:
-    CachedSheetData = None
-
-try:
-    from .cached_schedule import CachedSchedule
-except ImportError:
-    CachedSchedule = None
-
-try:
-    from .sync_log import SyncLog
-except ImportError:
-    SyncLog = None
+from .employee_mapping import EmployeeMapping
+from .sheet_cache import CachedSheetData
+from .cached_schedule import CachedSchedule
+from .sync_log import SyncLog
+from .schedule_task import ScheduleTask
 
 # Schedule model removed - not used
 Schedule = None
 
-try:
-    from .schedule_task import ScheduleTask
-except ImportError:
-    ScheduleTask = None
-
 # Legacy alias for backwards compatibility
 SheetCache = CachedSheetData
 
@@ -74,6 +74,57 @@ class Department(db.Model):
             'schedule_definitions_count': self.schedule_definitions.count()
         }
     
+    @classmethod
+    def summary_columns(cls) -> list:
+        """
+        Columns to_dict() reads, for listing departments as plain rows
+        
+        Selecting these with with_entities() skips ORM object hydration;
+        pass the resulting rows to rows_to_dicts().
+        """
+        return [cls.departmentID, cls.tenantID, cls.departmentName, cls.description,
+                cls.is_active, cls.created_at, cls.updated_at]
+    
+    @classmethod
+    def rows_to_dicts(cls, rows) -> List[dict]:
+        """
+        Build to_dict()-shaped dictionaries from summary_columns() rows
+        
+        Schedule definition counts for all rows are fetched in one grouped
+        query instead of one COUNT per department.
+        
+        Args:
+            rows: Rows selected with summary_columns()
+            
+        Returns:
+            List of department dictionaries in row order
+        """
+        from app.models.schedule_definition import ScheduleDefinition
+        
+        department_ids = [row.departmentID for row in rows]
+        counts = {}
+        if department_ids:
+            counts = dict(
+                db.session.query(ScheduleDefinition.departmentID, db.func.count(ScheduleDefinition.scheduleDefID))
+                .filter(ScheduleDefinition.departmentID.in_(department_ids))
+                .group_by(ScheduleDefinition.departmentID)
+                .all()
+            )
+        
+        return [
+            {
+                'departmentID': row.departmentID,
+                'tenantID': row.tenantID,
+                'departmentName': row.departmentName,
+                'description': row.description,
+                'is_active': row.is_active,
+                'created_at': row.created_at.isoformat() if row.created_at else None,
+                'updated_at': row.updated_at.isoformat() if row.updated_at else None,
+                'schedule_definitions_count': counts.get(row.departmentID, 0)
+            }
+            for row in rows
+        ]
+    
     def get_active_schedule_definitions(self) -> List['ScheduleDefinition']:
         """
         Get all active schedule definitions for this department
@@ -119,10 +170,40 @@ class Department(db.Model):
         Returns:
             Department instance or None if not found
         """
-        return cls.query.filter(
+        # lambda_stmt caches the constructed statement, not just its compiled SQL
+        return db.session.execute(db.lambda_stmt(lambda: db.select(cls).where(
             cls.tenantID == tenant_id,
             db.func.lower(cls.departmentName) == db.func.lower(department_name)
-        ).first()
+        ).limit(1))).scalars().first()
+    
+    @classmethod
+    def name_exists(cls, tenant_id: str, department_name: str, exclude_id: str = None) -> bool:
+        """
+        Check whether a department name is taken within a tenant (case-insensitive)
+        
+        Runs a single EXISTS query without loading the matching department.
+        
+        Args:
+            tenant_id: ID of the tenant
+            department_name: Name of the department to check
+            exclude_id: Department ID to ignore (the one being renamed)
+            
+        Returns:
+            True if another department already uses the name
+        """
+        # One cached lambda statement per shape; the arguments become bound parameters
+        if exclude_id is None:
+            stmt = db.lambda_stmt(lambda: db.select(db.exists().where(
+                cls.tenantID == tenant_id,
+                db.func.lower(cls.departmentName) == db.func.lower(department_name)
+            )))
+        else:
+            stmt = db.lambda_stmt(lambda: db.select(db.exists().where(
+                cls.tenantID == tenant_id,
+                db.func.lower(cls.departmentName) == db.func.lower(department_name),
+                cls.departmentID != exclude_id
+            )))
+        return db.session.execute(stmt).scalar()
     
     @classmethod
     def get_by_tenant(cls, tenant_id: str) -> List['Department']:
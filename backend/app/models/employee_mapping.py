@@ -18,6 +18,10 @@ class EmployeeMapping(db.Model):
     """
     
     __tablename__ = 'employee_mappings'
+    __table_args__ = (
+        # Covers find_by_user() and the users.employee_id lookup without touching the table
+        db.Index('ix_em_user_active_cover', 'userID', 'is_active', 'sheets_identifier'),
+    )
     
     # Primary Key
     mappingID = db.Column(db.String(36), primary_key=True, unique=True, nullable=False)
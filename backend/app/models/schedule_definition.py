@@ -1,7 +1,7 @@
 # Schedule Definition Model
 from app import db
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,6 +15,10 @@ class ScheduleDefinition(db.Model):
     """
     
     __tablename__ = 'schedule_definitions'
+    __table_args__ = (
+        # Serves the per-tenant newest-first definition listing and its keyset cursor
+        db.Index('ix_schedule_def_tenant_created', 'tenantID', 'created_at', 'scheduleDefID'),
+    )
     
     # Primary Key
     scheduleDefID = db.Column(db.String(36), primary_key=True, unique=True, nullable=False)
@@ -76,13 +80,18 @@ class ScheduleDefinition(db.Model):
         self.remarks = remarks
         super().__init__(**kwargs)
     
-    def to_dict(self) -> dict:
+    def to_dict(self, counts: dict = None) -> dict:
         """
         Convert schedule definition instance to dictionary
         
+        Args:
+            counts: Pre-computed permissions/job_logs counts (see
+                get_collection_counts); each missing one is counted with its own query
+        
         Returns:
             Dictionary representation of the schedule definition
         """
+        counts = counts or {}
         return {
             'scheduleDefID': self.scheduleDefID,
             'tenantID': self.tenantID,
@@ -96,8 +105,14 @@ class ScheduleDefinition(db.Model):
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'permissions_count': self.schedule_permissions.count(),
-            'job_logs_count': self.schedule_job_logs.count()
+            'permissions_count': (
+                counts['permissions'] if 'permissions' in counts
+                else self.schedule_permissions.count()
+            ),
+            'job_logs_count': (
+                counts['job_logs'] if 'job_logs' in counts
+                else self.schedule_job_logs.count()
+            )
         }
     
     def get_active_permissions(self) -> List['SchedulePermission']:
@@ -234,6 +249,40 @@ class ScheduleDefinition(db.Model):
             cls.scheduleName.ilike(f'%{search_term}%')
         ).all()
     
+    @classmethod
+    def get_collection_counts(cls, schedule_def_ids: List[str]) -> Dict[str, dict]:
+        """
+        Count permissions and job logs for many schedule definitions at once
+        
+        One GROUP BY query per table over an IN list, instead of the two
+        dynamic-relationship COUNTs to_dict() would issue per definition.
+        
+        Args:
+            schedule_def_ids: IDs of the schedule definitions to count for
+            
+        Returns:
+            Dict of scheduleDefID -> counts dict accepted by to_dict(counts=...)
+        """
+        from app.models.schedule_permission import SchedulePermission
+        from app.models.schedule_job_log import ScheduleJobLog
+        
+        counts = {
+            schedule_def_id: {'permissions': 0, 'job_logs': 0}
+            for schedule_def_id in schedule_def_ids
+        }
+        if not counts:
+            return counts
+        for key, model in (
+            ('permissions', SchedulePermission),
+            ('job_logs', ScheduleJobLog),
+        ):
+            rows = db.session.query(model.scheduleDefID, db.func.count()).filter(
+                model.scheduleDefID.in_(list(counts))
+            ).group_by(model.scheduleDefID).all()
+            for schedule_def_id, count in rows:
+                counts[schedule_def_id][key] = count
+        return counts
+    
     def __repr__(self) -> str:
         """String representation of the schedule definition"""
         return f'<ScheduleDefinition {self.scheduleDefID}: {self.scheduleName}>'
@@ -16,6 +16,14 @@ class ScheduleJobLog(db.Model):
     """
     
     __tablename__ = 'schedule_job_logs'
+    __table_args__ = (
+        # Serves the per-tenant newest-first log listing and its keyset cursor
+        db.Index('ix_schedulejoblog_tenant_start', 'tenantID', 'startTime', 'logID'),
+        # Newest-first system log listing (sysadmin /logs): per tenant, and
+        # across all tenants for client admins
+        db.Index('ix_sjl_tenant_created', 'tenantID', 'created_at'),
+        db.Index('ix_sjl_created', 'created_at'),
+    )
     
     # Primary Key
     logID = db.Column(db.String(36), primary_key=True, unique=True, nullable=False)
@@ -101,8 +109,8 @@ class ScheduleJobLog(db.Model):
         }
         
         # Frontend compatibility fields
-        if self.run_by_user:
-            result['runByUser'] = self.run_by_user.to_dict()
+        if result['user'] is not None:
+            result['runByUser'] = result['user']
         if self.schedule_definition:
             result['scheduleName'] = self.schedule_definition.scheduleName
         
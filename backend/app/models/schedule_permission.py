@@ -1,11 +1,44 @@
 # Schedule Permission Model
 from app import db
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
 from datetime import datetime, timedelta
 from typing import List, Optional
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# Valid scheduleDefIDs per user, read on every schedule manager dashboard load
+# and changed only when an admin grants or revokes access. The cache is per
+# process: grants/revokes clear it in the process that made them once they
+# commit, so other workers can serve a revoked schedule for up to
+# PERMISSION_IDS_TTL
+PERMISSION_IDS_TTL = 300  # seconds
+PERMISSION_IDS_CACHE_MAXSIZE = 1024
+# userID -> (monotonic expiry, [scheduleDefID, ...])
+_permission_ids_cache = {}
+_permission_ids_lock = threading.Lock()
+
+
+def invalidate_permission_ids(user_id: str = None) -> None:
+    """Drop the cached valid scheduleDefIDs for user_id, or for every user"""
+    with _permission_ids_lock:
+        if user_id is None:
+            _permission_ids_cache.clear()
+        else:
+            _permission_ids_cache.pop(user_id, None)
+
+
+# session.info key for the userIDs whose permissions the open transaction changed
+_DIRTY_USERS_KEY = 'schedule_permission_dirty_users'
+
+
+def _mark_permission_ids_dirty(session, user_id: str) -> None:
+    """Invalidate user_id's cached IDs when session's transaction commits"""
+    session.info.setdefault(_DIRTY_USERS_KEY, set()).add(user_id)
+
 class SchedulePermission(db.Model):
     """
     Schedule Permission model representing user permissions for schedule definitions
@@ -73,10 +106,14 @@ class SchedulePermission(db.Model):
         self.granted_by = granted_by
         super().__init__(**kwargs)
     
-    def to_dict(self) -> dict:
+    def to_dict(self, definition_counts: dict = None) -> dict:
         """
         Convert schedule permission instance to dictionary
         
+        Args:
+            definition_counts: Pre-computed counts passed on to
+                ScheduleDefinition.to_dict(counts=...)
+        
         Returns:
             Dictionary representation of the schedule permission
         """
@@ -93,7 +130,10 @@ class SchedulePermission(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'user': self.user.to_dict() if self.user else None,
-            'schedule_definition': self.schedule_definition.to_dict() if self.schedule_definition else None
+            'schedule_definition': (
+                self.schedule_definition.to_dict(counts=definition_counts)
+                if self.schedule_definition else None
+            )
         }
     
     def grant_permission(self, granted_by_user_id: str = None) -> None:
@@ -217,7 +257,7 @@ class SchedulePermission(db.Model):
             raise ValueError("user_id is required")
         
         from app.models import User  # Local import to avoid circular dependency at module load
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id)
         if not user:
             raise ValueError("User not found")
         
@@ -291,10 +331,18 @@ class SchedulePermission(db.Model):
                 existing_permissions[schedule_def_id] = permission
                 created += 1
         
-        for schedule_def_id, permission in existing_permissions.items():
-            if schedule_def_id not in sanitized_entries:
-                db.session.delete(permission)
-                removed += 1
+        # Everything not in the payload goes in one DELETE instead of one per
+        # row at flush. A bulk DELETE skips the mapper events, so the cached
+        # permission IDs are marked for invalidation here
+        stale_ids = [
+            permission.permissionID
+            for schedule_def_id, permission in existing_permissions.items()
+            if schedule_def_id not in sanitized_entries
+        ]
+        if stale_ids:
+            db.session.execute(db.delete(cls).where(cls.permissionID.in_(stale_ids)))
+            removed = len(stale_ids)
+            _mark_permission_ids_dirty(db.session, user_id)
         
         return {
             'created': created,
@@ -340,8 +388,54 @@ class SchedulePermission(db.Model):
         Returns:
             List of valid SchedulePermission instances
         """
-        permissions = cls.query.filter_by(userID=user_id, is_active=True, canRunJob=True).all()
-        return [perm for perm in permissions if not perm.is_expired()]
+        # Same rule as is_expired(), applied in SQL so expired rows are never loaded
+        return cls.query.filter(
+            cls.userID == user_id,
+            cls.is_active == True,
+            cls.canRunJob == True,
+            db.or_(cls.expires_at.is_(None), cls.expires_at >= datetime.utcnow())
+        ).all()
+    
+    @classmethod
+    def get_valid_ids_by_user(cls, user_id: str) -> List[str]:
+        """
+        Get the scheduleDefIDs of all valid permissions for a specific user
+        
+        Same rule as get_valid_by_user(), but only the IDs are selected and the
+        result is cached for PERMISSION_IDS_TTL seconds. An entry never outlives
+        the earliest expires_at among its permissions, and any insert, update or
+        delete of a user's permission drops that user's entry.
+        
+        Args:
+            user_id: ID of the user
+            
+        Returns:
+            List of scheduleDefIDs the user can run
+        """
+        now = time.monotonic()
+        with _permission_ids_lock:
+            cached = _permission_ids_cache.get(user_id)
+            if cached and cached[0] > now:
+                return list(cached[1])
+        
+        utcnow = datetime.utcnow()
+        rows = db.session.query(cls.scheduleDefID, cls.expires_at).filter(
+            cls.userID == user_id,
+            cls.is_active == True,
+            cls.canRunJob == True,
+            db.or_(cls.expires_at.is_(None), cls.expires_at >= utcnow)
+        ).all()
+        ids = [row.scheduleDefID for row in rows]
+        
+        ttl = PERMISSION_IDS_TTL
+        expiries = [row.expires_at for row in rows if row.expires_at is not None]
+        if expiries:
+            ttl = min(ttl, (min(expiries) - utcnow).total_seconds())
+        with _permission_ids_lock:
+            if len(_permission_ids_cache) >= PERMISSION_IDS_CACHE_MAXSIZE:
+                _permission_ids_cache.pop(next(iter(_permission_ids_cache)))
+            _permission_ids_cache[user_id] = (now + ttl, ids)
+        return list(ids)
     
     @classmethod
     def cleanup_expired(cls) -> int:
@@ -373,8 +467,26 @@ class SchedulePermission(db.Model):
         return f'Permission: {self.user.username if self.user else self.userID} -> {self.schedule_definition.scheduleName if self.schedule_definition else self.scheduleDefID}'
 
 
+@event.listens_for(SchedulePermission, 'after_insert')
+@event.listens_for(SchedulePermission, 'after_update')
+@event.listens_for(SchedulePermission, 'after_delete')
+def _mark_permission_change(mapper, connection, target):
+    # Covers every grant/revoke path (routes, sync_for_user, cleanup_expired).
+    # These fire at flush; invalidating now would let a concurrent request
+    # re-cache the old committed rows before this transaction commits
+    session = object_session(target)
+    if session is not None:
+        _mark_permission_ids_dirty(session, target.userID)
+    else:
+        invalidate_permission_ids(target.userID)
 
 
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_permission_ids(session):
+    for user_id in session.info.pop(_DIRTY_USERS_KEY, ()):
+        invalidate_permission_ids(user_id)
 
 
-
+@event.listens_for(Session, 'after_rollback')
+def _discard_permission_changes(session):
+    session.info.pop(_DIRTY_USERS_KEY, None)
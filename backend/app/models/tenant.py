@@ -1,7 +1,7 @@
 # Tenant Model
 from app import db
 from datetime import datetime
-from typing import List
+from typing import Dict, List
 import logging
 
 logger = logging.getLogger(__name__)
@@ -50,22 +50,54 @@ class Tenant(db.Model):
         self.tenantName = tenantName
         super().__init__(**kwargs)
     
-    def to_dict(self) -> dict:
+    def to_dict(self, counts: dict = None) -> dict:
         """
         Convert tenant instance to dictionary
         
+        Args:
+            counts: Pre-computed users/departments/schedule_definitions counts;
+                each missing one is counted with its own query
+        
         Returns:
             Dictionary representation of the tenant
         """
+        counts = counts or {}
         return {
             'tenantID': self.tenantID,
             'tenantName': self.tenantName,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'is_active': self.is_active,
-            'users_count': self.users.count(),
-            'departments_count': self.departments.count(),
-            'schedule_definitions_count': self.schedule_definitions.count()
+            'users_count': counts['users'] if 'users' in counts else self.users.count(),
+            'departments_count': counts['departments'] if 'departments' in counts else self.departments.count(),
+            'schedule_definitions_count': (
+                counts['schedule_definitions'] if 'schedule_definitions' in counts
+                else self.schedule_definitions.count()
+            )
+        }
+    
+    @staticmethod
+    def row_to_dict(row, counts: dict) -> dict:
+        """
+        Same shape as to_dict(), from a column row instead of a Tenant instance
+        
+        Args:
+            row: Row (or any object) with tenantID, tenantName, created_at,
+                updated_at and is_active attributes
+            counts: Pre-computed users/departments/schedule_definitions counts
+            
+        Returns:
+            Dictionary representation of the tenant
+        """
+        return {
+            'tenantID': row.tenantID,
+            'tenantName': row.tenantName,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'updated_at': row.updated_at.isoformat() if row.updated_at else None,
+            'is_active': row.is_active,
+            'users_count': counts['users'],
+            'departments_count': counts['departments'],
+            'schedule_definitions_count': counts['schedule_definitions'],
         }
     
     def get_active_users(self) -> List['User']:
@@ -124,6 +156,42 @@ class Tenant(db.Model):
         """
         return cls.query.filter_by(is_active=True).all()
     
+    @classmethod
+    def get_collection_counts(cls, tenant_ids: List[str]) -> Dict[str, dict]:
+        """
+        Count users, departments and schedule definitions for many tenants at once
+        
+        One GROUP BY query per table over an IN list, instead of the three
+        dynamic-relationship COUNTs to_dict() would issue per tenant.
+        
+        Args:
+            tenant_ids: IDs of the tenants to count for
+            
+        Returns:
+            Dict of tenantID -> counts dict accepted by to_dict(counts=...)
+        """
+        from app.models.user import User
+        from app.models.department import Department
+        from app.models.schedule_definition import ScheduleDefinition
+        
+        counts = {
+            tenant_id: {'users': 0, 'departments': 0, 'schedule_definitions': 0}
+            for tenant_id in tenant_ids
+        }
+        if not counts:
+            return counts
+        for key, model in (
+            ('users', User),
+            ('departments', Department),
+            ('schedule_definitions', ScheduleDefinition),
+        ):
+            rows = db.session.query(model.tenantID, db.func.count()).filter(
+                model.tenantID.in_(tenant_ids)
+            ).group_by(model.tenantID).all()
+            for tenant_id, count in rows:
+                counts[tenant_id][key] = count
+        return counts
+    
     def __repr__(self) -> str:
         """String representation of the tenant"""
         return f'<Tenant {self.tenantID}: {self.tenantName}>'
@@ -1,7 +1,7 @@
 # User Model
 from app import db
 from datetime import datetime
-from typing import List, Optional, TYPE_CHECKING
+from typing import List, Optional, Tuple, TYPE_CHECKING
 from sqlalchemy.orm import foreign
 from sqlalchemy import func
 import logging
@@ -28,6 +28,10 @@ class User(db.Model):
     """
     
     __tablename__ = 'users'
+    __table_args__ = (
+        # Serves the per-tenant newest-first user listing and its keyset cursor
+        db.Index('ix_users_tenant_created', 'tenantID', 'created_at', 'userID'),
+    )
     
     # Primary Key
     userID = db.Column(db.String(36), primary_key=True, unique=True, nullable=False)
@@ -149,6 +153,45 @@ class User(db.Model):
         
         return data
     
+    @classmethod
+    def summary_columns(cls) -> list:
+        """
+        Columns to_dict() reads, for listing users as plain rows
+        
+        Selecting these with with_entities() skips ORM object hydration (and
+        never fetches hashedPassword); pass the resulting rows to rows_to_dicts().
+        """
+        return [cls.userID, cls.tenantID, cls.username, cls.role, cls.status, cls.email,
+                cls.full_name, cls.employee_id, cls.created_at, cls.updated_at, cls.last_login]
+    
+    @staticmethod
+    def rows_to_dicts(rows) -> List[dict]:
+        """
+        Build to_dict()-shaped dictionaries from summary_columns() rows
+        
+        Args:
+            rows: Rows selected with summary_columns()
+            
+        Returns:
+            List of user dictionaries in row order
+        """
+        return [
+            {
+                'userID': row.userID,
+                'tenantID': row.tenantID,
+                'username': row.username,
+                'role': format_role_for_response(row.role),
+                'status': row.status,
+                'email': row.email,
+                'full_name': row.full_name,
+                'employee_id': row.employee_id,
+                'created_at': row.created_at.isoformat() if row.created_at else None,
+                'updated_at': row.updated_at.isoformat() if row.updated_at else None,
+                'last_login': row.last_login.isoformat() if row.last_login else None
+            }
+            for row in rows
+        ]
+    
     def update_last_login(self) -> None:
         """Update the last login timestamp"""
         self.last_login = datetime.utcnow()
@@ -250,6 +293,39 @@ class User(db.Model):
             return None
         return cls.query.filter(func.lower(cls.username) == normalized).first()
     
+    @classmethod
+    def find_identity_conflicts(cls, username: str, employee_id: Optional[str] = None) -> Tuple[bool, bool]:
+        """
+        Check username and employee ID availability in one query
+        
+        Both comparisons are case-insensitive, like find_by_username() and
+        find_by_employee_id().
+        
+        Args:
+            username: Username the new account would get
+            employee_id: Employee ID the new account would get, if any
+            
+        Returns:
+            (username_taken, employee_id_taken)
+        """
+        normalized_username = cls._normalize_lookup_value(username)
+        normalized_employee_id = cls._normalize_lookup_value(employee_id)
+        conditions = []
+        if normalized_username:
+            conditions.append(func.lower(cls.username) == normalized_username)
+        if normalized_employee_id:
+            conditions.append(func.lower(cls.employee_id) == normalized_employee_id)
+        if not conditions:
+            return False, False
+        
+        rows = db.session.execute(
+            db.select(func.lower(cls.username), func.lower(cls.employee_id))
+            .where(db.or_(*conditions))
+        ).all()
+        username_taken = bool(normalized_username) and any(row[0] == normalized_username for row in rows)
+        employee_id_taken = bool(normalized_employee_id) and any(row[1] == normalized_employee_id for row in rows)
+        return username_taken, employee_id_taken
+    
     @classmethod
     def find_by_email(cls, email: str) -> Optional['User']:
         """
@@ -1,7 +1,7 @@
 # Alert Routes
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..models import User
+from flask_jwt_extended import jwt_required
+from ..utils.auth import load_current_user
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,9 +9,8 @@ logger = logging.getLogger(__name__)
 alert_bp = Blueprint('alerts', __name__)
 
 def get_current_user():
-    """Get current authenticated user"""
-    current_user_id = get_jwt_identity()
-    return User.query.get(current_user_id)
+    """Get current authenticated user (loaded once per request)"""
+    return load_current_user()
 
 @alert_bp.route('/', methods=['GET'])
 @alert_bp.route('', methods=['GET'])
@@ -1,12 +1,65 @@
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import get_jwt_identity
-from ..utils.auth import role_required
+from functools import wraps
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, get_jwt
+from sqlalchemy import case, func, lambda_stmt, select
+from sqlalchemy.orm import joinedload
+from ..utils.auth import role_required, current_user_ctx
 from .. import db
-from ..models import Department, User
+from ..models import Department, ScheduleDefinition, User
+from ..services.dashboard_data_service import DashboardDataService
 from ..utils.security import sanitize_input
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
+trace_logger = logging.getLogger('trace')
+
+# Stateless, so one instance serves every C1-C4 request
+_dashboard_service = DashboardDataService()
+
+# Rendered C1-C4 responses per (tenant, path, month) -> (body, timestamp).
+# Sheet reads behind C4 already have their own 5 minute cache in the sheets service.
+# Expiry is by TTL only: the cache is per process and the browser keeps the
+# same response for max-age, so writers (departments, users, permissions)
+# don't invalidate it and the dashboards may lag a change by up to
+# DASHBOARD_CACHE_TTL seconds
+DASHBOARD_CACHE_TTL = 30  # seconds
+DASHBOARD_CACHE_MAXSIZE = 512
+_dashboard_cache = {}
+_dashboard_cache_lock = threading.Lock()
+
+
+def _cached_dashboard(f):
+    """Serve repeat C1-C4 GETs for the same tenant from the in-process cache
+
+    Only successful responses are stored; everything gets a short private
+    Cache-Control so the browser can skip the request entirely.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        # Tokens issued without a tenantID claim fall back to a per-user key
+        scope = (get_jwt() or {}).get('tenantID') or f"user:{get_jwt_identity()}"
+        key = (scope, request.path, request.args.get('month'))
+        now = time.time()
+        
+        cached = _dashboard_cache.get(key)
+        if cached is not None and now - cached[1] < DASHBOARD_CACHE_TTL:
+            response = current_app.response_class(cached[0], status=200, mimetype="application/json")
+        else:
+            response, status = f(*args, **kwargs)
+            if status != 200:
+                return response, status
+            with _dashboard_cache_lock:
+                if len(_dashboard_cache) >= DASHBOARD_CACHE_MAXSIZE:
+                    # Oldest entry first (dicts keep insertion order)
+                    _dashboard_cache.pop(next(iter(_dashboard_cache)))
+                _dashboard_cache.pop(key, None)
+                _dashboard_cache[key] = (response.get_data(), now)
+        
+        response.headers["Cache-Control"] = f"private, max-age={DASHBOARD_CACHE_TTL}"
+        return response, 200
+    return decorated_function
 
 
 # Note: url_prefix set to None - will be set during registration in __init__.py
@@ -17,55 +70,62 @@ clientadmin_bp = Blueprint("clientadmin", __name__)
 @role_required("ClientAdmin")
 def dashboard():
     """Client Admin dashboard with Tenant, Department, User Account, and Permissions views"""
-    import logging
-    trace_logger = logging.getLogger('trace')
-    
     trace_logger.info("[TRACE] Backend: GET /clientadmin/dashboard")
     
-    from flask_jwt_extended import get_jwt_identity, get_jwt
-    from app.models import User, Tenant, Department
-    
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        # Load the tenant in the same query instead of lazily on first access
+        user = db.session.get(User, current_user_id, options=[joinedload(User.tenant)])
         
         if not user:
             response = jsonify({"success": False, "error": "User not found"})
-            response.headers.add("Access-Control-Allow-Origin", "*")
             return response, 404
         
         tenant = user.tenant
         if not tenant:
             response = jsonify({"success": False, "error": "Tenant not found"})
-            response.headers.add("Access-Control-Allow-Origin", "*")
             return response, 404
         
-        # Get tenant statistics
+        # Get tenant statistics in one round-trip: the user counts aggregate
+        # over users, the other tables are counted in scalar subqueries
+        # (joining them would multiply the rows being counted)
+        departments_count = (
+            select(func.count()).select_from(Department)
+            .where(Department.tenantID == tenant.tenantID).scalar_subquery()
+        )
+        schedule_definitions_count = (
+            select(func.count()).select_from(ScheduleDefinition)
+            .where(ScheduleDefinition.tenantID == tenant.tenantID).scalar_subquery()
+        )
+        counts = db.session.execute(
+            select(
+                departments_count.label("departments"),
+                schedule_definitions_count.label("schedule_definitions"),
+                func.count(User.userID).label("users"),
+                func.coalesce(func.sum(case((User.status == 'active', 1), else_=0)), 0).label("active_users"),
+            ).where(User.tenantID == tenant.tenantID)
+        ).one()._asdict()
+        
         stats = {
             "tenants": 1,  # Current tenant only
-            "departments": tenant.departments.count(),
-            "users": tenant.users.count(),
-            "active_users": tenant.users.filter_by(status='active').count()
+            "departments": counts["departments"],
+            "users": counts["users"],
+            # SUM() comes back as Decimal on MySQL
+            "active_users": int(counts["active_users"])
         }
         
         response = jsonify({
             "success": True,
             "dashboard": "clientadmin",
             "user": user.to_dict(),
-            "tenant": tenant.to_dict(),
+            "tenant": tenant.to_dict(counts=counts),
             "stats": stats,
             "views": ["C1: Tenant", "C2: Department", "C3: User Account", "C4: Permissions"]
         })
-        response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 200
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Error in clientadmin dashboard: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception("Error in clientadmin dashboard: %s", e)
         response = jsonify({"success": False, "error": str(e)})
-        response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 500
 
 
@@ -80,41 +140,34 @@ def departments():
 def create_department():
     """Create a new department (ClientAdmin only)"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user_ctx()
         
         if not user:
             response = jsonify({"error": "User not found"})
-            response.headers.add("Access-Control-Allow-Origin", "*")
             return response, 404
         
         # Check if user is ClientAdmin (platform admin)
         if not user.is_client_admin:
             response = jsonify({"error": "Access denied"})
-            response.headers.add("Access-Control-Allow-Origin", "*")
             return response, 403
         
         data = request.get_json()
         if not data:
             response = jsonify({"error": "No data provided"})
-            response.headers.add("Access-Control-Allow-Origin", "*")
             return response, 400
         
         # Validate department name
         department_name = data.get("name") or data.get("departmentName")
         if not department_name:
             response = jsonify({"error": "Department name required"})
-            response.headers.add("Access-Control-Allow-Origin", "*")
             return response, 400
         
         # Sanitize input
         department_name = sanitize_input(department_name)
         
         # Check if department name already exists in tenant
-        existing_dept = Department.find_by_name(user.tenantID, department_name)
-        if existing_dept:
+        if Department.name_exists(user.tenantID, department_name):
             response = jsonify({"error": "Department with this name already exists"})
-            response.headers.add("Access-Control-Allow-Origin", "*")
             return response, 409
         
         # Create department
@@ -135,16 +188,12 @@ def create_department():
             "message": "Department created successfully",
             "department": department.to_dict()
         })
-        response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 201
         
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Create department error: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception("Create department error: %s", e)
         response = jsonify({"error": "Failed to create department", "details": str(e)})
-        response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 500
 
 
@@ -180,96 +229,79 @@ def update_schedule_access():
 
 @clientadmin_bp.route("/c1-tenant", methods=["GET"])
 @role_required("ClientAdmin")
+@_cached_dashboard
 def c1_tenant():
     """C1 Tenant Dashboard - Tenant overview"""
-    from flask_jwt_extended import get_jwt_identity
-    from app.services.dashboard_data_service import DashboardDataService
-    
     try:
         current_user_id = get_jwt_identity()
-        service = DashboardDataService()
-        dashboard_data = service.get_clientadmin_c1_data(current_user_id)
+        dashboard_data = _dashboard_service.get_clientadmin_c1_data(current_user_id)
         
         if dashboard_data.get("success"):
             return jsonify(dashboard_data), 200
         else:
             return jsonify(dashboard_data), 400
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Error in C1 dashboard: {e}")
+        logger.exception("Error in C1 dashboard: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
 @clientadmin_bp.route("/c2-department", methods=["GET"])
 @role_required("ClientAdmin")
+@_cached_dashboard
 def c2_department():
     """C2 Department Management Dashboard"""
-    from flask_jwt_extended import get_jwt_identity
-    from app.services.dashboard_data_service import DashboardDataService
-    
     try:
         current_user_id = get_jwt_identity()
-        service = DashboardDataService()
-        dashboard_data = service.get_clientadmin_c2_data(current_user_id)
+        dashboard_data = _dashboard_service.get_clientadmin_c2_data(current_user_id)
         
         if dashboard_data.get("success"):
             return jsonify(dashboard_data), 200
         else:
             return jsonify(dashboard_data), 400
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Error in C2 dashboard: {e}")
+        logger.exception("Error in C2 dashboard: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
 @clientadmin_bp.route("/c3-user-account", methods=["GET"])
 @role_required("ClientAdmin")
+@_cached_dashboard
 def c3_user_account():
     """C3 User Account Management Dashboard"""
-    from flask_jwt_extended import get_jwt_identity
-    from app.services.dashboard_data_service import DashboardDataService
-    
     try:
         current_user_id = get_jwt_identity()
-        service = DashboardDataService()
-        dashboard_data = service.get_clientadmin_c3_data(current_user_id)
+        dashboard_data = _dashboard_service.get_clientadmin_c3_data(current_user_id)
         
         if dashboard_data.get("success"):
             return jsonify(dashboard_data), 200
         else:
             return jsonify(dashboard_data), 400
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Error in C3 dashboard: {e}")
+        logger.exception("Error in C3 dashboard: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
 @clientadmin_bp.route("/c4-permissions", methods=["GET"])
 @role_required("ClientAdmin")
+@_cached_dashboard
 def c4_permissions():
     """C4 Permission Maintenance Dashboard - Includes Designation Flow from Google Sheets"""
-    from flask_jwt_extended import get_jwt_identity
-    from flask import current_app
-    from app.services.dashboard_data_service import DashboardDataService
-    from app.models import ScheduleDefinition
-    
     try:
         current_user_id = get_jwt_identity()
-        from app.models import User
-        user = User.query.get(current_user_id)
         
-        # Get designation flow data from sheets if available
+        # Get designation flow data from sheets if available; the user is only
+        # needed for its tenant, so resolve both in one query
         designation_flow_data = None
-        schedule_def = ScheduleDefinition.query.filter_by(
-            tenantID=user.tenantID,
-            is_active=True
-        ).first()
+        schedule_def = db.session.execute(lambda_stmt(lambda: select(ScheduleDefinition).join(
+            User, User.tenantID == ScheduleDefinition.tenantID
+        ).where(
+            User.userID == current_user_id,
+            ScheduleDefinition.is_active == True
+        ).limit(1))).scalars().first()
         
         if schedule_def:
             creds_path = current_app.config.get('GOOGLE_APPLICATION_CREDENTIALS', 'service-account-creds.json')
+            # Resolved from the project-root sheets package at call time, like google_sheets_import does
             from app.services.google_sheets.service import fetch_schedule_data
             sheets_data = fetch_schedule_data(
                 schedule_def.scheduleDefID,
@@ -280,8 +312,7 @@ def c4_permissions():
                 designation_flow_data = sheets_data.get("sheets", {}).get("designation_flow", {})
         
         # Get permissions from database
-        service = DashboardDataService()
-        dashboard_data = service.get_clientadmin_c4_data(current_user_id)
+        dashboard_data = _dashboard_service.get_clientadmin_c4_data(current_user_id)
         
         # Add designation flow data
         if designation_flow_data:
@@ -295,9 +326,7 @@ def c4_permissions():
         else:
             return jsonify(dashboard_data), 400
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Error in C4 dashboard: {e}")
+        logger.exception("Error in C4 dashboard: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
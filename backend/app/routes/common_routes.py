@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, current_app, redirect, request
 from flask_jwt_extended import jwt_required
+from ..utils.redis_cache import redis_ping
 import logging
 
 logger = logging.getLogger(__name__)
@@ -46,14 +47,7 @@ def health():
         return response, 503  # Service Unavailable if database is down
     
     # Redis/Celery checks are best-effort to avoid blocking startup
-    try:
-        import redis  # type: ignore
-        url = current_app.config.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
-        r = redis.Redis.from_url(url)
-        r.ping()
-        components["redis"] = True
-    except Exception:
-        components["redis"] = False
+    components["redis"] = redis_ping()
     try:
         from celery import current_app as celery_app  # type: ignore
         # Not a full ping, just ensure app is configured
@@ -395,9 +389,6 @@ def dashboard_chart_data():
 @jwt_required()
 def dashboard_system_health():
     """System health check endpoint"""
-    from flask import current_app
-    import redis
-    
     components = {
         "flask": True,
         "database": True,
@@ -406,13 +397,7 @@ def dashboard_system_health():
     }
     
     # Check Redis
-    try:
-        broker_url = current_app.config.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
-        r = redis.Redis.from_url(broker_url)
-        r.ping()
-        components["redis"] = True
-    except Exception:
-        pass
+    components["redis"] = redis_ping()
     
     # Check Celery
     try:
@@ -433,7 +418,6 @@ def dashboard_system_health():
 def system_health():
     """System health check endpoint (no auth required for monitoring)"""
     from flask import current_app
-    import redis
     from app import db
     from sqlalchemy import text
     import os
@@ -447,13 +431,7 @@ def system_health():
     }
     
     # Check Redis
-    try:
-        broker_url = current_app.config.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
-        r = redis.Redis.from_url(broker_url)
-        r.ping()
-        components["redis"] = True
-    except Exception:
-        pass
+    components["redis"] = redis_ping()
     
     # Check Celery
     try:
@@ -1,8 +1,8 @@
 # Department Routes
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from .. import db
-from ..models import Department, User
+from ..models import Department
 try:
     from ..schemas import DepartmentSchema, DepartmentUpdateSchema, PaginationSchema
     SCHEMAS_AVAILABLE = True
@@ -12,31 +12,36 @@ except ImportError:
     DepartmentUpdateSchema = None
     PaginationSchema = None
 from ..utils.security import sanitize_input
-from ..utils.role_utils import is_client_admin_role, is_schedule_manager_role
+from ..utils.role_utils import CLIENT_ADMIN_ROLE, SCHEDULE_MANAGER_ROLE, normalize_role
 from ..utils.tenant_filter import get_tenant_filtered_query
+from ..utils.auth import current_user_ctx, load_current_user
+from ..utils.pagination import paginate_with_total
 import logging
 
 logger = logging.getLogger(__name__)
+trace_logger = logging.getLogger('trace')
 
 department_bp = Blueprint('departments', __name__)
 
+# Normalized roles allowed to write departments ('admin' and 'scheduler'
+# normalize to these as well)
+_ADMIN_ROLES = frozenset({CLIENT_ADMIN_ROLE, SCHEDULE_MANAGER_ROLE})
+
 def get_current_user():
-    """Get current authenticated user"""
-    current_user_id = get_jwt_identity()
-    return User.query.get(current_user_id)
+    """Get current authenticated user (loaded once per request)"""
+    return load_current_user()
+
+def _trace_enabled():
+    """True when TRACE_REQUESTS is on and the trace logger would emit INFO"""
+    return current_app.config.get('TRACE_REQUESTS', False) and trace_logger.isEnabledFor(logging.INFO)
 
 def require_admin_or_scheduler():
     """Decorator to require admin or scheduler role"""
     def decorator(f):
         def decorated_function(*args, **kwargs):
-            user = get_current_user()
-            if not user:
-                return jsonify({'error': 'Admin or scheduler access required'}), 403
-            if not (
-                is_client_admin_role(user.role)
-                or is_schedule_manager_role(user.role)
-                or user.role in ['admin', 'scheduler']
-            ):
+            # Role comes from the token claims (see current_user_ctx)
+            user = current_user_ctx()
+            if not user or normalize_role(user.role) not in _ADMIN_ROLES:
                 return jsonify({'error': 'Admin or scheduler access required'}), 403
             return f(*args, **kwargs)
         decorated_function.__name__ = f.__name__
@@ -48,29 +53,24 @@ def require_admin_or_scheduler():
 @jwt_required()
 def get_departments():
     """Get departments for current tenant (ClientAdmin can access all tenants)"""
-    import logging
-    trace_logger = logging.getLogger('trace')
-    
-    # [TRACE] Logging
-    trace_logger.info(f"[TRACE] Backend: GET /departments")
-    trace_logger.info(f"[TRACE] Backend: Path: {request.path}")
-    trace_logger.info(f"[TRACE] Backend: Full path: {request.full_path}")
-    trace_logger.info(f"[TRACE] Backend: Query params: {dict(request.args)}")
-    
-    try:
-        from flask_jwt_extended import get_jwt_identity, get_jwt
-        current_user_id = get_jwt_identity()
-        claims = get_jwt() or {}
-        trace_logger.info(f"[TRACE] Backend: User ID: {current_user_id}")
-        trace_logger.info(f"[TRACE] Backend: Role: {claims.get('role')}")
-    except:
-        pass
+    # [TRACE] Logging - only build the messages when someone will read them
+    trace = _trace_enabled()
+    if trace:
+        trace_logger.info("[TRACE] Backend: GET /departments")
+        trace_logger.info("[TRACE] Backend: Path: %s", request.path)
+        trace_logger.info("[TRACE] Backend: Full path: %s", request.full_path)
+        trace_logger.info("[TRACE] Backend: Query params: %s", request.args.to_dict(flat=True))
+        try:
+            claims = get_jwt() or {}
+            trace_logger.info("[TRACE] Backend: User ID: %s", get_jwt_identity())
+            trace_logger.info("[TRACE] Backend: Role: %s", claims.get('role'))
+        except:
+            pass
     
     try:
-        user = get_current_user()
+        user = current_user_ctx()
         if not user:
             response = jsonify({'error': 'User not found'})
-            response.headers.add("Access-Control-Allow-Origin", "*")
             return response, 404
         
         # Parse pagination parameters with safe defaults
@@ -88,26 +88,24 @@ def get_departments():
             per_page = min(int(request.args.get('per_page', 20) or 20), 100)
         
         # Query departments - ClientAdmin sees all, others see only their tenant
-        departments_query = get_tenant_filtered_query(Department, user)
+        # Plain column rows rather than Department objects
+        departments_query = get_tenant_filtered_query(Department, user).with_entities(
+            *Department.summary_columns()
+        )
         
         # Apply active filter if specified
         active_filter = request.args.get('active')
         if active_filter is not None:
             is_active = active_filter.lower() == 'true'
-            departments_query = departments_query.filter_by(is_active=is_active)
+            departments_query = departments_query.filter(Department.is_active == is_active)
         
-        departments_pagination = departments_query.order_by(Department.created_at.desc()).paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        departments_pagination = paginate_with_total(departments_query.order_by(Department.created_at.desc()), page, per_page)
         
-        departments = [dept.to_dict() for dept in departments_pagination.items]
+        departments = Department.rows_to_dicts(departments_pagination.items)
         
-        import logging
-        trace_logger = logging.getLogger('trace')
-        trace_logger.info(f"[TRACE] Backend: Returning {len(departments)} departments")
-        trace_logger.info(f"[TRACE] Backend: Response structure: {{success: True, data: [{len(departments)} items], pagination: {{...}}}}")
+        if trace:
+            trace_logger.info("[TRACE] Backend: Returning %d departments", len(departments))
+            trace_logger.info("[TRACE] Backend: Response structure: {success: True, data: [%d items], pagination: {...}}", len(departments))
         
         response = jsonify({
             'success': True,
@@ -121,15 +119,11 @@ def get_departments():
                 'has_prev': departments_pagination.has_prev
             }
         })
-        response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 200
         
     except Exception as e:
-        logger.error(f"Get departments error: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception("Get departments error: %s", e)
         response = jsonify({'error': 'Failed to retrieve departments', 'details': str(e)})
-        response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 500
 
 @department_bp.route('/', methods=['POST'])
@@ -138,7 +132,9 @@ def get_departments():
 def create_department():
     """Create a new department"""
     try:
-        current_user = get_current_user()
+        current_user = current_user_ctx()
+        if not current_user:
+            return jsonify({'error': 'User not found'}), 404
         
         data = request.get_json()
         if not data:
@@ -154,8 +150,7 @@ def create_department():
         department_name = sanitize_input(data['departmentName'])
         
         # Check if department name already exists in tenant
-        existing_dept = Department.find_by_name(current_user.tenantID, department_name)
-        if existing_dept:
+        if Department.name_exists(current_user.tenantID, department_name):
             return jsonify({'error': 'Department with this name already exists'}), 409
         
         # Create department
@@ -179,7 +174,7 @@ def create_department():
         
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Create department error: {str(e)}")
+        logger.exception("Create department error: %s", e)
         return jsonify({'error': 'Failed to create department', 'details': str(e)}), 500
 
 @department_bp.route('/<department_id>', methods=['GET'])
@@ -187,12 +182,12 @@ def create_department():
 def get_department(department_id):
     """Get specific department information"""
     try:
-        user = get_current_user()
+        user = current_user_ctx()
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         # Find department
-        department = Department.query.get(department_id)
+        department = db.session.get(Department, department_id)
         if not department:
             return jsonify({'error': 'Department not found'}), 404
         
@@ -206,7 +201,7 @@ def get_department(department_id):
         }), 200
         
     except Exception as e:
-        logger.error(f"Get department error: {str(e)}")
+        logger.exception("Get department error: %s", e)
         return jsonify({'error': 'Failed to retrieve department', 'details': str(e)}), 500
 
 @department_bp.route('/<department_id>', methods=['PUT'])
@@ -215,7 +210,9 @@ def get_department(department_id):
 def update_department(department_id):
     """Update department information"""
     try:
-        current_user = get_current_user()
+        current_user = current_user_ctx()
+        if not current_user:
+            return jsonify({'error': 'User not found'}), 404
         
         data = request.get_json()
         if not data:
@@ -228,7 +225,7 @@ def update_department(department_id):
             return jsonify({'error': 'Invalid update data', 'details': errors}), 400
         
         # Find department
-        department = Department.query.get(department_id)
+        department = db.session.get(Department, department_id)
         if not department:
             return jsonify({'error': 'Department not found'}), 404
         
@@ -241,8 +238,7 @@ def update_department(department_id):
             department_name = sanitize_input(data['departmentName'])
             
             # Check if new name conflicts
-            existing_dept = Department.find_by_name(current_user.tenantID, department_name)
-            if existing_dept and existing_dept.departmentID != department_id:
+            if Department.name_exists(current_user.tenantID, department_name, exclude_id=department_id):
                 return jsonify({'error': 'Department with this name already exists'}), 409
             
             department.departmentName = department_name
@@ -253,7 +249,6 @@ def update_department(department_id):
         if 'is_active' in data:
             department.is_active = data['is_active']
         
-        department.updated_at = db.func.now()
         db.session.commit()
         
         logger.info(f"Department updated: {department.departmentName} by user: {current_user.username}")
@@ -266,7 +261,7 @@ def update_department(department_id):
         
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Update department error: {str(e)}")
+        logger.exception("Update department error: %s", e)
         return jsonify({'error': 'Failed to update department', 'details': str(e)}), 500
 
 @department_bp.route('/<department_id>', methods=['DELETE'])
@@ -275,10 +270,12 @@ def update_department(department_id):
 def delete_department(department_id):
     """Delete department (soft delete)"""
     try:
-        current_user = get_current_user()
+        current_user = current_user_ctx()
+        if not current_user:
+            return jsonify({'error': 'User not found'}), 404
         
         # Find department
-        department = Department.query.get(department_id)
+        department = db.session.get(Department, department_id)
         if not department:
             return jsonify({'error': 'Department not found'}), 404
         
@@ -288,7 +285,6 @@ def delete_department(department_id):
         
         # Soft delete (deactivate)
         department.is_active = False
-        department.updated_at = db.func.now()
         db.session.commit()
         
         logger.info(f"Department deactivated: {department.departmentName} by user: {current_user.username}")
@@ -300,7 +296,7 @@ def delete_department(department_id):
         
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Delete department error: {str(e)}")
+        logger.exception("Delete department error: %s", e)
         return jsonify({'error': 'Failed to delete department', 'details': str(e)}), 500
 
 
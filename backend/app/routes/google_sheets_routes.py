@@ -3,8 +3,13 @@ Google Sheets API Routes
 Provides endpoints for listing, validating, and fetching Google Sheets data
 """
 from flask import Blueprint, jsonify, request, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..models import User, ScheduleDefinition
+from flask_jwt_extended import jwt_required
+from .. import db
+from ..models import ScheduleDefinition
+from ..utils.auth import current_user_ctx, load_current_user
+import hashlib
+import json
+import logging
 import sys
 import os
 
@@ -14,34 +19,80 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 # Use shared import utility
-from ..services.google_sheets_import import (
-    _try_import_google_sheets,
-    SHEETS_AVAILABLE as GOOGLE_SHEETS_AVAILABLE,
-    GoogleSheetsService,
-    list_sheets,
-    validate_sheets,
-    fetch_schedule_data
-)
+from ..services import google_sheets_import as sheets_import_module
+from ..services.google_sheets_import import _try_import_google_sheets
 
-# Try import at module load
-import logging
 logger = logging.getLogger(__name__)
+
+# Try import at module load
 success, path = _try_import_google_sheets()
 if success:
     logger.info(f"✅ Google Sheets routes: Service loaded from {path}")
 else:
     logger.warning("⚠️ Google Sheets routes: Service not available")
 
+# Bind after the import attempt, which is what fills these in
+GOOGLE_SHEETS_AVAILABLE = sheets_import_module.SHEETS_AVAILABLE
+GoogleSheetsService = sheets_import_module.GoogleSheetsService
+list_sheets = sheets_import_module.list_sheets
+validate_sheets = sheets_import_module.validate_sheets
+fetch_schedule_data = sheets_import_module.fetch_schedule_data
+
+# Body of every sheets response while the service is unavailable
+_UNAVAILABLE_BODY = json.dumps({
+    "success": False,
+    "error": "Google Sheets service not available"
+})
+
 google_sheets_bp = Blueprint('google_sheets', __name__)
 
 
 def get_current_user():
-    """Get current authenticated user"""
-    current_user_id = get_jwt_identity()
-    return User.query.get(current_user_id)
+    """Get current authenticated user (loaded once per request)"""
+    return load_current_user()
+
+
+# Sheet reads are cached server-side for 5 minutes; let the browser reuse a
+# response for a minute and revalidate it cheaply after that
+SHEETS_CACHE_MAX_AGE = 60  # seconds
+
+
+def _conditional_json(payload, status):
+    """jsonify payload with an ETag; 304 with no body if the client already has it"""
+    response = jsonify(payload)
+    if status != 200:
+        return response, status
+    response.add_etag()
+    response.headers["Cache-Control"] = f"private, max-age={SHEETS_CACHE_MAX_AGE}"
+    return response.make_conditional(request)
+
+
+def _sheet_chunks(result):
+    """Serialize a fetch result one sheet at a time
+
+    Each sheet becomes its own bytes chunk, so the six-sheet payload is never
+    joined into one string (and then encoded into a second copy) as jsonify
+    would do. Returns the chunk list and the ETag of their concatenation.
+    """
+    dumps = getattr(current_app.json, "dumps_bytes", None)
+    if dumps is None:
+        dumps = lambda obj: current_app.json.dumps(obj).encode("utf-8")
+    
+    chunks = [b'{']
+    for key, value in result.items():
+        if key != "sheets":
+            chunks.append(dumps(key) + b':' + dumps(value) + b',')
+    chunks.append(b'"sheets":{')
+    for index, (name, sheet) in enumerate((result.get("sheets") or {}).items()):
+        chunks.append((b',' if index else b'') + dumps(name) + b':' + dumps(sheet))
+    chunks.append(b'}}')
+    
+    digest = hashlib.sha1()
+    for chunk in chunks:
+        digest.update(chunk)
+    return chunks, digest.hexdigest()
 
 
-@google_sheets_bp.route('/list', methods=['GET', 'POST'])
 @jwt_required()
 def list_sheets_endpoint():
     """
@@ -50,14 +101,8 @@ def list_sheets_endpoint():
     POST body or GET params:
         spreadsheet_url: URL of the spreadsheet
     """
-    if not GOOGLE_SHEETS_AVAILABLE:
-        return jsonify({
-            "success": False,
-            "error": "Google Sheets service not available"
-        }), 503
-    
     try:
-        user = get_current_user()
+        user = current_user_ctx()
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
@@ -78,12 +123,12 @@ def list_sheets_endpoint():
         result = list_sheets(spreadsheet_url, creds_path)
         
         if result.get("success"):
-            return jsonify({
+            return _conditional_json({
                 "success": True,
                 "count": result.get("count", 0),
                 "sheets": result.get("sheets", []),
                 "spreadsheet_title": result.get("spreadsheet_title")
-            }), 200
+            }, 200)
         else:
             return jsonify({
                 "success": False,
@@ -91,13 +136,10 @@ def list_sheets_endpoint():
             }), 400
             
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Error listing sheets: {e}")
+        logger.exception("Error listing sheets: %s", e)
         return jsonify({'error': 'Failed to list sheets', 'details': str(e)}), 500
 
 
-@google_sheets_bp.route('/validate', methods=['POST'])
 @jwt_required()
 def validate_sheets_endpoint():
     """
@@ -107,14 +149,8 @@ def validate_sheets_endpoint():
         params_url: URL of Parameters sheet (required)
         preschedule_url: URL of Preschedule sheet (optional)
     """
-    if not GOOGLE_SHEETS_AVAILABLE:
-        return jsonify({
-            "success": False,
-            "error": "Google Sheets service not available"
-        }), 503
-    
     try:
-        user = get_current_user()
+        user = current_user_ctx()
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
@@ -137,13 +173,10 @@ def validate_sheets_endpoint():
         return jsonify(result), 200 if result.get("success") else 400
             
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Error validating sheets: {e}")
+        logger.exception("Error validating sheets: %s", e)
         return jsonify({'error': 'Failed to validate sheets', 'details': str(e)}), 500
 
 
-@google_sheets_bp.route('/fetch/<schedule_def_id>', methods=['GET'])
 @jwt_required()
 def fetch_schedule_data_endpoint(schedule_def_id):
     """
@@ -161,19 +194,13 @@ def fetch_schedule_data_endpoint(schedule_def_id):
     
     Data is filtered based on user role.
     """
-    if not GOOGLE_SHEETS_AVAILABLE:
-        return jsonify({
-            "success": False,
-            "error": "Google Sheets service not available"
-        }), 503
-    
     try:
-        user = get_current_user()
+        user = current_user_ctx()
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         # Find schedule definition
-        schedule_def = ScheduleDefinition.query.get(schedule_def_id)
+        schedule_def = db.session.get(ScheduleDefinition, schedule_def_id)
         if not schedule_def:
             return jsonify({'error': 'Schedule definition not found'}), 404
         
@@ -185,7 +212,7 @@ def fetch_schedule_data_endpoint(schedule_def_id):
         creds_path = current_app.config.get('GOOGLE_APPLICATION_CREDENTIALS', 'service-account-creds.json')
         
         # Get user role for filtering
-        user_role = user.role if user else None
+        user_role = user.role
         
         # Get month from query parameter if provided
         month = request.args.get('month') if request else None
@@ -193,12 +220,36 @@ def fetch_schedule_data_endpoint(schedule_def_id):
         # Fetch schedule data (all 6 sheets) with caching
         result = fetch_schedule_data(schedule_def_id, creds_path, user_role=user_role, month=month)
         
-        return jsonify(result), 200 if result.get("success") else 400
+        if not result.get("success") or not isinstance(result.get("sheets"), dict):
+            return _conditional_json(result, 200 if result.get("success") else 400)
+        
+        chunks, etag = _sheet_chunks(result)
+        response = current_app.response_class(chunks, mimetype="application/json")
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = f"private, max-age={SHEETS_CACHE_MAX_AGE}"
+        return response.make_conditional(request)
             
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Error fetching schedule data: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception("Error fetching schedule data: %s", e)
         return jsonify({'error': 'Failed to fetch schedule data', 'details': str(e)}), 500
+
+
+@jwt_required()
+def _sheets_unavailable(**kwargs):
+    """Stand-in for every sheets endpoint when the service failed to import"""
+    return current_app.response_class(_UNAVAILABLE_BODY, status=503, mimetype="application/json")
+
+
+# The service is imported once at module load, so whether each endpoint can
+# work is decided here rather than re-checked on every request
+for _rule, _view, _methods in (
+    ('/list', list_sheets_endpoint, ['GET', 'POST']),
+    ('/validate', validate_sheets_endpoint, ['POST']),
+    ('/fetch/<schedule_def_id>', fetch_schedule_data_endpoint, ['GET']),
+):
+    google_sheets_bp.add_url_rule(
+        _rule,
+        endpoint=_view.__name__,
+        view_func=_view if GOOGLE_SHEETS_AVAILABLE else _sheets_unavailable,
+        methods=_methods,
+    )
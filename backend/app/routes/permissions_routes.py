@@ -1,9 +1,10 @@
 # Permissions Routes - Matrix Format API
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app import db
 from ..models import SchedulePermission, User, ScheduleDefinition
 from ..utils.role_utils import is_client_admin_role, is_schedule_manager_role
+from ..utils.auth import load_current_user
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,9 +12,8 @@ logger = logging.getLogger(__name__)
 permissions_bp = Blueprint('permissions', __name__)
 
 def get_current_user():
-    """Get current authenticated user"""
-    current_user_id = get_jwt_identity()
-    return User.query.get(current_user_id)
+    """Get current authenticated user (loaded once per request)"""
+    return load_current_user()
 
 def require_admin_or_scheduler():
     """Decorator to require admin or scheduler role"""
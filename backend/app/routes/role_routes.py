@@ -1,6 +1,8 @@
 # Role Routes
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required
+import hashlib
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,25 +38,27 @@ DEFAULT_ROLES = [
     },
 ]
 
+# DEFAULT_ROLES never changes at runtime, so its response body and ETag are
+# built once at import instead of re-encoded on every poll
+_ROLES_BODY = json.dumps({
+    'success': True,
+    'data': DEFAULT_ROLES,
+}, ensure_ascii=False).encode('utf-8')
+_ROLES_ETAG = hashlib.md5(_ROLES_BODY).hexdigest()
+
 @role_bp.route('/', methods=['GET'])
 @role_bp.route('', methods=['GET'])
 @jwt_required()
 def get_roles():
     """Get all available roles with their configurations"""
-    # Handle CORS preflight
     try:
         # Return default roles for now
         # In the future, this could fetch from a database table
-        response = jsonify({
-            'success': True,
-            'data': DEFAULT_ROLES,
-        })
-        response.headers.add("Access-Control-Allow-Origin", "*")
-        return response, 200
+        response = current_app.response_class(_ROLES_BODY, mimetype='application/json')
+        response.set_etag(_ROLES_ETAG)
+        return response.make_conditional(request)
     except Exception as e:
         logger.error(f"Get roles error: {str(e)}")
-        response = jsonify({'error': 'Failed to retrieve roles', 'details': str(e)})
-        response.headers.add("Access-Control-Allow-Origin", "*")
-        return response, 500
+        return jsonify({'error': 'Failed to retrieve roles', 'details': str(e)}), 500
 
 
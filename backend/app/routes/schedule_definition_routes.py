@@ -1,9 +1,11 @@
 # Schedule Definition Routes
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from functools import wraps
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from .. import db
-from ..models import ScheduleDefinition, User, Department
+from ..models import ScheduleDefinition, Department
 try:
+    from marshmallow import EXCLUDE
     from ..schemas import ScheduleDefinitionSchema, ScheduleDefinitionUpdateSchema, PaginationSchema
     SCHEMAS_AVAILABLE = True
 except ImportError:
@@ -14,58 +16,144 @@ except ImportError:
 from ..utils.security import sanitize_input
 from ..utils.role_utils import is_client_admin_role, is_schedule_manager_role
 from ..utils.tenant_filter import get_tenant_filtered_query
+from ..utils.auth import load_current_user, current_user_ctx
+from ..utils.keyset import encode_cursor, after_cursor
+from ..services.google_sheets_sync_service import get_sheets_sync_service
+from .sysadmin_routes import invalidate_dashboard_stats
+from datetime import datetime
 import logging
+import threading
+import time
+import traceback
 
 logger = logging.getLogger(__name__)
+trace_logger = logging.getLogger('trace')
+
+# Schema instances hold no per-request state; build them once instead of per call
+# The list route also takes cursor/department_id/active/sync, so ignore them here
+_PAGINATION_SCHEMA = PaginationSchema(unknown=EXCLUDE) if SCHEMAS_AVAILABLE else None
+_DEFINITION_SCHEMA = ScheduleDefinitionSchema() if SCHEMAS_AVAILABLE else None
+_DEFINITION_UPDATE_SCHEMA = ScheduleDefinitionUpdateSchema() if SCHEMAS_AVAILABLE else None
+
+# PUT fields copied straight from the request body (no extra validation)
+_DEFINITION_PLAIN_FIELDS = (
+    'paramsSheetURL', 'prefsSheetURL', 'resultsSheetURL',
+    'schedulingAPI', 'remarks', 'is_active',
+)
 
 schedule_definition_bp = Blueprint('schedule_definitions', __name__)
 
+# Rendered list responses per (tenant scope, query string) -> (body, timestamp).
+# Cleared on every create/update/delete in this process; the TTL bounds how
+# stale other workers (and the background metadata refresh) can leave it
+LIST_CACHE_TTL = 60  # seconds
+LIST_CACHE_MAXSIZE = 256
+_list_cache = {}
+_list_cache_lock = threading.Lock()
+
+
+def _cached_list(f):
+    """Serve repeat GETs of the same definitions page from the in-process cache
+
+    ?sync=true always goes to the view, since it asks for a live refresh.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if request.args.get('sync', '').lower() == 'true':
+            return f(*args, **kwargs)
+        
+        ctx = current_user_ctx()
+        if ctx is None:
+            return f(*args, **kwargs)
+        # ClientAdmin lists are not tenant-filtered, so they share one scope
+        scope = '*' if ctx.is_client_admin else ctx.tenantID
+        key = (scope, request.query_string)
+        now = time.time()
+        
+        cached = _list_cache.get(key)
+        if cached is not None and now - cached[1] < LIST_CACHE_TTL:
+            return current_app.response_class(cached[0], status=200, mimetype='application/json'), 200
+        
+        response, status = f(*args, **kwargs)
+        if status == 200:
+            with _list_cache_lock:
+                if len(_list_cache) >= LIST_CACHE_MAXSIZE:
+                    # Oldest entry first (dicts keep insertion order)
+                    _list_cache.pop(next(iter(_list_cache)))
+                _list_cache.pop(key, None)
+                _list_cache[key] = (response.get_data(), now)
+        return response, status
+    return decorated_function
+
+
+def _trace_enabled():
+    """True when TRACE_REQUESTS is on and the trace logger would emit INFO"""
+    return current_app.config.get('TRACE_REQUESTS', False) and trace_logger.isEnabledFor(logging.INFO)
+
 def get_current_user():
-    """Get current authenticated user"""
-    current_user_id = get_jwt_identity()
-    return User.query.get(current_user_id)
+    """Get current authenticated user (loaded once per request)"""
+    return load_current_user()
+
+# Legacy role names allowed alongside client admins and schedule managers
+_ADMIN_OR_SCHEDULER_ROLES = frozenset({'admin', 'scheduler'})
 
 def require_admin_or_scheduler():
     """Decorator to require admin or scheduler role"""
     def decorator(f):
+        @wraps(f)
         def decorated_function(*args, **kwargs):
             user = get_current_user()
             if not user:
                 return jsonify({'error': 'Admin or scheduler access required'}), 403
+            role = user.role
             if not (
-                is_client_admin_role(user.role)
-                or is_schedule_manager_role(user.role)
-                or user.role in ['admin', 'scheduler']
+                role in _ADMIN_OR_SCHEDULER_ROLES
+                or is_client_admin_role(role)
+                or is_schedule_manager_role(role)
             ):
                 return jsonify({'error': 'Admin or scheduler access required'}), 403
             return f(*args, **kwargs)
-        decorated_function.__name__ = f.__name__
         return decorated_function
     return decorator
 
+def _sync_definitions_metadata(definitions):
+    """Refresh Google Sheets metadata for the given definitions in place (graceful fallback to DB data)"""
+    try:
+        # One batch for the page: each distinct spreadsheet is read once, one commit
+        results = get_sheets_sync_service().sync_schedule_definitions_metadata(definitions)
+    except Exception as sync_err:
+        # Log error but continue - ensure API always returns data
+        logger.warning(f"[Google Sheets Sync Error] Error syncing schedule definitions: {str(sync_err)}")
+        return
+    for defn in definitions:
+        sync_result = results.get(defn.scheduleDefID, {})
+        if sync_result.get('success'):
+            logger.info(f"[Google Sheets Sync] Synced metadata for {defn.scheduleName}: {sync_result.get('row_count', 0)} rows")
+        elif sync_result.get('skipped'):
+            # Gracefully skip if sheets not available - continue with DB data
+            logger.debug(f"[Google Sheets Sync] Skipped sync for {defn.scheduleName}: {sync_result.get('error', 'Unknown')}")
+        else:
+            logger.warning(f"[Google Sheets Sync Error] Sync failed for {defn.scheduleName}: {sync_result.get('error', 'Unknown')}")
+
 @schedule_definition_bp.route('/', methods=['GET'])
 @schedule_definition_bp.route('', methods=['GET'])  # Support both / and no slash
 @jwt_required()
+@_cached_list
 def get_schedule_definitions():
     """Get schedule definitions for current tenant (ClientAdmin can access all tenants)"""
-    import logging
-    trace_logger = logging.getLogger('trace')
-    
-    # Handle CORS preflight
-    # [TRACE] Logging
-    trace_logger.info(f"[TRACE] Backend: GET /schedule-definitions")
-    trace_logger.info(f"[TRACE] Backend: Path: {request.path}")
-    trace_logger.info(f"[TRACE] Backend: Full path: {request.full_path}")
-    trace_logger.info(f"[TRACE] Backend: Query params: {dict(request.args)}")
-    
-    try:
-        from flask_jwt_extended import get_jwt_identity, get_jwt
-        current_user_id = get_jwt_identity()
-        claims = get_jwt() or {}
-        trace_logger.info(f"[TRACE] Backend: User ID: {current_user_id}")
-        trace_logger.info(f"[TRACE] Backend: Role: {claims.get('role')}")
-    except:
-        pass
+    # [TRACE] Logging - only build the messages when someone will read them
+    trace = _trace_enabled()
+    if trace:
+        trace_logger.info("[TRACE] Backend: GET /schedule-definitions")
+        trace_logger.info("[TRACE] Backend: Path: %s", request.path)
+        trace_logger.info("[TRACE] Backend: Full path: %s", request.full_path)
+        trace_logger.info("[TRACE] Backend: Query params: %s", request.args.to_dict(flat=True))
+        try:
+            claims = get_jwt() or {}
+            trace_logger.info("[TRACE] Backend: User ID: %s", get_jwt_identity())
+            trace_logger.info("[TRACE] Backend: Role: %s", claims.get('role'))
+        except:
+            pass
     
     try:
         user = get_current_user()
@@ -76,17 +164,21 @@ def get_schedule_definitions():
         
         # Parse pagination parameters with safe defaults
         try:
-            if SCHEMAS_AVAILABLE and PaginationSchema:
-                pagination_schema = PaginationSchema()
-                pagination_data = pagination_schema.load(request.args)
-                page = int(pagination_data.get('page', 1))
-                per_page = int(min(pagination_data.get('per_page', 20), 100))
+            if _PAGINATION_SCHEMA is not None:
+                # Fields are Int with range validation, so load() already coerces and caps
+                pagination_data = _PAGINATION_SCHEMA.load(request.args)
+                page = pagination_data.get('page', 1)
+                per_page = pagination_data.get('per_page', 20)
             else:
                 page = int(request.args.get('page', 1) or 1)
                 per_page = int(min(int(request.args.get('per_page', 20) or 20), 100))
         except Exception:
-            page = 1
-            per_page = 20
+            try:
+                page = max(int(request.args.get('page', 1) or 1), 1)
+                per_page = max(min(int(request.args.get('per_page', 20) or 20), 100), 1)
+            except (TypeError, ValueError):
+                page = 1
+                per_page = 20
         
         # Query schedule definitions - ClientAdmin sees all, others see only their tenant
         definitions_query = get_tenant_filtered_query(ScheduleDefinition, user)
@@ -102,48 +194,46 @@ def get_schedule_definitions():
             is_active = active_filter.lower() == 'true'
             definitions_query = definitions_query.filter_by(is_active=is_active)
         
-        definitions_pagination = definitions_query.order_by(ScheduleDefinition.created_at.desc()).paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
-        
-        # Sync Google Sheets metadata for each schedule definition before returning
-        # This ensures the frontend always gets the latest data from Google Sheets
-        definitions_with_sync = []
-        for defn in definitions_pagination.items:
+        # Keyset pagination over (created_at, scheduleDefID), served by
+        # ix_schedule_def_tenant_created. ?cursor= continues after the last row
+        # of the previous page; without one, ?page= still works as an offset.
+        # One row past the page tells us whether there is more, so no COUNT(*).
+        cursor = request.args.get('cursor')
+        if cursor:
             try:
-                # Sync metadata from Google Sheets (non-blocking, graceful fallback)
-                from flask import current_app
-                from app.services.google_sheets_sync_service import GoogleSheetsSyncService
-                
-                creds_path = current_app.config.get('GOOGLE_APPLICATION_CREDENTIALS', 'service-account-creds.json')
-                sync_service = GoogleSheetsSyncService(creds_path)
-                
-                # Sync metadata (fetches from Google Sheets and updates DB)
-                sync_result = sync_service.sync_schedule_definition_metadata(defn, creds_path)
-                
-                if sync_result.get('success'):
-                    logger.info(f"[Google Sheets Sync] Synced metadata for {defn.scheduleName}: {sync_result.get('row_count', 0)} rows")
-                elif sync_result.get('skipped'):
-                    # Gracefully skip if sheets not available - continue with DB data
-                    logger.debug(f"[Google Sheets Sync] Skipped sync for {defn.scheduleName}: {sync_result.get('error', 'Unknown')}")
-                else:
-                    # Log error but continue - don't fail the request
-                    logger.warning(f"[Google Sheets Sync Error] Sync failed for {defn.scheduleName}: {sync_result.get('error', 'Unknown')}")
-            except Exception as sync_err:
-                # Log error but continue - ensure API always returns data
-                logger.warning(f"[Google Sheets Sync Error] Error syncing {defn.scheduleName}: {str(sync_err)}")
-            
-            # Convert to dict (after sync, so metadata is up to date)
-            definitions_with_sync.append(defn.to_dict())
+                definitions_query = after_cursor(
+                    definitions_query, ScheduleDefinition.created_at, ScheduleDefinition.scheduleDefID, cursor
+                )
+            except ValueError as e:
+                response = jsonify({'error': str(e)})
+                response.headers.add("Access-Control-Allow-Origin", "*")
+                return response, 400
+        definitions_query = definitions_query.order_by(
+            ScheduleDefinition.created_at.desc(),
+            ScheduleDefinition.scheduleDefID.desc(),
+        )
+        if not cursor and page > 1:
+            definitions_query = definitions_query.offset((page - 1) * per_page)
+        page_items = definitions_query.limit(per_page + 1).all()
+        has_more = len(page_items) > per_page
+        page_items = page_items[:per_page]
+        next_cursor = (
+            encode_cursor(page_items[-1].created_at, page_items[-1].scheduleDefID) if has_more else None
+        )
         
-        definitions = definitions_with_sync
+        # A plain GET only reads the DB; ?sync=true opts in to a live Google
+        # Sheets metadata refresh of this page.
+        if request.args.get('sync', '').lower() == 'true':
+            _sync_definitions_metadata(page_items)
+
+        definitions = [defn.to_dict() for defn in page_items]
 
         # Auto-sync: If no schedule definitions found and this is the first page, trigger sync
-        if len(definitions) == 0 and page == 1 and definitions_pagination.total == 0:
+        if len(definitions) == 0 and page == 1 and not cursor:
             logger.info("[AUTO-SYNC] No schedule definitions found, checking if schedule data needs syncing...")
             try:
+                # Optional module, not present in every deployment; the
+                # ImportError is handled below, so this stays a local import
                 from app.utils.auto_sync import sync_all_active_schedules_if_empty
                 sync_result = sync_all_active_schedules_if_empty(tenant_id=user.tenantID)
                 if sync_result:
@@ -151,16 +241,17 @@ def get_schedule_definitions():
             except Exception as sync_err:
                 logger.warning(f"[AUTO-SYNC] Error during auto-sync: {str(sync_err)}")
 
-        import logging
-        trace_logger = logging.getLogger('trace')
-        trace_logger.info(f"[TRACE] Backend: Returning {len(definitions)} schedule definitions")
-        trace_logger.info(f"[TRACE] Backend: Response structure: {{page: {page}, per_page: {per_page}, total: {definitions_pagination.total}, items: [{len(definitions)} items]}}")
+        if trace:
+            trace_logger.info("[TRACE] Backend: Returning %d schedule definitions", len(definitions))
+            trace_logger.info("[TRACE] Backend: Response structure: {page: %s, per_page: %s, has_more: %s, items: [%d items]}",
+                              page, per_page, has_more, len(definitions))
 
         # Return normalized structure
         response = jsonify({
             'page': page,
             'per_page': per_page,
-            'total': definitions_pagination.total,
+            'has_more': has_more,
+            'next_cursor': next_cursor,
             'items': definitions
         })
         response.headers.add("Access-Control-Allow-Origin", "*")
@@ -168,7 +259,6 @@ def get_schedule_definitions():
         
     except Exception as e:
         logger.error(f"Get schedule definitions error: {str(e)}")
-        import traceback
         logger.error(traceback.format_exc())
         response = jsonify({'error': 'Failed to retrieve schedule definitions', 'details': str(e)})
         response.headers.add("Access-Control-Allow-Origin", "*")
@@ -187,8 +277,7 @@ def create_schedule_definition():
             return jsonify({'error': 'No data provided'}), 400
         
         # Validate schedule definition data
-        definition_schema = ScheduleDefinitionSchema()
-        errors = definition_schema.validate(data)
+        errors = _DEFINITION_SCHEMA.validate(data)
         if errors:
             return jsonify({'error': 'Invalid schedule definition data', 'details': errors}), 400
         
@@ -220,6 +309,8 @@ def create_schedule_definition():
         
         db.session.add(definition)
         db.session.commit()
+        _list_cache.clear()
+        invalidate_dashboard_stats(current_user.tenantID)
         
         logger.info(f"New schedule definition created: {definition.scheduleName} by user: {current_user.username}")
         
@@ -274,8 +365,7 @@ def update_schedule_definition(definition_id):
             return jsonify({'error': 'No data provided'}), 400
         
         # Validate update data
-        update_schema = ScheduleDefinitionUpdateSchema()
-        errors = update_schema.validate(data)
+        errors = _DEFINITION_UPDATE_SCHEMA.validate(data)
         if errors:
             return jsonify({'error': 'Invalid update data', 'details': errors}), 400
         
@@ -292,9 +382,14 @@ def update_schedule_definition(definition_id):
         if 'scheduleName' in data:
             schedule_name = sanitize_input(data['scheduleName'])
             
-            # Check if new name conflicts
-            existing_defn = ScheduleDefinition.find_by_name(current_user.tenantID, schedule_name)
-            if existing_defn and existing_defn.scheduleDefID != definition_id:
+            # Check if new name conflicts (same case-insensitive rule as
+            # find_by_name, as a bounded EXISTS instead of loading the row)
+            name_taken = db.session.query(db.exists().where(
+                ScheduleDefinition.tenantID == current_user.tenantID,
+                db.func.lower(ScheduleDefinition.scheduleName) == db.func.lower(schedule_name),
+                ScheduleDefinition.scheduleDefID != definition_id
+            )).scalar()
+            if name_taken:
                 return jsonify({'error': 'Schedule definition with this name already exists'}), 409
             
             definition.scheduleName = schedule_name
@@ -306,63 +401,43 @@ def update_schedule_definition(definition_id):
                 return jsonify({'error': 'Invalid department'}), 400
             definition.departmentID = data['departmentID']
         
-        if 'paramsSheetURL' in data:
-            definition.paramsSheetURL = data['paramsSheetURL']
-        
-        if 'prefsSheetURL' in data:
-            definition.prefsSheetURL = data['prefsSheetURL']
-        
         # Track URL changes to trigger auto-regeneration
         url_changed = False
         if 'resultsSheetURL' in data:
             old_url = definition.resultsSheetURL
-            definition.resultsSheetURL = data['resultsSheetURL']
             if old_url != data['resultsSheetURL']:
                 url_changed = True
                 logger.info(f"[SCHEDULE] ResultsSheetURL changed for schedule: {definition.scheduleName}")
                 logger.info(f"[SCHEDULE] Old URL: {old_url}")
                 logger.info(f"[SCHEDULE] New URL: {data['resultsSheetURL']}")
         
-        if 'schedulingAPI' in data:
-            definition.schedulingAPI = data['schedulingAPI']
-        
-        if 'remarks' in data:
-            definition.remarks = data['remarks']
+        for field in _DEFINITION_PLAIN_FIELDS:
+            if field in data:
+                setattr(definition, field, data[field])
         
-        if 'is_active' in data:
-            definition.is_active = data['is_active']
-        
-        definition.updated_at = db.func.now()
+        # A Python value rather than func.now(), so the flushed row doesn't
+        # have to be re-read to render the response
+        definition.updated_at = datetime.utcnow()
+        # Serialized before commit: commit expires the instance, and reading it
+        # back afterwards would cost a full-row SELECT
+        definition_data = definition.to_dict()
         db.session.commit()
+        _list_cache.clear()
+        invalidate_dashboard_stats(current_user.tenantID)
         
-        logger.info(f"Schedule definition updated: {definition.scheduleName} by user: {current_user.username}")
+        logger.info(f"Schedule definition updated: {definition_data['scheduleName']} by user: {current_user.username}")
         
         # Trigger auto-regeneration if URL changed
         if url_changed:
             try:
-                from app.services.auto_regeneration_service import AutoRegenerationService
-                from flask import current_app
-                
-                creds_path = current_app.config.get('GOOGLE_APPLICATION_CREDENTIALS', 'service-account-creds.json')
-                auto_regen_service = AutoRegenerationService(credentials_path=creds_path)
-                
-                # Trigger regeneration in background (non-blocking)
-                import threading
-                def regenerate_in_background():
-                    try:
-                        result = auto_regen_service.validate_and_regenerate(definition.scheduleDefID)
-                        if result.get('regenerated'):
-                            logger.info(f"[SCHEDULE] Auto-regeneration triggered after URL change for schedule: {definition.scheduleName}")
-                        else:
-                            logger.info(f"[SCHEDULE] Auto-regeneration not needed: {result.get('reason', 'unknown')}")
-                    except Exception as e:
-                        logger.error(f"[SCHEDULE] Error during auto-regeneration after URL change: {e}")
-                
-                # Start background thread
-                thread = threading.Thread(target=regenerate_in_background)
-                thread.daemon = True
-                thread.start()
-                logger.info(f"[SCHEDULE] Started background auto-regeneration thread for schedule: {definition.scheduleName}")
+                # Queued on the Celery worker rather than a thread in this
+                # web worker, so it runs in an app context and is retried
+                celery_app = current_app.extensions.get('celery')
+                if celery_app is None:
+                    logger.warning(f"[SCHEDULE] Celery not configured - skipping auto-regeneration for schedule: {definition_data['scheduleName']}")
+                else:
+                    task = celery_app.send_task('regenerate_schedule', args=[definition_id], countdown=1)
+                    logger.info(f"[SCHEDULE] Queued auto-regeneration task {task.id} for schedule: {definition_data['scheduleName']}")
             except Exception as e:
                 logger.warning(f"[SCHEDULE] Failed to trigger auto-regeneration after URL change: {e}")
                 # Don't fail the update request if regeneration fails
@@ -370,7 +445,7 @@ def update_schedule_definition(definition_id):
         return jsonify({
             'success': True,
             'message': 'Schedule definition updated successfully',
-            'data': definition.to_dict()
+            'data': definition_data
         }), 200
         
     except Exception as e:
@@ -399,6 +474,8 @@ def delete_schedule_definition(definition_id):
         definition.is_active = False
         definition.updated_at = db.func.now()
         db.session.commit()
+        _list_cache.clear()
+        invalidate_dashboard_stats(current_user.tenantID)
         
         logger.info(f"Schedule definition deactivated: {definition.scheduleName} by user: {current_user.username}")
         
@@ -1,9 +1,11 @@
 # Schedule Job Log Routes
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app import db
 from ..models import ScheduleJobLog, User, ScheduleDefinition, SchedulePermission
 from ..utils.role_utils import is_sys_admin_role, is_client_admin_role, normalize_role, SYS_ADMIN_ROLE, CLIENT_ADMIN_ROLE
+from ..utils.auth import load_current_user
+from ..utils.pagination import paginate_with_total
 try:
     from app.schemas import ScheduleJobLogSchema, ScheduleJobLogUpdateSchema, PaginationSchema, JobRunSchema
     SCHEMAS_AVAILABLE = True
@@ -22,9 +24,8 @@ logger = logging.getLogger(__name__)
 schedule_job_log_bp = Blueprint('schedule_job_logs', __name__)
 
 def get_current_user():
-    """Get current authenticated user"""
-    current_user_id = get_jwt_identity()
-    return User.query.get(current_user_id)
+    """Get current authenticated user (loaded once per request)"""
+    return load_current_user()
 
 def require_admin_or_scheduler():
     """Decorator to require admin or scheduler role"""
@@ -131,11 +132,7 @@ def get_schedule_job_logs():
             except ValueError as e:
                 trace_logger.warning(f"[DEBUG] Invalid date_to format: {date_to}, error: {e}")
         
-        logs_pagination = logs_query.order_by(ScheduleJobLog.startTime.desc()).paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        logs_pagination = paginate_with_total(logs_query.order_by(ScheduleJobLog.startTime.desc()), page, per_page)
         
         logs = [log.to_dict() for log in logs_pagination.items]
         
@@ -1,9 +1,11 @@
 # Schedule Permission Routes
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app import db
 from ..models import SchedulePermission, User, ScheduleDefinition
 from ..utils.role_utils import is_client_admin_role, is_schedule_manager_role
+from ..utils.auth import load_current_user
+from ..utils.pagination import paginate_with_total
 try:
     from app.schemas import SchedulePermissionSchema, SchedulePermissionUpdateSchema, PaginationSchema
     SCHEMAS_AVAILABLE = True
@@ -19,9 +21,8 @@ logger = logging.getLogger(__name__)
 schedule_permission_bp = Blueprint('schedule_permissions', __name__)
 
 def get_current_user():
-    """Get current authenticated user"""
-    current_user_id = get_jwt_identity()
-    return User.query.get(current_user_id)
+    """Get current authenticated user (loaded once per request)"""
+    return load_current_user()
 
 def require_admin_or_scheduler():
     """Decorator to require admin or scheduler role"""
@@ -104,11 +105,7 @@ def get_schedule_permissions():
             is_active = active_filter.lower() == 'true'
             permissions_query = permissions_query.filter_by(is_active=is_active)
         
-        permissions_pagination = permissions_query.order_by(SchedulePermission.created_at.desc()).paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        permissions_pagination = paginate_with_total(permissions_query.order_by(SchedulePermission.created_at.desc()), page, per_page)
         
         permissions = [perm.to_dict() for perm in permissions_pagination.items]
         
@@ -517,13 +517,14 @@ def get_schedule():
             else:
                 logger.info(f"[TRACE] First schedule entry: {schedule_entries[0]}")
             
-            # Log the exact JSON being sent
-            import json
-            json_str = json.dumps(response_data, ensure_ascii=False, default=str)
+            # Encode once through the app's JSON provider and send the same
+            # body that was logged, instead of dumping the payload a second
+            # time with the stdlib encoder just for the debug line
+            json_str = current_app.json.dumps(response_data)
             logger.info(f"[DEBUG] JSON Response (first 500 chars): {json_str[:500]}")
             logger.info(f"[DEBUG] JSON Response length: {len(json_str)} bytes")
             
-            response = jsonify(response_data)
+            response = current_app.response_class(json_str, mimetype=current_app.json.mimetype)
             response = apply_cors_headers(response)
             duration_ms = (time.time() - start_time) * 1000
             trace_response(200, duration_ms, '/api/v1/schedule/')
@@ -549,7 +550,7 @@ def get_schedule():
                 'schedule': []
             }
             
-            logger.info(f"[DEBUG] Error response JSON: {json.dumps(error_response, ensure_ascii=False)}")
+            logger.info(f"[DEBUG] Error response JSON: {current_app.json.dumps(error_response)}")
             
             response = jsonify(error_response)
             response = apply_cors_headers(response)
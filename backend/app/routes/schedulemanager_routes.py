@@ -1,25 +1,34 @@
+from datetime import datetime, timedelta
+import logging
+import traceback
+
 from flask import Blueprint, jsonify, request
+from flask_jwt_extended import get_jwt_identity, get_jwt
+from sqlalchemy.orm import joinedload
 from celery.result import AsyncResult
 from celery import current_app as celery_current_app
+from .. import db
+from ..models import User, ScheduleJobLog, SchedulePermission
 from ..utils.auth import role_required
-from flask import current_app
 from ..services.google_io import summarize_sheet_target, get_default_input_url, get_default_output_url
+from ..services.dashboard_data_service import get_dashboard_data_service
+from .schedule_job_log_routes import run_schedule_job
+
+logger = logging.getLogger(__name__)
+trace_logger = logging.getLogger('trace')
 
 
 # Note: url_prefix set to None - will be set during registration in __init__.py
 schedulemanager_bp = Blueprint("schedulemanager", __name__)
 
+# ?limit= on /logs is clamped to 1..MAX_LOGS_PAGE_SIZE; older pages are reached with the keyset cursor
+MAX_LOGS_PAGE_SIZE = 200
+
 
 @schedulemanager_bp.route("/dashboard", methods=["GET"])
 @role_required("ScheduleManager")
 def dashboard():
     """Schedule Manager dashboard with scheduling, run, and export views"""
-    from flask_jwt_extended import get_jwt_identity
-    from app.models import User, ScheduleDefinition, ScheduleJobLog
-    import logging
-    
-    logger = logging.getLogger(__name__)
-    
     try:
         current_user_id = get_jwt_identity()
         user = User.query.get(current_user_id)
@@ -30,15 +39,22 @@ def dashboard():
             return response, 404
         
         # Get user's accessible schedule definitions
-        from app.models import SchedulePermission
-        permissions = SchedulePermission.get_valid_by_user(user.userID)
-        schedule_def_ids = [p.scheduleDefID for p in permissions]
+        schedule_def_ids = SchedulePermission.get_valid_ids_by_user(user.userID)
         
-        # Get recent job logs for user's schedules
-        recent_jobs = ScheduleJobLog.query.filter(
-            ScheduleJobLog.tenantID == user.tenantID,
-            ScheduleJobLog.scheduleDefID.in_(schedule_def_ids) if schedule_def_ids else False
-        ).order_by(ScheduleJobLog.startTime.desc()).limit(10).all() if schedule_def_ids else []
+        # Get recent job logs for user's schedules; no permissions means no
+        # logs, so skip the query entirely
+        if not schedule_def_ids:
+            recent_jobs = []
+        else:
+            # to_dict() embeds the runner and the schedule definition; load both
+            # with the logs instead of two lazy SELECTs per row
+            recent_jobs = ScheduleJobLog.query.options(
+                joinedload(ScheduleJobLog.run_by_user),
+                joinedload(ScheduleJobLog.schedule_definition),
+            ).filter(
+                ScheduleJobLog.tenantID == user.tenantID,
+                ScheduleJobLog.scheduleDefID.in_(schedule_def_ids)
+            ).order_by(ScheduleJobLog.startTime.desc()).limit(10).all()
         
         logger.info(f"[TRACE] ScheduleManager dashboard - accessible_schedules: {len(schedule_def_ids)}, recent_jobs: {len(recent_jobs)}")
         
@@ -54,7 +70,6 @@ def dashboard():
         return response, 200
     except Exception as e:
         logger.error(f"Error in schedulemanager dashboard: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         response = jsonify({"success": False, "error": str(e)})
         response.headers.add("Access-Control-Allow-Origin", "*")
@@ -64,9 +79,7 @@ def dashboard():
 @schedulemanager_bp.route("/run-task", methods=["POST"])
 @role_required("ScheduleManager")
 def run_task():
-    """Run a scheduling task - redirects to schedule-job-logs/run endpoint"""
-    from flask import redirect
-    
+    """Run a scheduling task - handled by the schedule-job-logs/run view"""
     # Use the proper endpoint from schedule_job_log_routes
     body = request.get_json(silent=True) or {}
     schedule_def_id = body.get("scheduleDefID")
@@ -74,8 +87,9 @@ def run_task():
     if not schedule_def_id:
         return jsonify({"error": "scheduleDefID is required"}), 400
     
-    # Forward to the schedule job logs run endpoint
-    return redirect(f"/api/v1/schedule-job-logs/run", code=307)
+    # Call the schedule job logs run view in-process instead of a 307 redirect,
+    # which cost the client a second round trip with the same body
+    return run_schedule_job()
 
 
 @schedulemanager_bp.route("/task-status/<task_id>", methods=["GET"])
@@ -94,16 +108,9 @@ def task_status(task_id: str):
 @role_required("ScheduleManager")
 def logs():
     """Get schedule job logs for current user"""
-    import logging
-    trace_logger = logging.getLogger('trace')
-    
     trace_logger.info("[TRACE] Backend: GET /schedulemanager/logs")
     trace_logger.info(f"[TRACE] Backend: Query params: {dict(request.args)}")
     
-    from flask_jwt_extended import get_jwt_identity, get_jwt
-    from app.models import User, ScheduleJobLog
-    from datetime import datetime, timedelta
-    
     try:
         current_user_id = get_jwt_identity()
         claims = get_jwt() or {}
@@ -118,33 +125,66 @@ def logs():
             return response, 404
         
         # Get query parameters
-        limit = request.args.get('limit', 50, type=int)
+        limit = max(1, min(request.args.get('limit', 50, type=int), MAX_LOGS_PAGE_SIZE))
         hours = request.args.get('hours', 24, type=int)
+        # Keyset cursor: the startTime/logID of the last log on the previous page
+        before_time = request.args.get('before_time')
+        before_id = request.args.get('before_id')
+        # compat=0 drops the duplicate "logs" copy of the list; clients should
+        # read "data", and the default flips once the frontend no longer needs it
+        compat = request.args.get('compat', '1') != '0'
         
-        trace_logger.info(f"[DEBUG] Fetch Params → limit={limit}, hours={hours}")
+        trace_logger.info(f"[DEBUG] Fetch Params → limit={limit}, hours={hours}, before_time={before_time}, before_id={before_id}")
         
-        # Get recent job logs for user's tenant
+        # Get recent job logs for user's tenant, newest first; logID breaks
+        # startTime ties so pages never overlap or skip rows
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
-        job_logs = ScheduleJobLog.query.filter(
+        stmt = db.select(ScheduleJobLog).options(
+            joinedload(ScheduleJobLog.run_by_user),
+            joinedload(ScheduleJobLog.schedule_definition),
+        ).where(
             ScheduleJobLog.tenantID == user.tenantID,
             ScheduleJobLog.startTime >= cutoff_time
-        ).order_by(ScheduleJobLog.startTime.desc()).limit(limit).all()
+        )
+        if before_time and before_id:
+            try:
+                cursor_time = datetime.fromisoformat(before_time.replace('Z', '+00:00')).replace(tzinfo=None)
+            except ValueError:
+                return jsonify({"error": "Invalid before_time, expected ISO 8601"}), 400
+            stmt = stmt.where(db.or_(
+                ScheduleJobLog.startTime < cursor_time,
+                db.and_(ScheduleJobLog.startTime == cursor_time, ScheduleJobLog.logID < before_id),
+            ))
+        stmt = stmt.order_by(
+            ScheduleJobLog.startTime.desc(), ScheduleJobLog.logID.desc()
+        ).limit(limit)
+        job_logs = db.session.scalars(stmt).all()
         
         trace_logger.info(f"[DEBUG] Checking Schedule Logs → count: {len(job_logs)}")
         if len(job_logs) == 0:
             trace_logger.warning(f"[DEBUG] No logs found - tenantID: {user.tenantID}, cutoff_time: {cutoff_time}")
         
-        response = jsonify({
+        serialized_logs = [log.to_dict() for log in job_logs]
+        # A full page means there may be more; hand back the cursor for it
+        next_cursor = None
+        if len(job_logs) == limit:
+            next_cursor = {
+                "before_time": serialized_logs[-1]["startTime"],
+                "before_id": job_logs[-1].logID,
+            }
+        payload = {
             "success": True,
-            "logs": [log.to_dict() for log in job_logs],
-            "data": [log.to_dict() for log in job_logs],  # Frontend compatibility
-            "count": len(job_logs)
-        })
+            "data": serialized_logs,
+            "count": len(job_logs),
+            "next_cursor": next_cursor
+        }
+        if compat:
+            payload["logs"] = serialized_logs  # Legacy key, same list as "data"
+        response = jsonify(payload)
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 200
     except Exception as e:
         trace_logger.error(f"[TRACE] Backend: Error in /schedulemanager/logs: {e}")
-        import traceback
         trace_logger.error(traceback.format_exc())
         response = jsonify({"error": str(e)})
         response.headers.add("Access-Control-Allow-Origin", "*")
@@ -161,15 +201,11 @@ def results(sheet_id: str):
 @role_required("ScheduleManager")
 def d1_scheduling():
     """D1 Scheduling Dashboard - View scheduling data from Google Sheets"""
-    from flask_jwt_extended import get_jwt_identity
-    from app.services.dashboard_data_service import DashboardDataService
-    
     try:
         current_user_id = get_jwt_identity()
         schedule_def_id = request.args.get('schedule_def_id')
         
-        creds_path = current_app.config.get('GOOGLE_APPLICATION_CREDENTIALS', 'service-account-creds.json')
-        service = DashboardDataService(creds_path)
+        service = get_dashboard_data_service()
         dashboard_data = service.get_schedule_manager_d1_data(current_user_id, schedule_def_id)
         
         if dashboard_data.get("success"):
@@ -177,8 +213,6 @@ def d1_scheduling():
         else:
             return jsonify(dashboard_data), 400
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Error in D1 dashboard: {e}")
         return jsonify({"error": str(e)}), 500
 
@@ -187,15 +221,11 @@ def d1_scheduling():
 @role_required("ScheduleManager")
 def d2_run():
     """D2 Run Dashboard - Data needed to run schedule from Google Sheets"""
-    from flask_jwt_extended import get_jwt_identity
-    from app.services.dashboard_data_service import DashboardDataService
-    
     try:
         current_user_id = get_jwt_identity()
         schedule_def_id = request.args.get('schedule_def_id')
         
-        creds_path = current_app.config.get('GOOGLE_APPLICATION_CREDENTIALS', 'service-account-creds.json')
-        service = DashboardDataService(creds_path)
+        service = get_dashboard_data_service()
         dashboard_data = service.get_schedule_manager_d2_data(current_user_id, schedule_def_id)
         
         if dashboard_data.get("success"):
@@ -203,8 +233,6 @@ def d2_run():
         else:
             return jsonify(dashboard_data), 400
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Error in D2 dashboard: {e}")
         return jsonify({"error": str(e)}), 500
 
@@ -213,15 +241,11 @@ def d2_run():
 @role_required("ScheduleManager")
 def d3_export():
     """D3 Export Dashboard - Final output from Google Sheets for export"""
-    from flask_jwt_extended import get_jwt_identity
-    from app.services.dashboard_data_service import DashboardDataService
-    
     try:
         current_user_id = get_jwt_identity()
         schedule_def_id = request.args.get('schedule_def_id')
         
-        creds_path = current_app.config.get('GOOGLE_APPLICATION_CREDENTIALS', 'service-account-creds.json')
-        service = DashboardDataService(creds_path)
+        service = get_dashboard_data_service()
         dashboard_data = service.get_schedule_manager_d3_data(current_user_id, schedule_def_id)
         
         if dashboard_data.get("success"):
@@ -229,8 +253,6 @@ def d3_export():
         else:
             return jsonify(dashboard_data), 400
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Error in D3 dashboard: {e}")
         return jsonify({"error": str(e)}), 500
 
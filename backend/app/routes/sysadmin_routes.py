@@ -1,14 +1,79 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import get_jwt_identity
 
-from ..models import User, Tenant, ScheduleDefinition, ScheduleJobLog
-from ..utils.auth import role_required
+from .. import db
+from ..models import Tenant, ScheduleDefinition, ScheduleJobLog
+from ..utils.auth import role_required, current_user_ctx, load_current_user
 from ..utils.role_utils import is_client_admin_role
+from ..utils.redis_cache import (
+    cache_get_json, cache_set_json, cache_delete, cache_delete_pattern, cache_json_response, redis_ping,
+)
+from ..services.dashboard_data_service import get_dashboard_data_service, b1_cache_key
 
 import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import time
 
 logger = logging.getLogger(__name__)
 
+# Dashboard COUNTs per scope ("clientadmin" or a tenantID), cached in Redis
+DASHBOARD_STATS_TTL = 60  # seconds
+CLIENT_ADMIN_SCOPE = "clientadmin"
+
+
+def _dashboard_stats_key(scope):
+    return f"sysadmin:dash:{scope}"
+
+
+# B1/B2/B3 payloads per user (and schedule for B3), cached in Redis; each
+# one costs several Google Sheets API reads to rebuild
+SHEET_DASHBOARD_TTL = 120  # seconds
+
+
+def _sheet_dashboard_key(view, user_id, *parts):
+    return ":".join(("sysadmin", view, str(user_id)) + parts)
+
+
+def _is_success(dashboard_data):
+    return bool(dashboard_data.get("success"))
+
+
+def _json_body_response(body):
+    return current_app.response_class(body, mimetype=current_app.json.mimetype)
+
+
+def invalidate_dashboard_stats(tenant_id=None):
+    """Drop cached dashboard counts and sheet views after a tenant or schedule definition changes"""
+    keys = [_dashboard_stats_key(CLIENT_ADMIN_SCOPE)]
+    if tenant_id:
+        keys.append(_dashboard_stats_key(tenant_id))
+    cache_delete(*keys)
+    # Sheet views are keyed per user, so they can only be found by pattern
+    for view in ("b1", "b2", "b3"):
+        cache_delete_pattern(f"sysadmin:{view}:*")
+
+
+# system_health runs its I/O checks side by side so the endpoint takes as long
+# as the slowest one, and a stuck dependency is reported as down after
+# HEALTH_CHECK_TIMEOUT instead of hanging the request
+HEALTH_CHECK_TIMEOUT = 1.0  # seconds
+_health_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="health-check")
+
+
+def _check_database(app):
+    with app.app_context():
+        try:
+            db.session.execute(db.text("SELECT 1"))
+            return True
+        except Exception as e:
+            logger.warning(f"[HEALTH] Database check failed: {e}")
+            return False
+
+
+def _check_redis(app):
+    with app.app_context():
+        return redis_ping()
+
 
 # Note: url_prefix set to None - will be set during registration in __init__.py
 sysadmin_bp = Blueprint("sysadmin", __name__)
@@ -19,29 +84,41 @@ sysadmin_bp = Blueprint("sysadmin", __name__)
 def dashboard():
     """ClientAdmin system dashboard with Organization and Schedule Maintenance views"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        # Tenant is joined in the same query; user.tenant is read below
+        user = load_current_user()
         
         if not user:
-            response = jsonify({"success": False, "error": "User not found"})
-            response.headers.add("Access-Control-Allow-Origin", "*")
-            return response, 404
+            return jsonify({"success": False, "error": "User not found"}), 404
         
         is_client_admin = is_client_admin_role(user.role)
+        scope = CLIENT_ADMIN_SCOPE if is_client_admin else user.tenantID
+        counts = cache_get_json(_dashboard_stats_key(scope))
+        if counts is None:
+            # Total and active come back from one aggregate per table;
+            # SUM(CASE ...) rather than COUNT(*) FILTER so SQLite handles it too
+            schedule_counts = db.session.query(
+                db.func.count(ScheduleDefinition.scheduleDefID),
+                db.func.coalesce(db.func.sum(db.case((ScheduleDefinition.is_active == True, 1), else_=0)), 0),
+            )
+            if is_client_admin:
+                total_tenants, active_tenants = db.session.query(
+                    db.func.count(Tenant.tenantID),
+                    db.func.coalesce(db.func.sum(db.case((Tenant.is_active == True, 1), else_=0)), 0),
+                ).one()
+            else:
+                tenant = user.tenant
+                total_tenants = 1 if tenant else 0
+                active_tenants = 1 if tenant and tenant.is_active else 0
+                schedule_counts = schedule_counts.filter(ScheduleDefinition.tenantID == user.tenantID)
+            total_schedules, active_schedules = schedule_counts.one()
+            counts = [int(total_tenants), int(active_tenants), int(total_schedules), int(active_schedules)]
+            cache_set_json(_dashboard_stats_key(scope), counts, DASHBOARD_STATS_TTL)
+        total_tenants, active_tenants, total_schedules, active_schedules = counts
+        
         if is_client_admin:
-            total_tenants = Tenant.query.count()
-            active_tenants = Tenant.query.filter_by(is_active=True).count()
-            total_schedules = ScheduleDefinition.query.count()
-            active_schedules = ScheduleDefinition.query.filter_by(is_active=True).count()
-            logger.info(f"[TRACE] ClientAdmin system dashboard stats - tenants: {total_tenants}, schedules: {total_schedules}")
+            logger.debug("[TRACE] ClientAdmin system dashboard stats - tenants: %s, schedules: %s", total_tenants, total_schedules)
         else:
-            logger.info("[TRACE] SysAdmin dashboard scoped to tenant %s", user.tenantID)
-            tenant = user.tenant
-            total_tenants = 1 if tenant else 0
-            active_tenants = 1 if tenant and tenant.is_active else 0
-            tenant_schedules = ScheduleDefinition.query.filter_by(tenantID=user.tenantID)
-            total_schedules = tenant_schedules.count()
-            active_schedules = tenant_schedules.filter_by(is_active=True).count()
+            logger.debug("[TRACE] SysAdmin dashboard scoped to tenant %s", user.tenantID)
         
         stats = {
             "total_tenants": total_tenants,
@@ -54,22 +131,16 @@ def dashboard():
             "activeSchedules": active_schedules  # Frontend compatibility
         }
         
-        response = jsonify({
+        return jsonify({
             "success": True,
             "dashboard": "clientadmin",
             "user": user.to_dict(),
             "stats": stats,
             "views": ["B1: Organization", "B2: Schedule List", "B3: Schedule Maintenance"]
-        })
-        response.headers.add("Access-Control-Allow-Origin", "*")
-        return response, 200
+        }), 200
     except Exception as e:
-        logger.error(f"Error in sysadmin dashboard: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
-        response = jsonify({"success": False, "error": str(e)})
-        response.headers.add("Access-Control-Allow-Origin", "*")
-        return response, 500
+        logger.exception("Error in sysadmin dashboard: %s", e)
+        return jsonify({"success": False, "error": str(e)}), 500
 
 
 @sysadmin_bp.route("/tenants", methods=["GET"])
@@ -81,8 +152,8 @@ def tenants():
 @sysadmin_bp.route("/tenant", methods=["POST"])
 @role_required("ClientAdmin", "SysAdmin")
 def create_tenant():
-    current_user = User.query.get(get_jwt_identity())
-    if not current_user or not is_client_admin_role(current_user.role):
+    current_user = current_user_ctx()
+    if not current_user or not current_user.is_client_admin:
         return jsonify({"error": "ClientAdmin access required"}), 403
     return jsonify({"created": True}), 201
 
@@ -90,8 +161,8 @@ def create_tenant():
 @sysadmin_bp.route("/tenant/<int:tenant_id>", methods=["PUT"])
 @role_required("ClientAdmin", "SysAdmin")
 def update_tenant(tenant_id: int):
-    current_user = User.query.get(get_jwt_identity())
-    if not current_user or not is_client_admin_role(current_user.role):
+    current_user = current_user_ctx()
+    if not current_user or not current_user.is_client_admin:
         return jsonify({"error": "ClientAdmin access required"}), 403
     return jsonify({"updated": True, "id": tenant_id})
 
@@ -102,7 +173,7 @@ def logs():
     """Get system logs"""
     # Handle CORS preflight
     try:
-        current_user = User.query.get(get_jwt_identity())
+        current_user = current_user_ctx()
         if not current_user:
             return jsonify({"success": False, "logs": [], "error": "User not found"}), 404
         
@@ -113,12 +184,23 @@ def logs():
         # TODO: Replace with Google Sheets fetch if system logs are stored in 'SystemLogs' sheet
         
         # ✅ VERIFICATION: 系統日誌 - DATABASE QUERY ONLY
-        logger.info(f"[TRACE] 系統日誌 source confirmed: sysadmin_routes.py:116 → ScheduleJobLog.query → DATABASE")
-        logger.info(f"[TRACE] Data flow: Frontend → /api/v1/sysadmin/logs → ScheduleJobLog.query → SQLite (schedule_job_logs table)")
-        logger.info(f"[TRACE] ✅ CONFIRMED: No Google Sheets API calls in logs endpoint")
-        log_query = ScheduleJobLog.query.order_by(ScheduleJobLog.created_at.desc())
-        if not is_client_admin_role(current_user.role):
-            log_query = log_query.filter_by(tenantID=current_user.tenantID)
+        logger.debug("[TRACE] 系統日誌 source confirmed: sysadmin_routes.py:116 → ScheduleJobLog.query → DATABASE")
+        logger.debug("[TRACE] Data flow: Frontend → /api/v1/sysadmin/logs → ScheduleJobLog.query → SQLite (schedule_job_logs table)")
+        logger.debug("[TRACE] ✅ CONFIRMED: No Google Sheets API calls in logs endpoint")
+        # Only the columns the response uses, as plain rows: no ORM instances,
+        # and job_metadata (JSON) never leaves the database
+        log_query = db.session.query(
+            ScheduleJobLog.logID,
+            ScheduleJobLog.status,
+            ScheduleJobLog.resultSummary,
+            ScheduleJobLog.error_message,
+            ScheduleJobLog.scheduleDefID,
+            ScheduleJobLog.startTime,
+            ScheduleJobLog.endTime,
+            ScheduleJobLog.created_at,
+        ).order_by(ScheduleJobLog.created_at.desc())
+        if not current_user.is_client_admin:
+            log_query = log_query.filter(ScheduleJobLog.tenantID == current_user.tenantID)
         logs = log_query.limit(limit).all()
         
         log_list = []
@@ -142,52 +224,49 @@ def logs():
                 }
             })
         
-        logger.info(f"[TRACE] Returning {len(log_list)} logs")
+        logger.debug("[TRACE] Returning %d logs", len(log_list))
         
-        response = jsonify({
+        return jsonify({
             "success": True,
             "logs": log_list,
             "data": log_list  # Frontend compatibility
-        })
-        response.headers.add("Access-Control-Allow-Origin", "*")
-        return response, 200
+        }), 200
     except Exception as e:
-        logger.error(f"Error fetching logs: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
-        response = jsonify({"success": False, "logs": [], "error": str(e)})
-        response.headers.add("Access-Control-Allow-Origin", "*")
-        return response, 500
+        logger.exception("Error fetching logs: %s", e)
+        return jsonify({"success": False, "logs": [], "error": str(e)}), 500
 
 
 @sysadmin_bp.route("/system-health", methods=["GET"])
 @role_required("ClientAdmin", "SysAdmin")
 def system_health():
     """System health check for ClientAdmin"""
-    from flask import current_app
-    import redis
-    
     # ✅ VERIFICATION: 系統健康狀態 - RUNTIME STATUS CHECKS ONLY
-    logger.info(f"[TRACE] 系統健康狀態 source confirmed: sysadmin_routes.py:system_health() → computed dynamically (runtime checks)")
-    logger.info(f"[TRACE] Data flow: Frontend → /api/v1/sysadmin/system-health → runtime_checks() → Redis/Celery status")
-    logger.info(f"[TRACE] ✅ CONFIRMED: No Google Sheets API calls in system-health endpoint")
+    logger.debug("[TRACE] 系統健康狀態 source confirmed: sysadmin_routes.py:system_health() → computed dynamically (runtime checks)")
+    logger.debug("[TRACE] Data flow: Frontend → /api/v1/sysadmin/system-health → runtime_checks() → Redis/Celery status")
+    logger.debug("[TRACE] ✅ CONFIRMED: No Google Sheets API calls in system-health endpoint")
     
     components = {
-        "database": True,
+        "database": False,
         "redis": False,
         "celery": False
     }
     
-    # Check Redis
-    try:
-        broker_url = current_app.config.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
-        r = redis.Redis.from_url(broker_url)
-        r.ping()
-        components["redis"] = True
-    except Exception:
-        pass
+    # Check the database and Redis concurrently
+    app = current_app._get_current_object()
+    futures = {
+        "database": _health_executor.submit(_check_database, app),
+        "redis": _health_executor.submit(_check_redis, app),
+    }
+    deadline = time.monotonic() + HEALTH_CHECK_TIMEOUT
+    for name, future in futures.items():
+        try:
+            components[name] = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeoutError:
+            logger.warning(f"[HEALTH] {name} check timed out after {HEALTH_CHECK_TIMEOUT}s")
+        except Exception as e:
+            logger.warning(f"[HEALTH] {name} check failed: {e}")
     
-    # Check Celery
+    # Check Celery (configuration lookup only, no I/O)
     try:
         from celery import current_app as celery_app
         components["celery"] = bool(getattr(celery_app, "conf", None))
@@ -205,43 +284,31 @@ def system_health():
 @role_required("ClientAdmin", "SysAdmin")
 def b1_organization():
     """B1 Organization Dashboard - Overview from Google Sheets"""
-    from flask_jwt_extended import get_jwt_identity
-    from flask import current_app
-    from app.services.dashboard_data_service import DashboardDataService
-    import os
-    import logging
-    
-    logger = logging.getLogger(__name__)
-    
     try:
-        current_user_id = get_jwt_identity()
-        
-        # Get credentials path - resolve to project root if relative
-        creds_path = current_app.config.get('GOOGLE_APPLICATION_CREDENTIALS', 'service-account-creds.json')
-        if not os.path.isabs(creds_path) and not os.path.exists(creds_path):
-            # Try project root
-            backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            project_root = os.path.dirname(backend_dir)
-            project_creds = os.path.join(project_root, 'service-account-creds.json')
-            if os.path.exists(project_creds):
-                creds_path = project_creds
-                logger.info(f"[TRACE] Found credentials at project root: {creds_path}")
-        logger.info(f"[TRACE] Using credentials path: {creds_path}")
-        logger.info(f"[TRACE] Credentials file exists: {os.path.exists(creds_path)}")
-        
-        service = DashboardDataService(creds_path)
-        dashboard_data = service.get_client_admin_b1_data(current_user_id)
+        # Shared per-app service: the credentials path (including the
+        # project-root fallback) is resolved once, not on every request
+        # The payload only depends on the scope and is normally precomputed
+        # by the refresh_b1_cache beat task, so this is a Redis read; a miss
+        # (cold cache, or just invalidated) is computed here and stored
+        user = current_user_ctx()
+        if not user:
+            return jsonify({"success": False, "error": "User not found"}), 404
+        tenant_id = None if user.is_client_admin else user.tenantID
+        service = get_dashboard_data_service()
+        body, dashboard_data = cache_json_response(
+            b1_cache_key(tenant_id),
+            SHEET_DASHBOARD_TTL,
+            lambda: service.get_b1_scope_data(tenant_id),
+            should_cache=_is_success,
+        )
+        if dashboard_data is None:
+            return _json_body_response(body), 200
         
-        logger.info(f"[TRACE] B1 dashboard data - success: {dashboard_data.get('success')}, error: {dashboard_data.get('error', 'None')}")
+        logger.debug("[TRACE] B1 dashboard data - success: %s, error: %s", dashboard_data.get('success'), dashboard_data.get('error', 'None'))
         
-        if dashboard_data.get("success"):
-            return jsonify(dashboard_data), 200
-        else:
-            return jsonify(dashboard_data), 400
+        return _json_body_response(body), 200 if dashboard_data.get("success") else 400
     except Exception as e:
-        logger.error(f"Error in B1 dashboard: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception("Error in B1 dashboard: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 
@@ -249,21 +316,19 @@ def b1_organization():
 @role_required("ClientAdmin", "SysAdmin")
 def b2_schedule_list():
     """B2 Schedule List Maintenance - List all schedules"""
-    from flask_jwt_extended import get_jwt_identity
-    from app.services.dashboard_data_service import DashboardDataService
-    
     try:
         current_user_id = get_jwt_identity()
-        service = DashboardDataService()
-        dashboard_data = service.get_client_admin_b2_data(current_user_id)
-        
-        if dashboard_data.get("success"):
-            return jsonify(dashboard_data), 200
-        else:
-            return jsonify(dashboard_data), 400
+        service = get_dashboard_data_service()
+        body, dashboard_data = cache_json_response(
+            _sheet_dashboard_key("b2", current_user_id),
+            SHEET_DASHBOARD_TTL,
+            lambda: service.get_client_admin_b2_data(current_user_id),
+            should_cache=_is_success,
+        )
+        if dashboard_data is None:
+            return _json_body_response(body), 200
+        return _json_body_response(body), 200 if dashboard_data.get("success") else 400
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Error in B2 dashboard: {e}")
         return jsonify({"error": str(e)}), 500
 
@@ -272,25 +337,21 @@ def b2_schedule_list():
 @role_required("ClientAdmin", "SysAdmin")
 def b3_schedule_maintenance():
     """B3 Schedule Maintenance - Detailed schedule sheets from Google Sheets"""
-    from flask_jwt_extended import get_jwt_identity
-    from flask import current_app
-    from app.services.dashboard_data_service import DashboardDataService
-    
     try:
         current_user_id = get_jwt_identity()
         schedule_def_id = request.args.get('schedule_def_id')
         
-        creds_path = current_app.config.get('GOOGLE_APPLICATION_CREDENTIALS', 'service-account-creds.json')
-        service = DashboardDataService(creds_path)
-        dashboard_data = service.get_client_admin_b3_data(current_user_id, schedule_def_id)
-        
-        if dashboard_data.get("success"):
-            return jsonify(dashboard_data), 200
-        else:
-            return jsonify(dashboard_data), 400
+        service = get_dashboard_data_service()
+        body, dashboard_data = cache_json_response(
+            _sheet_dashboard_key("b3", current_user_id, schedule_def_id or "default"),
+            SHEET_DASHBOARD_TTL,
+            lambda: service.get_client_admin_b3_data(current_user_id, schedule_def_id),
+            should_cache=_is_success,
+        )
+        if dashboard_data is None:
+            return _json_body_response(body), 200
+        return _json_body_response(body), 200 if dashboard_data.get("success") else 400
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Error in B3 dashboard: {e}")
         return jsonify({"error": str(e)}), 500
 
@@ -1,8 +1,9 @@
 # Tenant Routes
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from sqlalchemy.orm import load_only, raiseload
 from .. import db
-from ..models import Tenant, User
+from ..models import Tenant, User, Department, ScheduleDefinition, ScheduleJobLog
 try:
     from ..schemas import TenantSchema, TenantUpdateSchema, PaginationSchema
     SCHEMAS_AVAILABLE = True
@@ -13,25 +14,59 @@ except ImportError:
     PaginationSchema = None
 from ..utils.security import sanitize_input
 from ..utils.role_utils import is_sys_admin_role
+from ..utils.auth import current_user_ctx
+from ..utils.keyset import encode_cursor, after_cursor
+from .sysadmin_routes import invalidate_dashboard_stats
 import logging
 
 logger = logging.getLogger(__name__)
+trace_logger = logging.getLogger('trace')
 
 tenant_bp = Blueprint('tenants', __name__)
 
-def get_current_user():
-    """Get current authenticated user"""
-    current_user_id = get_jwt_identity()
-    return User.query.get(current_user_id)
+def _tenant_query():
+    """Tenant.query for the read endpoints.
+
+    The routes below serialize tenants from precomputed counts and never need
+    a lazy load, so in debug/testing any lazy relationship access raises
+    instead of quietly adding a query per tenant. The dynamic collections
+    (users, departments, ...) are query builders and are unaffected.
+    """
+    query = Tenant.query
+    if current_app.debug or current_app.testing:
+        query = query.options(raiseload('*'))
+    return query
+
+def _trace_enabled():
+    """True when TRACE_REQUESTS is on and the trace logger would emit INFO"""
+    return current_app.config.get('TRACE_REQUESTS', False) and trace_logger.isEnabledFor(logging.INFO)
+
+def _pagination_args():
+    """(page, per_page) from the query string; per_page is capped at 100"""
+    try:
+        if SCHEMAS_AVAILABLE and PaginationSchema:
+            pagination_data = PaginationSchema().load(request.args)
+            return int(pagination_data.get('page', 1)), min(int(pagination_data.get('per_page', 20)), 100)
+    except Exception:
+        pass
+    page = int(request.args.get('page', 1) or 1)
+    per_page = min(int(request.args.get('per_page', 20) or 20), 100)
+    return page, per_page
+
+# Columns Tenant.row_to_dict() reads
+_TENANT_LIST_COLUMNS = (
+    Tenant.tenantID, Tenant.tenantName, Tenant.created_at, Tenant.updated_at, Tenant.is_active,
+)
+
 
 def require_admin(allow_sysadmin: bool = False):
-    """Decorator to require admin role"""
+    """Decorator to require admin role (checked from the token claims, no User query)"""
     def decorator(f):
         def decorated_function(*args, **kwargs):
-            user = get_current_user()
+            user = current_user_ctx()
             if not user:
                 return jsonify({'error': 'Admin access required'}), 403
-            if user.is_admin():
+            if user.is_client_admin:
                 return f(*args, **kwargs)
             if allow_sysadmin and is_sys_admin_role(user.role):
                 return f(*args, **kwargs)
@@ -45,84 +80,77 @@ def require_admin(allow_sysadmin: bool = False):
 @jwt_required()
 @require_admin(allow_sysadmin=True)
 def get_tenants():
-    from flask import request, jsonify
-    import logging
-    trace_logger = logging.getLogger('trace')
-    
     """
     Get all tenants (admin only)
     
     Returns a paginated list of all tenants in the system.
     Only accessible by admin users.
     """
-    
-    # [TRACE] Logging
-    trace_logger.info(f"[TRACE] Backend: GET /tenants")
-    trace_logger.info(f"[TRACE] Backend: Path: {request.path}")
-    trace_logger.info(f"[TRACE] Backend: Full path: {request.full_path}")
-    trace_logger.info(f"[TRACE] Backend: Query params: {dict(request.args)}")
-    
-    try:
-        from flask_jwt_extended import get_jwt_identity, get_jwt
-        current_user_id = get_jwt_identity()
-        claims = get_jwt() or {}
-        trace_logger.info(f"[TRACE] Backend: User ID: {current_user_id}")
-        trace_logger.info(f"[TRACE] Backend: Role: {claims.get('role')}")
-        trace_logger.info(f"[TRACE] Backend: Username: {claims.get('username')}")
-    except:
-        pass
+    # [TRACE] Logging - only build the messages when someone will read them
+    trace = _trace_enabled()
+    if trace:
+        trace_logger.info("[TRACE] Backend: GET /tenants")
+        trace_logger.info("[TRACE] Backend: Path: %s", request.path)
+        trace_logger.info("[TRACE] Backend: Full path: %s", request.full_path)
+        trace_logger.info("[TRACE] Backend: Query params: %s", request.args.to_dict(flat=True))
+        try:
+            claims = get_jwt() or {}
+            trace_logger.info("[TRACE] Backend: User ID: %s", get_jwt_identity())
+            trace_logger.info("[TRACE] Backend: Role: %s", claims.get('role'))
+            trace_logger.info("[TRACE] Backend: Username: %s", claims.get('username'))
+        except:
+            pass
     
     try:
-        user = get_current_user()
+        user = current_user_ctx()
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
         # Parse pagination parameters with safe defaults
-        try:
-            if SCHEMAS_AVAILABLE and PaginationSchema:
-                pagination_schema = PaginationSchema()
-                pagination_data = pagination_schema.load(request.args)
-                page = int(pagination_data.get('page', 1))
-                per_page = min(int(pagination_data.get('per_page', 20)), 100)
-            else:
-                page = int(request.args.get('page', 1) or 1)
-                per_page = min(int(request.args.get('per_page', 20) or 20), 100)
-        except Exception:
-            page = int(request.args.get('page', 1) or 1)
-            per_page = min(int(request.args.get('per_page', 20) or 20), 100)
-        
-        # Query tenants with pagination
-        tenants_query = Tenant.query.order_by(Tenant.created_at.desc())
-        if not user.is_admin():
-            tenants_query = tenants_query.filter_by(tenantID=user.tenantID)
-
-        tenants_pagination = tenants_query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
-        
-        tenants = [tenant.to_dict() for tenant in tenants_pagination.items]
+        page, per_page = _pagination_args()
+        
+        # Query tenants newest-first with keyset pagination on
+        # (created_at, tenantID): ?cursor= continues after the previous page,
+        # ?page= is still accepted as an offset. per_page+1 rows tell us
+        # whether there's a next page without a COUNT(*). Plain column rows:
+        # no Tenant instances are built for a read-only listing
+        tenants_query = db.select(*_TENANT_LIST_COLUMNS)
+        if not user.is_client_admin:
+            tenants_query = tenants_query.filter(Tenant.tenantID == user.tenantID)
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                tenants_query = after_cursor(tenants_query, Tenant.created_at, Tenant.tenantID, cursor)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        tenants_query = tenants_query.order_by(Tenant.created_at.desc(), Tenant.tenantID.desc())
+        if not cursor and page > 1:
+            tenants_query = tenants_query.offset((page - 1) * per_page)
+        page_items = db.session.execute(tenants_query.limit(per_page + 1)).all()
+        has_next = len(page_items) > per_page
+        page_items = page_items[:per_page]
+        next_cursor = encode_cursor(page_items[-1].created_at, page_items[-1].tenantID) if has_next else None
+        
+        # Collection counts for the whole page in three grouped queries
+        # rather than three per tenant
+        counts = Tenant.get_collection_counts([row.tenantID for row in page_items])
+        tenants = [Tenant.row_to_dict(row, counts[row.tenantID]) for row in page_items]
+        
+        if trace:
+            trace_logger.info("[TRACE] Backend: Returning %d tenants", len(tenants))
+            trace_logger.info("[TRACE] Backend: Response structure: {success: True, data: [%d items], pagination: {...}}", len(tenants))
         
-        import logging
-        trace_logger = logging.getLogger('trace')
-        trace_logger.info(f"[TRACE] Backend: Returning {len(tenants)} tenants")
-        trace_logger.info(f"[TRACE] Backend: Response structure: {{success: True, data: [{len(tenants)} items], pagination: {{...}}}}")
-        
-        response = jsonify({
+        return jsonify({
             'success': True,
             'data': tenants,
             'pagination': {
                 'page': page,
                 'per_page': per_page,
-                'total': tenants_pagination.total,
-                'pages': tenants_pagination.pages,
-                'has_next': tenants_pagination.has_next,
-                'has_prev': tenants_pagination.has_prev
+                'has_next': has_next,
+                'has_prev': bool(cursor) or page > 1,
+                'next_cursor': next_cursor
             }
-        })
-        response.headers.add("Access-Control-Allow-Origin", "*")
-        return response, 200
+        }), 200
         
     except Exception as e:
         logger.error(f"Get tenants error: {str(e)}")
@@ -165,6 +193,7 @@ def create_tenant():
         
         db.session.add(tenant)
         db.session.commit()
+        invalidate_dashboard_stats(tenant.tenantID)
         
         logger.info(f"New tenant created: {tenant.tenantName} by user: {get_jwt_identity()}")
         
@@ -189,23 +218,24 @@ def get_tenant(tenant_id):
     Users can only access their own tenant unless they are admin.
     """
     try:
-        user = get_current_user()
+        user = current_user_ctx()
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         # Find tenant
-        tenant = Tenant.query.get(tenant_id)
+        tenant = _tenant_query().get(tenant_id)
         if not tenant:
             return jsonify({'error': 'Tenant not found'}), 404
         
         # Check access permissions
-        if not user.is_admin():
+        if not user.is_client_admin:
             if not (is_sys_admin_role(user.role) and user.tenantID == tenant_id):
                 return jsonify({'error': 'Access denied'}), 403
         
+        counts = Tenant.get_collection_counts([tenant.tenantID])[tenant.tenantID]
         return jsonify({
             'success': True,
-            'data': tenant.to_dict()
+            'data': tenant.to_dict(counts=counts)
         }), 200
         
     except Exception as e:
@@ -254,6 +284,7 @@ def update_tenant(tenant_id):
         
         tenant.updated_at = db.func.now()
         db.session.commit()
+        invalidate_dashboard_stats(tenant_id)
         
         logger.info(f"Tenant updated: {tenant.tenantID} by user: {get_jwt_identity()}")
         
@@ -293,6 +324,7 @@ def delete_tenant(tenant_id):
             user.status = 'inactive'
         
         db.session.commit()
+        invalidate_dashboard_stats(tenant_id)
         
         logger.info(f"Tenant deactivated: {tenant.tenantID} by user: {get_jwt_identity()}")
         
@@ -316,46 +348,68 @@ def get_tenant_stats(tenant_id):
     department counts, and recent activity.
     """
     try:
-        user = get_current_user()
+        user = current_user_ctx()
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         # Check access permissions
-        if not user.is_admin():
+        if not user.is_client_admin:
             if not (is_sys_admin_role(user.role) and user.tenantID == tenant_id):
                 return jsonify({'error': 'Access denied'}), 403
         
         # Find tenant
-        tenant = Tenant.query.get(tenant_id)
+        tenant = _tenant_query().get(tenant_id)
         if not tenant:
             return jsonify({'error': 'Tenant not found'}), 404
         
-        # Get statistics
+        # Get statistics: users come back from one GROUP BY role, and each
+        # other table from one total/active aggregate, instead of loading rows
+        # just to count or bucket them
+        def active_case(column, value=True):
+            return db.func.coalesce(db.func.sum(db.case((column == value, 1), else_=0)), 0)
+        
+        by_role = {}
+        users_total = users_active = 0
+        role_rows = db.session.query(
+            User.role, db.func.count(User.userID), active_case(User.status, 'active')
+        ).filter(User.tenantID == tenant_id).group_by(User.role).all()
+        for role, total, active in role_rows:
+            by_role[role] = total
+            users_total += total
+            users_active += int(active)
+        
+        departments_total, departments_active = db.session.query(
+            db.func.count(Department.departmentID), active_case(Department.is_active)
+        ).filter(Department.tenantID == tenant_id).one()
+        schedules_total, schedules_active = db.session.query(
+            db.func.count(ScheduleDefinition.scheduleDefID), active_case(ScheduleDefinition.is_active)
+        ).filter(ScheduleDefinition.tenantID == tenant_id).one()
+        recent_jobs = db.session.query(ScheduleJobLog.logID).filter(
+            ScheduleJobLog.tenantID == tenant_id
+        ).limit(5).count()
+        
         stats = {
-            'tenant': tenant.to_dict(),
+            'tenant': tenant.to_dict(counts={
+                'users': users_total,
+                'departments': departments_total,
+                'schedule_definitions': schedules_total,
+            }),
             'users': {
-                'total': tenant.users.count(),
-                'active': len(tenant.get_active_users()),
-                'by_role': {}
+                'total': users_total,
+                'active': users_active,
+                'by_role': by_role
             },
             'departments': {
-                'total': tenant.departments.count(),
-                'active': len(tenant.get_active_departments())
+                'total': departments_total,
+                'active': int(departments_active)
             },
             'schedule_definitions': {
-                'total': tenant.schedule_definitions.count(),
-                'active': tenant.schedule_definitions.filter_by(is_active=True).count()
+                'total': schedules_total,
+                'active': int(schedules_active)
             },
-            'recent_jobs': len(tenant.get_recent_job_logs(5))
+            'recent_jobs': recent_jobs
         }
         
-        # Count users by role
-        for user_obj in tenant.users:
-            role = user_obj.role
-            if role not in stats['users']['by_role']:
-                stats['users']['by_role'][role] = 0
-            stats['users']['by_role'][role] += 1
-        
         return jsonify({
             'success': True,
             'data': stats
@@ -369,31 +423,53 @@ def get_tenant_stats(tenant_id):
 @jwt_required()
 def get_tenant_users(tenant_id):
     """
-    Get all users for a specific tenant
+    Get users for a specific tenant
     
-    Returns a list of all users belonging to the specified tenant.
+    Returns one page of the tenant's users, newest first. Paginated like
+    GET /tenants: ?page=/?per_page= (max 100), or ?cursor= from next_cursor.
     """
     try:
-        user = get_current_user()
+        page, per_page = _pagination_args()
+        user = current_user_ctx()
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         # Check access permissions
-        if not user.is_admin():
+        if not user.is_client_admin:
             if not (is_sys_admin_role(user.role) and user.tenantID == tenant_id):
                 return jsonify({'error': 'Access denied'}), 403
         
         # Find tenant
-        tenant = Tenant.query.get(tenant_id)
+        tenant = _tenant_query().get(tenant_id)
         if not tenant:
             return jsonify({'error': 'Tenant not found'}), 404
         
-        # Get users
-        users = [user_obj.to_dict() for user_obj in tenant.users]
+        # Get one page of users with only the columns to_dict() needs
+        users_query = tenant.users.options(load_only(*User.summary_columns()))
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                users_query = after_cursor(users_query, User.created_at, User.userID, cursor)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        users_query = users_query.order_by(User.created_at.desc(), User.userID.desc())
+        if not cursor and page > 1:
+            users_query = users_query.offset((page - 1) * per_page)
+        page_items = users_query.limit(per_page + 1).all()
+        has_next = len(page_items) > per_page
+        page_items = page_items[:per_page]
+        next_cursor = encode_cursor(page_items[-1].created_at, page_items[-1].userID) if has_next else None
         
         return jsonify({
             'success': True,
-            'data': users
+            'data': [user_obj.to_dict() for user_obj in page_items],
+            'pagination': {
+                'page': page,
+                'per_page': per_page,
+                'has_next': has_next,
+                'has_prev': bool(cursor) or page > 1,
+                'next_cursor': next_cursor
+            }
         }), 200
         
     except Exception as e:
@@ -1,9 +1,13 @@
 # User Routes
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 from .. import db
-from ..models import User, Tenant, EmployeeMapping, SchedulePermission
-from ..utils.auth import role_required
+from ..models import User, Tenant, EmployeeMapping, SchedulePermission, ScheduleDefinition
+from ..utils.auth import role_required, current_user_ctx
+from ..utils.keyset import encode_cursor, after_cursor
+from ..utils.redis_cache import cache_get_json, cache_set_json
 from ..utils.role_utils import EMPLOYEE_ROLE, normalize_role
 try:
     from ..schemas import UserSchema, UserUpdateSchema, PaginationSchema
@@ -18,14 +22,30 @@ from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
+trace_logger = logging.getLogger('trace')
+
+# Schema instances hold no per-request state; build them once instead of per call
+_PAGINATION_SCHEMA = PaginationSchema() if SCHEMAS_AVAILABLE else None
+_USER_SCHEMA = UserSchema() if SCHEMAS_AVAILABLE else None
+_USER_UPDATE_SCHEMA = UserUpdateSchema() if SCHEMAS_AVAILABLE else None
 
 user_bp = Blueprint('users', __name__)
 
+# ?include_total=1 user counts per (tenant, role filter, status filter), cached in Redis
+USERS_TOTAL_TTL = 30  # seconds
+
+
+def _users_total_key(tenant_id, role_filter, status_filter):
+    return f"users:total:{tenant_id}:{role_filter or ''}:{status_filter or ''}"
+
+
+def _trace_enabled():
+    """True when TRACE_REQUESTS is on and the trace logger would emit INFO"""
+    return current_app.config.get('TRACE_REQUESTS', False) and trace_logger.isEnabledFor(logging.INFO)
 
 def get_current_user():
-    """Get current authenticated user"""
-    current_user_id = get_jwt_identity()
-    return User.query.get(current_user_id)
+    """Current user's identity from the token claims (no User query)"""
+    return current_user_ctx()
 
 def require_admin_or_self():
     """Decorator to require admin role or self access"""
@@ -36,7 +56,7 @@ def require_admin_or_self():
                 return jsonify({'error': 'User not found'}), 404
             
             # ClientAdmin can access any user, others can only access themselves
-            is_admin = current_user.is_admin()
+            is_admin = current_user.is_client_admin
             
             # Extract user_id from kwargs (route parameter)
             user_id = kwargs.get('user_id')
@@ -55,22 +75,19 @@ def require_admin_or_self():
 @role_required("ClientAdmin")
 def get_users():
     """Get users for current tenant"""
-    import logging
-    trace_logger = logging.getLogger('trace')
-    
-    trace_logger.info("[TRACE] Backend: GET /users")
-    trace_logger.info(f"[TRACE] Backend: Path: {request.path}")
-    trace_logger.info(f"[TRACE] Backend: Full path: {request.full_path}")
-    trace_logger.info(f"[TRACE] Backend: Query params: {dict(request.args)}")
-    
-    try:
-        from flask_jwt_extended import get_jwt_identity, get_jwt
-        current_user_id = get_jwt_identity()
-        claims = get_jwt() or {}
-        trace_logger.info(f"[TRACE] Backend: User ID: {current_user_id}")
-        trace_logger.info(f"[TRACE] Backend: Role: {claims.get('role')}")
-    except:
-        pass
+    # [TRACE] Logging - only build the messages when someone will read them
+    trace = _trace_enabled()
+    if trace:
+        trace_logger.info("[TRACE] Backend: GET /users")
+        trace_logger.info("[TRACE] Backend: Path: %s", request.path)
+        trace_logger.info("[TRACE] Backend: Full path: %s", request.full_path)
+        trace_logger.info("[TRACE] Backend: Query params: %s", request.args.to_dict(flat=True))
+        try:
+            claims = get_jwt() or {}
+            trace_logger.info("[TRACE] Backend: User ID: %s", get_jwt_identity())
+            trace_logger.info("[TRACE] Backend: Role: %s", claims.get('role'))
+        except:
+            pass
     
     try:
         user = get_current_user()
@@ -81,9 +98,8 @@ def get_users():
         
         # Parse pagination parameters with safe defaults
         try:
-            if SCHEMAS_AVAILABLE and PaginationSchema:
-                pagination_schema = PaginationSchema()
-                pagination_data = pagination_schema.load(request.args)
+            if _PAGINATION_SCHEMA is not None:
+                pagination_data = _PAGINATION_SCHEMA.load(request.args)
                 page = int(pagination_data.get('page', 1))
                 per_page = min(int(pagination_data.get('per_page', 20)), 100)
             else:
@@ -94,7 +110,8 @@ def get_users():
             per_page = min(int(request.args.get('per_page', 20) or 20), 100)
         
         # Query users for current tenant
-        users_query = User.query.filter_by(tenantID=user.tenantID)
+        # Plain column rows rather than User objects
+        users_query = User.query.filter_by(tenantID=user.tenantID).with_entities(*User.summary_columns())
         
         # Apply role filter if specified
         role_filter = request.args.get('role')
@@ -106,17 +123,37 @@ def get_users():
         if status_filter:
             users_query = users_query.filter_by(status=status_filter)
         
-        users_pagination = users_query.order_by(User.created_at.desc()).paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
-        
-        users = [user_obj.to_dict() for user_obj in users_pagination.items]
+        # Newest-first with keyset pagination on (created_at, userID):
+        # ?cursor= continues after the previous page, ?page= is still accepted
+        # as an offset. per_page+1 rows tell us whether there's a next page
+        # without a COUNT(*); ?include_total=1 asks for one (cached briefly)
+        total = None
+        if request.args.get('include_total') == '1':
+            total_key = _users_total_key(user.tenantID, role_filter, status_filter)
+            total = cache_get_json(total_key)
+            if total is None:
+                total = users_query.order_by(None).count()
+                cache_set_json(total_key, total, USERS_TOTAL_TTL)
+        
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                users_query = after_cursor(users_query, User.created_at, User.userID, cursor)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        users_query = users_query.order_by(User.created_at.desc(), User.userID.desc())
+        if not cursor and page > 1:
+            users_query = users_query.offset((page - 1) * per_page)
+        page_items = users_query.limit(per_page + 1).all()
+        has_next = len(page_items) > per_page
+        page_items = page_items[:per_page]
+        next_cursor = encode_cursor(page_items[-1].created_at, page_items[-1].userID) if has_next else None
+        
+        users = User.rows_to_dicts(page_items)
         
         # Auto-sync: If no users found and this is the first page, trigger sync for schedule data
         # Note: Users are typically created manually, but we can sync schedule data if cache is empty
-        if len(users) == 0 and page == 1 and users_pagination.total == 0:
+        if len(users) == 0 and page == 1 and not cursor:
             logger.info("[AUTO-SYNC] No users found in database, checking if schedule data needs syncing...")
             try:
                 from app.utils.auto_sync import sync_all_active_schedules_if_empty
@@ -126,8 +163,9 @@ def get_users():
             except Exception as sync_err:
                 logger.warning(f"[AUTO-SYNC] Error during auto-sync: {str(sync_err)}")
         
-        trace_logger.info(f"[TRACE] Backend: Returning {len(users)} users")
-        trace_logger.info(f"[TRACE] Backend: Response structure: {{success: True, data: [{len(users)} items], pagination: {{...}}}}")
+        if trace:
+            trace_logger.info("[TRACE] Backend: Returning %d users", len(users))
+            trace_logger.info("[TRACE] Backend: Response structure: {success: True, data: [%d items], pagination: {...}}", len(users))
         
         response = jsonify({
             'success': True,
@@ -135,10 +173,10 @@ def get_users():
             'pagination': {
                 'page': page,
                 'per_page': per_page,
-                'total': users_pagination.total,
-                'pages': users_pagination.pages,
-                'has_next': users_pagination.has_next,
-                'has_prev': users_pagination.has_prev
+                'has_next': has_next,
+                'has_prev': bool(cursor) or page > 1,
+                'next_cursor': next_cursor,
+                **({'total': total} if total is not None else {})
             }
         })
         response.headers.add("Access-Control-Allow-Origin", "*")
@@ -159,7 +197,7 @@ def create_user():
             return jsonify({'error': 'User not found'}), 404
         
         # Check if user is ClientAdmin
-        is_admin = current_user.is_admin()
+        is_admin = current_user.is_client_admin
         
         if not is_admin:
             return jsonify({'error': 'Admin access required'}), 403
@@ -169,10 +207,9 @@ def create_user():
             return jsonify({'error': 'No data provided'}), 400
         
         # Validate user data (inject tenantID so schema passes when frontend omits it)
-        user_schema = UserSchema()
         schema_payload = dict(data)
         schema_payload.setdefault('tenantID', current_user.tenantID)
-        errors = user_schema.validate(schema_payload)
+        errors = _USER_SCHEMA.validate(schema_payload)
         if errors:
             return jsonify({'error': 'Invalid user data', 'details': errors}), 400
         
@@ -197,16 +234,12 @@ def create_user():
         elif isinstance(employee_id, str):
             employee_id = employee_id.strip().upper()
         
-        # Check if username already exists (case-insensitive)
-        existing_user = User.find_by_username(username)
-        if existing_user:
+        # Username and employee_id must both be unused (case-insensitive); one query for both
+        username_taken, employee_id_taken = User.find_identity_conflicts(username, employee_id)
+        if username_taken:
             return jsonify({'error': 'Username already exists'}), 409
-        
-        # Ensure employee_id uniqueness when provided
-        if employee_id:
-            existing_employee = User.find_by_employee_id(employee_id)
-            if existing_employee:
-                return jsonify({'error': 'Employee ID already linked to another account'}), 409
+        if employee_id_taken:
+            return jsonify({'error': 'Employee ID already linked to another account'}), 409
         
         # Create user
         # Handle status field - convert is_active boolean to status string if needed
@@ -245,36 +278,38 @@ def create_user():
                         logger.warning(f"[WARN][ADMIN_CREATE] EmployeeMapping for '{normalized_identifier}' already linked to user '{existing_user.username if existing_user else employee_mapping.userID}'")
                     else:
                         # Link the found mapping
-                        logger.info(f"[TRACE][ADMIN_CREATE] Employee auto-linked: {normalized_identifier} -> userID {user.userID}")
+                        logger.info("[TRACE][ADMIN_CREATE] Employee auto-linked: %s -> userID %s", normalized_identifier, user.userID)
                         employee_mapping.userID = user.userID
                         employee_mapping.tenantID = current_user.tenantID  # Ensure tenant matches
                         employee_mapping.is_active = True
                         employee_mapping.updated_at = datetime.utcnow()
                         
                         # Also link any other EmployeeMapping records with the same sheets_identifier and tenant
-                        other_mappings = EmployeeMapping.query.filter(
-                            EmployeeMapping.sheets_identifier == normalized_identifier,
-                            EmployeeMapping.tenantID == current_user.tenantID,
-                            EmployeeMapping.userID.is_(None),
-                            EmployeeMapping.is_active == True
-                        ).all()
-                        
-                        for other_mapping in other_mappings:
-                            if other_mapping.mappingID != employee_mapping.mappingID:
-                                other_mapping.userID = user.userID
-                                other_mapping.updated_at = datetime.utcnow()
-                                logger.info(f"[TRACE][ADMIN_CREATE] Linked additional EmployeeMapping {other_mapping.mappingID} to user {user.userID}")
+                        # (one UPDATE, no rows loaded)
+                        linked = db.session.execute(
+                            db.update(EmployeeMapping)
+                            .where(
+                                EmployeeMapping.sheets_identifier == normalized_identifier,
+                                EmployeeMapping.tenantID == current_user.tenantID,
+                                EmployeeMapping.userID.is_(None),
+                                EmployeeMapping.is_active == True,
+                                EmployeeMapping.mappingID != employee_mapping.mappingID
+                            )
+                            .values(userID=user.userID, updated_at=datetime.utcnow())
+                        ).rowcount
+                        if linked:
+                            logger.info("[TRACE][ADMIN_CREATE] Linked %d additional EmployeeMapping record(s) to user %s", linked, user.userID)
                         
                         # Ensure user.employee_id is set
                         if not user.employee_id or user.employee_id.upper() != normalized_identifier:
                             user.employee_id = normalized_identifier
-                            logger.info(f"[TRACE][ADMIN_CREATE] Set user.employee_id to '{normalized_identifier}'")
+                            logger.info("[TRACE][ADMIN_CREATE] Set user.employee_id to '%s'", normalized_identifier)
                 else:
                     logger.warning(f"[WARN][ADMIN_CREATE] No EmployeeMapping found for '{normalized_identifier}'. User created but not linked to employee mapping.")
         
         db.session.commit()
         
-        logger.info(f"[TRACE][ADMIN_CREATE] New user created: {user.username} (employee_id: {user.employee_id or 'None'}) by admin: {current_user.username}")
+        logger.info("[TRACE][ADMIN_CREATE] New user created: %s (employee_id: %s) by admin: %s", user.username, user.employee_id or 'None', current_user.username)
         
         return jsonify({
             'success': True,
@@ -282,6 +317,11 @@ def create_user():
             'data': user.to_dict()
         }), 201
         
+    except IntegrityError as e:
+        # A concurrent request took the username or employee_id after the check above
+        db.session.rollback()
+        logger.warning(f"Create user conflict: {str(e)}")
+        return jsonify({'error': 'Username or Employee ID already exists'}), 409
     except Exception as e:
         db.session.rollback()
         logger.error(f"Create user error: {str(e)}")
@@ -294,14 +334,13 @@ def create_user():
 def get_user(user_id):
     """Get specific user information"""
     try:
-        user = User.query.get(user_id)
+        current_user = get_current_user()
+        user = db.session.get(User, user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        current_user = get_current_user()
-        
         # Check access permissions - allow ClientAdmin
-        is_admin = current_user.is_admin()
+        is_admin = current_user.is_client_admin
         
         if not is_admin and current_user.tenantID != user.tenantID:
             return jsonify({'error': 'Access denied'}), 403
@@ -327,20 +366,18 @@ def update_user(user_id):
             return jsonify({'error': 'No data provided'}), 400
         
         # Validate update data
-        update_schema = UserUpdateSchema()
-        errors = update_schema.validate(data)
+        errors = _USER_UPDATE_SCHEMA.validate(data)
         if errors:
             return jsonify({'error': 'Invalid update data', 'details': errors}), 400
         
         # Find user
-        user = User.query.get(user_id)
+        current_user = get_current_user()
+        user = db.session.get(User, user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        current_user = get_current_user()
-        
         # Check access permissions - allow ClientAdmin
-        is_admin = current_user.is_admin()
+        is_admin = current_user.is_client_admin
         
         if not is_admin and current_user.tenantID != user.tenantID:
             return jsonify({'error': 'Access denied'}), 403
@@ -427,13 +464,13 @@ def update_user(user_id):
         if EmployeeMapping:
             if will_be_employee and new_employee_id:
                 normalized_identifier = new_employee_id.upper()
-                mappings = EmployeeMapping.query.filter_by(userID=user.userID).all()
-                if mappings:
-                    for mapping in mappings:
-                        mapping.sheets_identifier = normalized_identifier
-                        mapping.is_active = True
-                        mapping.updated_at = datetime.utcnow()
-                else:
+                # Re-point the user's existing mappings in one UPDATE
+                updated = db.session.execute(
+                    db.update(EmployeeMapping)
+                    .where(EmployeeMapping.userID == user.userID)
+                    .values(sheets_identifier=normalized_identifier, is_active=True, updated_at=datetime.utcnow())
+                ).rowcount
+                if not updated:
                     mapping = EmployeeMapping.find_by_sheets_identifier(normalized_identifier)
                     if mapping and mapping.userID and mapping.userID != user.userID:
                         logger.warning(f"[WARN][ADMIN_UPDATE] EmployeeMapping for '{normalized_identifier}' already linked to user '{mapping.userID}'")
@@ -445,16 +482,17 @@ def update_user(user_id):
                     else:
                         logger.warning(f"[WARN][ADMIN_UPDATE] No EmployeeMapping found for '{normalized_identifier}'.")
             elif was_employee and not will_be_employee:
-                mappings = EmployeeMapping.query.filter_by(userID=user.userID).all()
-                for mapping in mappings:
-                    mapping.userID = None
-                    mapping.updated_at = datetime.utcnow()
+                db.session.execute(
+                    db.update(EmployeeMapping)
+                    .where(EmployeeMapping.userID == user.userID)
+                    .values(userID=None, updated_at=datetime.utcnow())
+                )
         
         # Note: departmentID is not stored on User model today. Placeholder retained for future use.
         if 'departmentID' in data:
             pass
         
-        user.updated_at = db.func.now()
+        user.updated_at = datetime.utcnow()
         db.session.commit()
         
         logger.info(f"User updated: {user.username} by user: {current_user.username}")
@@ -481,13 +519,13 @@ def delete_user(user_id):
             return jsonify({'error': 'User not found'}), 404
         
         # Check if user is ClientAdmin
-        is_admin = current_user.is_admin()
+        is_admin = current_user.is_client_admin
         
         if not is_admin:
             return jsonify({'error': 'Admin access required'}), 403
         
         # Find user
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
@@ -497,7 +535,7 @@ def delete_user(user_id):
         
         # Soft delete (deactivate)
         user.status = 'inactive'
-        user.updated_at = db.func.now()
+        user.updated_at = datetime.utcnow()
         db.session.commit()
         
         logger.info(f"User deactivated: {user.username} by admin: {current_user.username}")
@@ -526,12 +564,12 @@ def update_user_role(user_id):
     if not new_role:
         return jsonify({'error': 'role is required'}), 400
     
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
     user.role = normalize_role(new_role)
-    user.updated_at = db.func.now()
+    user.updated_at = datetime.utcnow()
     db.session.commit()
     
     return jsonify({'success': True, 'data': user.to_dict()}), 200
@@ -545,10 +583,19 @@ def get_user_permissions(user_id):
     GET /api/v1/users/<user_id>/permissions
     curl /api/v1/users/USER123/permissions -H "Authorization: Bearer <token>"
     """
-    permissions = SchedulePermission.query.filter_by(userID=user_id).all()
+    # to_dict() serializes the user and schedule definition of every
+    # permission: load both with one IN query each, and the definitions'
+    # permission/job log counts with one GROUP BY each
+    permissions = SchedulePermission.query.options(
+        selectinload(SchedulePermission.user),
+        selectinload(SchedulePermission.schedule_definition),
+    ).filter_by(userID=user_id).all()
+    definition_counts = ScheduleDefinition.get_collection_counts(
+        list({perm.scheduleDefID for perm in permissions if perm.scheduleDefID})
+    )
     return jsonify({
         'success': True,
-        'data': [perm.to_dict() for perm in permissions]
+        'data': [perm.to_dict(definition_counts=definition_counts.get(perm.scheduleDefID)) for perm in permissions]
     }), 200
 
 
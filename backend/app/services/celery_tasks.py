@@ -35,6 +35,9 @@ def bind_celery(celery_app):
     # Register the schedule execution task
     register_schedule_execution_task(celery_app)
     
+    # Register the per-definition auto-regeneration task
+    register_regeneration_task(celery_app)
+    
     # Log all registered tasks after registration
     registered_tasks = list(celery_app.tasks.keys())
     schedule_tasks = [t for t in registered_tasks if 'schedule' in t.lower() or 'execute' in t.lower()]
@@ -228,6 +231,42 @@ def register_schedule_execution_task(celery_app):
     return execute_scheduling_task
 
 
+def register_regeneration_task(celery_app):
+    """
+    Register regenerate_schedule, queued when a schedule definition's sheet URLs change
+    """
+    import logging
+    
+    logger = logging.getLogger(__name__)
+    
+    @celery_app.task(name="regenerate_schedule", bind=True, max_retries=3)
+    def regenerate_schedule(self, schedule_def_id):
+        """
+        Validate a schedule definition's sheets and regenerate its schedule if needed.
+        Retries (30s apart) on errors such as Google API 5xx responses.
+        
+        Args:
+            schedule_def_id: ID of the schedule definition whose URLs changed
+        """
+        from flask import current_app as flask_app
+        from app.services.auto_regeneration_service import AutoRegenerationService
+        
+        try:
+            creds_path = flask_app.config.get('GOOGLE_APPLICATION_CREDENTIALS', 'service-account-creds.json')
+            result = AutoRegenerationService(credentials_path=creds_path).validate_and_regenerate(schedule_def_id)
+        except Exception as e:
+            logger.warning(f"[SCHEDULE] Auto-regeneration failed for {schedule_def_id}, retrying: {e}")
+            raise self.retry(exc=e, countdown=30)
+        
+        if result.get('regenerated'):
+            logger.info(f"[SCHEDULE] Auto-regeneration triggered after URL change for schedule: {schedule_def_id}")
+        else:
+            logger.info(f"[SCHEDULE] Auto-regeneration not needed: {result.get('reason', 'unknown')}")
+        return result
+    
+    return regenerate_schedule
+
+
 def register_periodic_tasks(celery_app):
     """Register periodic tasks (including daily midnight auto-run)."""
     try:
@@ -258,6 +297,10 @@ def register_periodic_tasks(celery_app):
             'task': 'daily_sync_all_schedules',
             'schedule': crontab(minute=0, hour=2),
         },
+        'refresh-b1-cache-every-5-mins': {
+            'task': 'refresh_b1_cache',
+            'schedule': crontab(minute="*/5"),
+        },
     }
 
     if enable_test_tasks:
@@ -309,6 +352,13 @@ def register_periodic_tasks(celery_app):
             daily_sync_all_schedules.s(),
             name="daily-sync-all-schedules-2am",
         )
+        # Precompute the B1 organization dashboard per scope into Redis, so
+        # GET /sysadmin/b1-organization doesn't wait on Google Sheets
+        sender.add_periodic_task(
+            beat_schedule_definition['refresh-b1-cache-every-5-mins']['schedule'],
+            refresh_b1_cache_task.s(),
+            name="refresh-b1-cache-every-5-mins",
+        )
 
     @celery_app.task(name="trigger_sheet_run")
     def trigger_sheet_run():
@@ -659,6 +709,27 @@ def register_periodic_tasks(celery_app):
             logger.error(f"[DAILY_SYNC] Traceback: {traceback.format_exc()}")
             return {"success": False, "error": str(e)}
     
+    @celery_app.task(name="refresh_b1_cache")
+    def refresh_b1_cache_task():
+        """
+        Periodic task to precompute the B1 organization dashboard into Redis,
+        once for the client-admin scope and once per active tenant.
+        """
+        try:
+            from app.services.dashboard_data_service import get_dashboard_data_service, refresh_b1_cache
+            import logging
+            
+            logger = logging.getLogger(__name__)
+            logger.info("[B1_CACHE] 🔄 Refreshing B1 dashboard cache...")
+            result = refresh_b1_cache(get_dashboard_data_service())
+            logger.info(f"[B1_CACHE] ✅ Refreshed {result['refreshed']} scopes ({result['failed']} failed)")
+            return {"success": True, **result}
+        except Exception as e:
+            import logging, traceback
+            logger = logging.getLogger(__name__)
+            logger.error(f"[B1_CACHE] ❌ B1 cache refresh failed:\n{traceback.format_exc()}")
+            return {"success": False, "error": str(e)}
+    
     @celery_app.task(name="refresh_google_sheets_data")
     def refresh_google_sheets_data():
         """
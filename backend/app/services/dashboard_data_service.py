@@ -19,6 +19,7 @@ from .google_sheets_import import (
     fetch_schedule_data,
     GoogleSheetsService
 )
+from ..extensions import db
 from ..utils.role_utils import is_client_admin_role
 
 # Aliases for convenience
@@ -72,7 +73,7 @@ class DashboardDataService:
             
             logger.info(f"[TRACE] get_employee_dashboard_data - user_id: {user_id}, schedule_def_id: {schedule_def_id}")
             
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 logger.error(f"[TRACE] User not found for user_id: {user_id}")
                 return {"success": False, "error": "User not found"}
@@ -230,7 +231,6 @@ class DashboardDataService:
             # Step 1: Try to get mapping from database (EmployeeMapping table)
             employee_identifier_from_mapping = None
             from app.models import EmployeeMapping
-            from app import db
             
             logger.info(f"[TRACE] Looking up EmployeeMapping for user_id: {user_id}, schedule_def_id: {schedule_def.scheduleDefID}")
             employee_mapping_record = EmployeeMapping.find_by_user(user_id, schedule_def.scheduleDefID)
@@ -485,7 +485,7 @@ class DashboardDataService:
             from flask import current_app
             from app.models import ScheduleDefinition, User
             
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 return {"success": False, "error": "User not found"}
             
@@ -571,7 +571,7 @@ class DashboardDataService:
             from flask import current_app
             from app.models import ScheduleDefinition, User
             
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 return {"success": False, "error": "User not found"}
             
@@ -647,7 +647,7 @@ class DashboardDataService:
             from flask import current_app
             from app.models import ScheduleDefinition, User
             
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 return {"success": False, "error": "User not found"}
             
@@ -731,10 +731,9 @@ class DashboardDataService:
             return {"success": False, "error": "Google Sheets service not available"}
         
         try:
-            from flask import current_app
-            from app.models import ScheduleDefinition, User, Tenant
+            from app.models import User
             
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 return {"success": False, "error": "User not found"}
             
@@ -745,9 +744,29 @@ class DashboardDataService:
                 user.username,
                 is_client_admin,
             )
+        except Exception as e:
+            logger.error(f"Error getting B1 dashboard data: {e}")
+            return {"success": False, "error": str(e)}
+        
+        return self.get_b1_scope_data(None if is_client_admin else user.tenantID)
+    
+    def get_b1_scope_data(self, tenant_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        B1 Organization overview for a scope rather than a user
+        
+        The payload only depends on the scope: every tenant for client admins
+        (tenant_id=None), or one tenant. That lets the refresh_b1_cache task
+        precompute it for each scope, shared by all users in it.
+        """
+        if not sheets_import_module.SHEETS_AVAILABLE:
+            return {"success": False, "error": "Google Sheets service not available"}
+        
+        try:
+            from app.models import ScheduleDefinition, Tenant
             
-            tenant_query = Tenant.query if is_client_admin else Tenant.query.filter_by(tenantID=user.tenantID)
-            schedule_query = ScheduleDefinition.query if is_client_admin else ScheduleDefinition.query.filter_by(tenantID=user.tenantID)
+            is_client_admin = tenant_id is None
+            tenant_query = Tenant.query if is_client_admin else Tenant.query.filter_by(tenantID=tenant_id)
+            schedule_query = ScheduleDefinition.query if is_client_admin else ScheduleDefinition.query.filter_by(tenantID=tenant_id)
             
             total_tenants = tenant_query.count()
             active_tenants = tenant_query.filter_by(is_active=True).count()
@@ -821,7 +840,7 @@ class DashboardDataService:
             from flask import current_app
             from app.models import ScheduleDefinition, User
             
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 return {"success": False, "error": "User not found"}
             
@@ -867,7 +886,7 @@ class DashboardDataService:
             from flask import current_app
             from app.models import ScheduleDefinition, User
             
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 return {"success": False, "error": "User not found"}
             
@@ -930,7 +949,7 @@ class DashboardDataService:
             from flask import current_app
             from app.models import User, Tenant, Department
             
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 return {"success": False, "error": "User not found"}
             
@@ -938,14 +957,16 @@ class DashboardDataService:
             if not tenant:
                 return {"success": False, "error": "Tenant not found"}
             
-            departments = Department.query.filter_by(tenantID=tenant.tenantID).all()
+            departments = Department.query.filter_by(tenantID=tenant.tenantID).with_entities(
+                *Department.summary_columns()
+            ).all()
             
             return {
                 "success": True,
                 "dashboard": "C1_Tenant",
                 "data": {
                     "tenant": tenant.to_dict(),
-                    "departments": [d.to_dict() for d in departments],
+                    "departments": Department.rows_to_dicts(departments),
                     "stats": {
                         "total_departments": len(departments),
                         "total_users": tenant.users.count()
@@ -965,18 +986,20 @@ class DashboardDataService:
             from flask import current_app
             from app.models import User, Tenant, Department
             
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 return {"success": False, "error": "User not found"}
             
             tenant = user.tenant
-            departments = Department.query.filter_by(tenantID=tenant.tenantID).all()
+            departments = Department.query.filter_by(tenantID=tenant.tenantID).with_entities(
+                *Department.summary_columns()
+            ).all()
             
             return {
                 "success": True,
                 "dashboard": "C2_Department",
                 "data": {
-                    "departments": [d.to_dict() for d in departments]
+                    "departments": Department.rows_to_dicts(departments)
                 }
             }
         except Exception as e:
@@ -992,7 +1015,7 @@ class DashboardDataService:
             from flask import current_app
             from app.models import User, Tenant
             
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 return {"success": False, "error": "User not found"}
             
@@ -1019,7 +1042,7 @@ class DashboardDataService:
             from flask import current_app
             from app.models import User, Tenant, SchedulePermission
             
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 return {"success": False, "error": "User not found"}
             
@@ -1172,6 +1195,56 @@ class DashboardDataService:
         return filtered
 
 
+# Precomputed B1 payloads per scope ("clientadmin" or a tenantID), written by
+# the refresh_b1_cache beat task every 5 minutes; the TTL spans a few missed runs
+B1_CACHE_TTL = 900  # seconds
+B1_CLIENT_ADMIN_SCOPE = "clientadmin"
+
+
+def b1_cache_key(tenant_id: Optional[str] = None) -> str:
+    """Redis key of the B1 payload for a scope (tenant_id=None: client admins)"""
+    return f"sysadmin:b1:scope:{tenant_id or B1_CLIENT_ADMIN_SCOPE}"
+
+
+def refresh_b1_cache(service: DashboardDataService) -> Dict[str, int]:
+    """
+    Recompute and store the B1 payload for the client-admin scope and every active tenant
+    
+    Returns:
+        {"refreshed": n, "failed": n}
+    """
+    from app.models import Tenant
+    from app.utils.redis_cache import cache_set_json
+    
+    scopes = [None] + [tenant_id for (tenant_id,) in Tenant.query.with_entities(Tenant.tenantID).filter_by(is_active=True)]
+    refreshed = failed = 0
+    for tenant_id in scopes:
+        data = service.get_b1_scope_data(tenant_id)
+        if data.get("success"):
+            cache_set_json(b1_cache_key(tenant_id), data, B1_CACHE_TTL)
+            refreshed += 1
+        else:
+            failed += 1
+            logger.warning(f"[B1_CACHE] Refresh failed for scope {tenant_id or B1_CLIENT_ADMIN_SCOPE}: {data.get('error')}")
+    return {"refreshed": refreshed, "failed": failed}
+
+
+def get_dashboard_data_service() -> DashboardDataService:
+    """
+    The app-wide DashboardDataService for the configured credentials
+    
+    Built on first use and kept in current_app.extensions, so request
+    handlers don't resolve the credentials path on every call.
+    """
+    from flask import current_app
+    
+    service = current_app.extensions.get('dashboard_data')
+    if service is None:
+        creds_path = current_app.config.get('GOOGLE_APPLICATION_CREDENTIALS', 'service-account-creds.json')
+        service = current_app.extensions.setdefault('dashboard_data', DashboardDataService(creds_path))
+    return service
+
+
 # Convenience function
 def get_dashboard_data(dashboard_code: str, user_id: str, schedule_def_id: Optional[str] = None, credentials_path: Optional[str] = None) -> Dict[str, Any]:
     """
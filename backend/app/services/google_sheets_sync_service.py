@@ -1602,140 +1602,248 @@ class GoogleSheetsSyncService:
                 'error': 'Schedule definition or paramsSheetURL is missing'
             }
         
-        try:
-            # Import Google Sheets service using the shared import utility
-            # This handles multiple import paths and fallbacks
+        results = self.sync_schedule_definitions_metadata([schedule_def], credentials_path)
+        return results[schedule_def.scheduleDefID]
+    
+    def sync_schedule_definitions_metadata(self, schedule_defs: List['ScheduleDefinition'],
+                                          credentials_path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Sync Google Sheets metadata for several schedule definitions at once
+        
+        Definitions that share a Parameters or Pre-Schedule spreadsheet (the
+        usual case within a tenant) reuse a single read of it, and all
+        updates go out in one commit.
+        
+        Args:
+            schedule_defs: ScheduleDefinition instances to sync
+            credentials_path: Path to Google service account credentials
+            
+        Returns:
+            Dictionary of scheduleDefID -> sync result (same shape as
+            sync_schedule_definition_metadata)
+        """
+        results = {}
+        pending = []
+        for schedule_def in schedule_defs:
+            if not schedule_def.paramsSheetURL:
+                results[schedule_def.scheduleDefID] = {
+                    'success': False,
+                    'error': 'Schedule definition or paramsSheetURL is missing'
+                }
+            else:
+                pending.append(schedule_def)
+        if not pending:
+            return results
+        
+        service, unavailable = self._get_metadata_sheets_service(credentials_path)
+        if service is None:
+            for schedule_def in pending:
+                results[schedule_def.scheduleDefID] = dict(unavailable)
+            return results
+        
+        # One read per distinct spreadsheet URL for the whole batch
+        params_reads = {}
+        preschedule_reads = {}
+        synced = []
+        updated = []
+        for schedule_def in pending:
             try:
-                from app.services.google_sheets_import import GoogleSheetsService, SHEETS_AVAILABLE
-                
-                # Ensure import was attempted
-                from app.services.google_sheets_import import _try_import_google_sheets
-                _try_import_google_sheets(force_retry=False)
+                params_url = schedule_def.paramsSheetURL
+                if params_url not in params_reads:
+                    logger.info(f"[Google Sheets Sync] Fetching metadata from {params_url}")
+                    params_reads[params_url] = service.read_parameters_sheet(params_url)
+                params_result = params_reads[params_url]
                 
-                if not SHEETS_AVAILABLE or not GoogleSheetsService:
-                    logger.warning("[Google Sheets Sync Error] Google Sheets service not available after import")
-                    return {
+                if not params_result.get('success'):
+                    error_msg = params_result.get('error', 'Unknown error')
+                    logger.warning(f"[Google Sheets Sync Error] Failed to fetch params sheet: {error_msg}")
+                    # Don't fail - just log and return DB data
+                    results[schedule_def.scheduleDefID] = {
                         'success': False,
-                        'error': 'Google Sheets service not available',
+                        'error': error_msg,
                         'skipped': True
                     }
-            except ImportError as e:
-                logger.warning(f"[Google Sheets Sync Error] Failed to import GoogleSheetsService: {str(e)}")
-                return {
-                    'success': False,
-                    'error': 'Google Sheets service not available',
-                    'skipped': True
+                    continue
+                
+                # Try to read preschedule sheet for additional info
+                preschedule_result = None
+                prefs_url = schedule_def.prefsSheetURL
+                if prefs_url:
+                    if prefs_url not in preschedule_reads:
+                        try:
+                            preschedule_reads[prefs_url] = service.read_preschedule_sheet(prefs_url)
+                            if preschedule_reads[prefs_url].get('success'):
+                                logger.info(f"[Google Sheets Sync] Preschedule sheet has {preschedule_reads[prefs_url].get('rows', 0)} rows")
+                        except Exception as e:
+                            logger.warning(f"[Google Sheets Sync Error] Could not read preschedule sheet: {str(e)}")
+                            preschedule_reads[prefs_url] = None
+                    preschedule_result = preschedule_reads[prefs_url]
+                
+                metadata = self._build_definition_metadata(params_result, preschedule_result)
+                if self._apply_definition_metadata(schedule_def, metadata):
+                    updated.append(schedule_def)
+                synced.append(schedule_def)
+                
+                columns = params_result.get('columns', [])
+                results[schedule_def.scheduleDefID] = {
+                    'success': True,
+                    'row_count': params_result.get('rows', 0),
+                    'column_count': len(columns),
+                    'last_synced_at': metadata['last_synced_at'],
+                    'metadata': metadata
                 }
+            except Exception as e:
+                results[schedule_def.scheduleDefID] = self._metadata_sync_error(schedule_def, e)
+        
+        if synced:
+            try:
+                # Commit changes (only definitions whose stored fields changed are dirty)
+                if updated:
+                    db.session.commit()
+                for schedule_def in synced:
+                    logger.info(f"[Google Sheets Sync] Successfully synced metadata for {schedule_def.scheduleName}: "
+                                f"{results[schedule_def.scheduleDefID]['row_count']} rows")
+            except Exception as e:
+                db.session.rollback()
+                for schedule_def in updated:
+                    results[schedule_def.scheduleDefID] = self._metadata_sync_error(schedule_def, e)
+        
+        return results
+    
+    def _get_metadata_sheets_service(self, credentials_path: Optional[str] = None):
+        """
+        Build the Google Sheets service used for metadata syncs
+        
+        Returns:
+            (service, None), or (None, skipped result) if Google Sheets is unavailable
+        """
+        try:
+            # Import Google Sheets service using the shared import utility
+            # This handles multiple import paths and fallbacks
+            from app.services.google_sheets_import import GoogleSheetsService, SHEETS_AVAILABLE
             
-            # Get credentials path
-            if not credentials_path:
-                from flask import current_app
-                credentials_path = current_app.config.get('GOOGLE_APPLICATION_CREDENTIALS', 'service-account-creds.json')
-            
-            # Initialize Google Sheets service
-            service = GoogleSheetsService(credentials_path)
-            
-            # Fetch data from paramsSheetURL
-            logger.info(f"[Google Sheets Sync] Fetching metadata from {schedule_def.paramsSheetURL}")
-            params_result = service.read_parameters_sheet(schedule_def.paramsSheetURL)
+            # Ensure import was attempted
+            from app.services.google_sheets_import import _try_import_google_sheets
+            _try_import_google_sheets(force_retry=False)
             
-            if not params_result.get('success'):
-                error_msg = params_result.get('error', 'Unknown error')
-                logger.warning(f"[Google Sheets Sync Error] Failed to fetch params sheet: {error_msg}")
-                # Don't fail - just log and return DB data
-                return {
+            if not SHEETS_AVAILABLE or not GoogleSheetsService:
+                logger.warning("[Google Sheets Sync Error] Google Sheets service not available after import")
+                return None, {
                     'success': False,
-                    'error': error_msg,
+                    'error': 'Google Sheets service not available',
                     'skipped': True
                 }
-            
-            # Extract metadata
-            row_count = params_result.get('rows', 0)
-            columns = params_result.get('columns', [])
-            data = params_result.get('data', [])
-            
-            # Get preview rows (first 5 rows)
-            preview_rows = data[:5] if data else []
-            
-            # Try to read preschedule sheet for additional info
-            preschedule_result = None
-            if schedule_def.prefsSheetURL:
-                try:
-                    preschedule_result = service.read_preschedule_sheet(schedule_def.prefsSheetURL)
-                    if preschedule_result.get('success'):
-                        logger.info(f"[Google Sheets Sync] Preschedule sheet has {preschedule_result.get('rows', 0)} rows")
-                except Exception as e:
-                    logger.warning(f"[Google Sheets Sync Error] Could not read preschedule sheet: {str(e)}")
-            
-            # Build metadata dictionary
-            metadata = {
-                'last_synced_at': datetime.utcnow().isoformat(),
-                'params_sheet': {
-                    'row_count': row_count,
-                    'column_count': len(columns),
-                    'columns': columns[:10],  # First 10 columns
-                    'preview_rows': preview_rows,
-                    'sheet_name': params_result.get('sheet_name', ''),
-                },
-                'preschedule_sheet': None,
+        except ImportError as e:
+            logger.warning(f"[Google Sheets Sync Error] Failed to import GoogleSheetsService: {str(e)}")
+            return None, {
+                'success': False,
+                'error': 'Google Sheets service not available',
+                'skipped': True
             }
-            
-            if preschedule_result and preschedule_result.get('success'):
-                metadata['preschedule_sheet'] = {
-                    'row_count': preschedule_result.get('rows', 0),
-                    'column_count': len(preschedule_result.get('columns', [])),
-                    'sheet_name': preschedule_result.get('sheet_name', ''),
-                }
-            
-            # Update schedule definition metadata
-            # Check if model has metadata field, otherwise store in remarks or use JSON serialization
-            try:
-                # Try to set metadata field if it exists
-                if hasattr(schedule_def, 'metadata'):
-                    import json
-                    if isinstance(schedule_def.metadata, dict):
-                        schedule_def.metadata.update(metadata)
-                    else:
-                        schedule_def.metadata = metadata
-                else:
-                    # Store in a JSON field or use JSON serialization in remarks
-                    # For now, we'll store a summary in remarks if metadata field doesn't exist
-                    # This ensures backward compatibility
-                    import json
-                    metadata_json = json.dumps(metadata, ensure_ascii=False)
-                    # Store in remarks with a prefix (we'll append, not replace)
-                    if not schedule_def.remarks or '[SYNC]' not in schedule_def.remarks:
-                        sync_info = f"\n[SYNC] Last synced: {metadata['last_synced_at']}, Rows: {row_count}"
-                        schedule_def.remarks = (schedule_def.remarks or '') + sync_info
-            except Exception as e:
-                logger.warning(f"[Google Sheets Sync Error] Could not update metadata: {str(e)}")
-                # Continue anyway - metadata update is not critical
-            
-            # Update updated_at timestamp
-            schedule_def.updated_at = db.func.now()
-            
-            # Commit changes
-            db.session.commit()
-            
-            logger.info(f"[Google Sheets Sync] Successfully synced metadata for {schedule_def.scheduleName}: {row_count} rows")
-            
-            return {
-                'success': True,
+        
+        # Get credentials path
+        if not credentials_path:
+            credentials_path = self.credentials_path
+        if not credentials_path:
+            from flask import current_app
+            credentials_path = current_app.config.get('GOOGLE_APPLICATION_CREDENTIALS', 'service-account-creds.json')
+        
+        # Initialize Google Sheets service
+        return GoogleSheetsService(credentials_path), None
+    
+    def _build_definition_metadata(self, params_result: Dict[str, Any],
+                                   preschedule_result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Metadata dictionary for a definition from its sheet reads"""
+        # Extract metadata
+        row_count = params_result.get('rows', 0)
+        columns = params_result.get('columns', [])
+        data = params_result.get('data', [])
+        
+        # Get preview rows (first 5 rows)
+        preview_rows = data[:5] if data else []
+        
+        # Build metadata dictionary
+        metadata = {
+            'last_synced_at': datetime.utcnow().isoformat(),
+            'params_sheet': {
                 'row_count': row_count,
                 'column_count': len(columns),
-                'last_synced_at': metadata['last_synced_at'],
-                'metadata': metadata
+                'columns': columns[:10],  # First 10 columns
+                'preview_rows': preview_rows,
+                'sheet_name': params_result.get('sheet_name', ''),
+            },
+            'preschedule_sheet': None,
+        }
+        
+        if preschedule_result and preschedule_result.get('success'):
+            metadata['preschedule_sheet'] = {
+                'row_count': preschedule_result.get('rows', 0),
+                'column_count': len(preschedule_result.get('columns', [])),
+                'sheet_name': preschedule_result.get('sheet_name', ''),
             }
-            
+        
+        return metadata
+    
+    def _apply_definition_metadata(self, schedule_def: 'ScheduleDefinition', metadata: Dict[str, Any]) -> bool:
+        """
+        Set synced metadata on a definition (the caller commits)
+        
+        Returns:
+            True if a stored column changed; updated_at is only bumped then, so
+            the periodic refresh doesn't rewrite unchanged definitions
+        """
+        changed = False
+        # Update schedule definition metadata
+        # Check if model has metadata field, otherwise store in remarks or use JSON serialization
+        try:
+            # Try to set metadata field if it exists. Declarative models expose
+            # the table MetaData as `metadata`, so this is an in-memory
+            # attribute only and never counts as a change
+            if hasattr(schedule_def, 'metadata'):
+                if isinstance(schedule_def.metadata, dict):
+                    schedule_def.metadata.update(metadata)
+                else:
+                    schedule_def.metadata = metadata
+            else:
+                # Store a summary in remarks if metadata field doesn't exist
+                # This ensures backward compatibility (we'll append, not replace)
+                if not schedule_def.remarks or '[SYNC]' not in schedule_def.remarks:
+                    sync_info = f"\n[SYNC] Last synced: {metadata['last_synced_at']}, Rows: {metadata['params_sheet']['row_count']}"
+                    schedule_def.remarks = (schedule_def.remarks or '') + sync_info
+                    changed = True
         except Exception as e:
-            error_msg = str(e)
-            logger.error(f"[Google Sheets Sync Error] Sync failed for {schedule_def.scheduleDefID}: {error_msg}")
-            import traceback
-            logger.error(traceback.format_exc())
-            
-            # Don't fail the request - return error but continue with DB data
-            return {
-                'success': False,
-                'error': error_msg,
-                'skipped': True
-            }
\ No newline at end of file
+            logger.warning(f"[Google Sheets Sync Error] Could not update metadata: {str(e)}")
+            # Continue anyway - metadata update is not critical
+        
+        # Update updated_at timestamp only when something was actually written
+        if changed:
+            schedule_def.updated_at = datetime.utcnow()
+        return changed
+    
+    def _metadata_sync_error(self, schedule_def: 'ScheduleDefinition', error: Exception) -> Dict[str, Any]:
+        """Log a failed metadata sync and build its (non-fatal) result"""
+        error_msg = str(error)
+        logger.error(f"[Google Sheets Sync Error] Sync failed for {schedule_def.scheduleDefID}: {error_msg}")
+        logger.error(traceback.format_exc())
+        
+        # Don't fail the request - return error but continue with DB data
+        return {
+            'success': False,
+            'error': error_msg,
+            'skipped': True
+        }
+
+
+def get_sheets_sync_service() -> GoogleSheetsSyncService:
+    """
+    The app-wide GoogleSheetsSyncService for the configured credentials
+    
+    Built on first use and kept in current_app.extensions.
+    """
+    from flask import current_app
+    
+    service = current_app.extensions.get('sheets_sync')
+    if service is None:
+        creds_path = current_app.config.get('GOOGLE_APPLICATION_CREDENTIALS', 'service-account-creds.json')
+        service = current_app.extensions.setdefault('sheets_sync', GoogleSheetsSyncService(creds_path))
+    return service
@@ -1,11 +1,14 @@
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import jwt_required, get_jwt
+from types import SimpleNamespace
+from flask import g, jsonify
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 
-from .role_utils import normalize_role
+from .role_utils import normalize_role, is_client_admin_role
 
 
 def role_required(*allowed_roles):
+    normalized_allowed = frozenset(normalize_role(r) for r in allowed_roles)
+    
     def decorator(fn):
         @wraps(fn)
         @jwt_required(optional=True)
@@ -18,10 +21,7 @@ def role_required(*allowed_roles):
             claims = get_jwt() or {}
             role = claims.get("role")
             
-            normalized_role = normalize_role(role)
-            normalized_allowed = [normalize_role(r) for r in allowed_roles]
-            
-            if allowed_roles and normalized_role not in normalized_allowed:
+            if allowed_roles and normalize_role(role) not in normalized_allowed:
                 return jsonify({"error": "forbidden", "reason": "insufficient_role"}), 403
             return fn(*args, **kwargs)
 
@@ -30,4 +30,58 @@ def role_required(*allowed_roles):
     return decorator
 
 
+def current_user_ctx():
+    """
+    The current user's identity, built once per request and kept on flask.g
+    
+    Read from the access token claims (role, tenantID, username) so handlers
+    that only need those don't load the User row. Tokens issued without the
+    claims fall back to the database. Attribute names mirror User, so the
+    result can stand in for it in helpers like get_tenant_filtered_query().
+    
+    Returns:
+        SimpleNamespace(userID, tenantID, role, username, is_client_admin),
+        or None if the token's user no longer exists
+    """
+    if 'user_ctx' in g:
+        return g.user_ctx
+    
+    claims = get_jwt() or {}
+    user_id = get_jwt_identity()
+    tenant_id = claims.get('tenantID')
+    role = claims.get('role')
+    username = claims.get('username')
+    
+    ctx = None
+    if tenant_id and role:
+        ctx = SimpleNamespace(userID=user_id, tenantID=tenant_id, role=role, username=username)
+    elif user_id:
+        user = load_current_user()
+        if user:
+            ctx = SimpleNamespace(userID=user.userID, tenantID=user.tenantID, role=user.role, username=user.username)
+    
+    if ctx is not None:
+        ctx.is_client_admin = is_client_admin_role(ctx.role)
+    g.user_ctx = ctx
+    return ctx
+
 
+def load_current_user():
+    """
+    The current request's User row, loaded once per request and kept on flask.g
+    
+    The tenant is joined in the same query, since most callers go on to
+    check it. Handlers that only need the identity should use
+    current_user_ctx() instead.
+    
+    Returns:
+        User instance, or None if the token's user no longer exists
+    """
+    if 'current_user' in g:
+        return g.current_user
+    
+    from sqlalchemy.orm import joinedload
+    from .. import db
+    from ..models import User
+    g.current_user = db.session.get(User, get_jwt_identity(), options=[joinedload(User.tenant)])
+    return g.current_user
@@ -0,0 +1,60 @@
+"""
+orjson-backed JSON provider for Flask.
+
+Every jsonify() call goes through app.json, so installing this provider in the
+app factory moves all response serialization onto orjson without touching the
+routes. Output matches Flask's DefaultJSONProvider: datetimes are still sent as
+HTTP dates and Decimal/UUID/dataclass values go through Flask's own default().
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    # Keys keep to_dict() insertion order instead of being sorted per response
+    sort_keys = False
+
+    def _options(self, indent: bool = False) -> int:
+        # Datetimes are passed through to Flask's default() so the wire format
+        # stays the same as before; numpy values come from the pandas-backed
+        # sheet data and previously had to be converted by hand
+        option = (
+            orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_SERIALIZE_NUMPY
+        )
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        # Callers asking for stdlib-only options (cls, separators, ...) keep the stdlib encoder
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def dumps_bytes(self, obj) -> bytes:
+        """Compact UTF-8 JSON without the str round-trip, for hand-assembled responses"""
+        return orjson.dumps(obj, default=self.default, option=self._options())
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Same rule as DefaultJSONProvider: pretty-print in debug unless compact is forced
+        indent = self.compact is None and self._app.debug or self.compact is False
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._options(indent)),
+            mimetype=self.mimetype,
+        )
@@ -0,0 +1,41 @@
+"""
+Keyset Pagination Utility
+Opaque cursors for lists ordered newest-first by (created_at, primary key).
+
+A cursor encodes the sort key of the last row on a page; the next page is
+every row that sorts strictly after it, which an index on the sort columns
+serves as a range scan no matter how deep the client pages.
+"""
+import base64
+from datetime import datetime
+
+from ..extensions import db
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Cursor for the page after the row with this (created_at, id)"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, row_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def after_cursor(query, created_at_column, id_column, cursor: str):
+    """Filter query to rows sorting after cursor in (created_at DESC, id DESC) order
+
+    Spelled out as OR/AND instead of a row-value comparison so every
+    supported database can use the (created_at, id) index for it.
+    """
+    created_at, row_id = decode_cursor(cursor)
+    return query.filter(db.or_(
+        created_at_column < created_at,
+        db.and_(created_at_column == created_at, id_column < row_id),
+    ))
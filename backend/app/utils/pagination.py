@@ -0,0 +1,70 @@
+"""
+Offset Pagination Utility
+Page/per_page pagination that gets the total from the page query itself.
+
+Flask-SQLAlchemy's paginate() runs the page SELECT and then a separate
+SELECT COUNT(*) for the total. paginate_with_total() adds COUNT(*) OVER () to
+the page SELECT instead, so every row carries the total and a page costs one
+round trip. Window functions are supported by PostgreSQL, MySQL 8+ and
+SQLite 3.25+.
+"""
+import math
+from typing import Any, List
+
+from ..extensions import db
+
+
+class WindowPagination:
+    """The parts of Flask-SQLAlchemy's Pagination the list routes read"""
+
+    def __init__(self, items: List[Any], page: int, per_page: int, total: int):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+
+    @property
+    def pages(self) -> int:
+        return math.ceil(self.total / self.per_page) if self.total else 0
+
+    @property
+    def has_prev(self) -> bool:
+        return self.page > 1
+
+    @property
+    def has_next(self) -> bool:
+        return self.page < self.pages
+
+
+def paginate_with_total(query, page: int, per_page: int) -> WindowPagination:
+    """
+    One page of an ordered query plus the total row count, in one SELECT
+
+    Args:
+        query: Ordered ORM query, either a single entity or with_entities() columns
+        page: 1-based page number (values below 1 are treated as 1)
+        per_page: Rows per page
+
+    Returns:
+        WindowPagination; items are entities for an entity query, rows otherwise
+    """
+    page = max(page, 1)
+    descriptions = query.column_descriptions
+    single_entity = len(descriptions) == 1 and descriptions[0]['expr'] is descriptions[0]['entity']
+
+    rows = (
+        query.add_columns(db.func.count().over().label('total_count'))
+        .limit(per_page)
+        .offset((page - 1) * per_page)
+        .all()
+    )
+    if rows:
+        total = rows[0].total_count
+    elif page > 1:
+        # Past the last page there is no row to read the total from
+        total = query.order_by(None).count()
+    else:
+        total = 0
+
+    items = [row[0] for row in rows] if single_entity else rows
+    return WindowPagination(items, page, per_page, total)
@@ -0,0 +1,188 @@
+"""
+Redis Cache Utility
+Small JSON get/set/delete helpers on the Redis instance Celery already uses.
+
+Every helper degrades gracefully: if the redis package is missing or the
+server can't be reached, reads miss and writes/deletes are skipped, so callers
+fall through to the database.
+"""
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+from flask import current_app
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Keep a down or slow Redis from stalling the request that is trying to skip work
+REDIS_SOCKET_TIMEOUT = 0.5  # seconds
+
+# Stampede protection for cache_json_response(): one request recomputes a
+# missing entry while the others wait up to STAMPEDE_WAIT for its result
+STAMPEDE_LOCK_TTL = 30  # seconds
+STAMPEDE_WAIT = 5.0  # seconds
+STAMPEDE_POLL = 0.1  # seconds
+
+# Health endpoints get polled by every open dashboard; one PING per window is enough
+PING_CACHE_TTL = 5  # seconds
+_ping_state = {"ok": False, "checked_at": None}
+_ping_lock = threading.Lock()
+
+
+def get_redis():
+    """Return this app's shared Redis client, or None when Redis isn't available"""
+    if not REDIS_AVAILABLE:
+        return None
+    client = current_app.extensions.get('redis_cache')
+    if client is None:
+        url = current_app.config.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
+        client = redis.Redis.from_url(
+            url,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+        )
+        current_app.extensions['redis_cache'] = client
+    return client
+
+
+def redis_ping() -> bool:
+    """
+    Whether Redis answers PING, remembered for PING_CACHE_TTL seconds
+    
+    Goes through the shared pooled client, so a check reuses an open
+    connection instead of connecting (and timing out) from scratch.
+    """
+    now = time.monotonic()
+    with _ping_lock:
+        checked_at = _ping_state["checked_at"]
+        if checked_at is not None and now - checked_at < PING_CACHE_TTL:
+            return _ping_state["ok"]
+    client = get_redis()
+    try:
+        ok = client is not None and bool(client.ping())
+    except Exception:
+        ok = False
+    with _ping_lock:
+        _ping_state["ok"] = ok
+        _ping_state["checked_at"] = now
+    return ok
+
+
+def cache_get_json(key: str) -> Optional[Any]:
+    """Decoded value stored under key, or None on a miss or Redis error"""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        raw = client.get(key)
+    except Exception as e:
+        logger.warning(f"[CACHE] Redis get failed for {key}: {e}")
+        return None
+    return json.loads(raw) if raw is not None else None
+
+
+def cache_set_json(key: str, value: Any, ttl: int) -> None:
+    """Store value under key for ttl seconds; errors are logged and ignored"""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.setex(key, ttl, json.dumps(value))
+    except Exception as e:
+        logger.warning(f"[CACHE] Redis set failed for {key}: {e}")
+
+
+def cache_delete(*keys: str) -> None:
+    """Delete keys; errors are logged and ignored"""
+    client = get_redis()
+    if client is None or not keys:
+        return
+    try:
+        client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"[CACHE] Redis delete failed for {keys}: {e}")
+
+
+def cache_delete_pattern(pattern: str) -> None:
+    """Delete every key matching a glob pattern; errors are logged and ignored"""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        keys = list(client.scan_iter(match=pattern, count=500))
+        if keys:
+            client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"[CACHE] Redis pattern delete failed for {pattern}: {e}")
+
+
+def cache_json_response(
+    key: str,
+    ttl: int,
+    compute: Callable[[], Any],
+    should_cache: Callable[[Any], bool] = lambda value: True,
+) -> Tuple[str, Optional[Any]]:
+    """
+    JSON text for key, computing and caching it on a miss
+    
+    The text is encoded with the app's JSON provider, so it can be sent as a
+    response body as-is. On a miss a SET NX lock lets a single request run
+    compute(); concurrent requests poll for its result and only compute
+    themselves if it doesn't appear within STAMPEDE_WAIT.
+    
+    Args:
+        key: Redis key
+        ttl: Seconds to keep the entry
+        compute: Produces the value on a miss
+        should_cache: Whether a computed value may be stored (e.g. only successes)
+        
+    Returns:
+        (json_text, value): value is None when json_text came from the cache
+    """
+    client = get_redis()
+    if client is None:
+        value = compute()
+        return current_app.json.dumps(value), value
+    
+    try:
+        raw = client.get(key)
+        if raw is not None:
+            return raw.decode(), None
+        lock_key = f"{key}:lock"
+        locked = bool(client.set(lock_key, "1", nx=True, ex=STAMPEDE_LOCK_TTL))
+        if not locked:
+            deadline = time.monotonic() + STAMPEDE_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(STAMPEDE_POLL)
+                raw = client.get(key)
+                if raw is not None:
+                    return raw.decode(), None
+    except Exception as e:
+        logger.warning(f"[CACHE] Redis read failed for {key}: {e}")
+        value = compute()
+        return current_app.json.dumps(value), value
+    
+    try:
+        value = compute()
+        text = current_app.json.dumps(value)
+        if should_cache(value):
+            try:
+                client.setex(key, ttl, text)
+            except Exception as e:
+                logger.warning(f"[CACHE] Redis set failed for {key}: {e}")
+        return text, value
+    finally:
+        if locked:
+            try:
+                client.delete(lock_key)
+            except Exception as e:
+                logger.warning(f"[CACHE] Redis lock release failed for {lock_key}: {e}")
@@ -3,6 +3,7 @@ Role utility helpers for normalizing and comparing role values.
 """
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Optional
 
 # Canonical normalized role keys
@@ -46,9 +47,13 @@ ROLE_HIERARCHY = [
 ]
 
 
+@lru_cache(maxsize=256)
 def normalize_role(role: Optional[str]) -> str:
     """
     Normalize a role string by lowercasing, removing separators, and applying aliases.
+    
+    Memoized: every authorization check calls this with one of a handful of
+    role strings, so after warm-up it is a single dict lookup.
     """
     if not role:
         return ""
@@ -104,6 +104,10 @@ def validate_password_strength(password: str) -> tuple[bool, str]:
     
     return True, ""
 
+# Potentially dangerous characters stripped by sanitize_input, as a deletion
+# table so the string is scanned once instead of once per character
+_SANITIZE_TABLE = str.maketrans('', '', '<>"\'&;()|`')
+
 def sanitize_input(input_string: str) -> str:
     """
     Sanitize user input to prevent injection attacks
@@ -118,13 +122,7 @@ def sanitize_input(input_string: str) -> str:
         return ""
     
     # Remove potentially dangerous characters
-    dangerous_chars = ['<', '>', '"', "'", '&', ';', '(', ')', '|', '`']
-    sanitized = input_string
-    
-    for char in dangerous_chars:
-        sanitized = sanitized.replace(char, '')
-    
-    return sanitized.strip()
+    return input_string.translate(_SANITIZE_TABLE).strip()
 
 def validate_url(url: str) -> bool:
     """
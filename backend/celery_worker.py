@@ -11,6 +11,8 @@ import os
 os.environ.setdefault("CELERY_BROKER_URL", "redis://localhost:6379/0")
 os.environ.setdefault("CELERY_RESULT_BACKEND", "redis://localhost:6379/1")
 os.environ.setdefault("CELERY_BROKER_TRANSPORT", "redis")  # Explicitly set transport to redis
+# Tells init_celery this is a worker process, so task modules are imported eagerly
+os.environ["CELERY_WORKER_RUNNING"] = "1"
 # Explicitly unset any AMQP defaults
 os.environ.pop("BROKER_URL", None)  # Remove if exists
 os.environ.pop("RABBITMQ_URL", None)  # Remove if exists